@@ -9,6 +9,8 @@ __all__ = [
     "asset",
     "block",
     "blockchain",
+    "blockstore",
+    "historystore",
     "market",
     "storage",
     "price",
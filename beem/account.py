@@ -9,14 +9,15 @@ import json
 from datetime import datetime, timedelta, date, time
 import math
 import random
+import heapq
 import logging
 from prettytable import PrettyTable
-from beem.instance import shared_steem_instance
-from .exceptions import AccountDoesNotExistsException, OfflineHasNoRPCException
+from beem.instance import shared_steem_instance, steem_instance_queue
+from .exceptions import AccountDoesNotExistsException, OfflineHasNoRPCException, BatchedCallsNotSupported
 from beemapi.exceptions import ApiNotSupported, MissingRequiredActiveAuthority
-from .blockchainobject import BlockchainObject
+from .blockchainobject import BlockchainObject, ObjectCache
 from .blockchain import Blockchain
-from .utils import formatTimeString, formatTimedelta, remove_from_dict, reputation_to_score, addTzInfo
+from .utils import formatTimeString, formatTimedelta, remove_from_dict, reputation_to_score, addTzInfo, formatToTimeStamp
 from beem.amount import Amount
 from beembase import operations
 from beem.rc import RC
@@ -24,6 +25,42 @@ from beemgraphenebase.account import PrivateKey, PublicKey, PasswordKey
 from beemgraphenebase.py23 import bytes_types, integer_types, string_types, text_type
 from beem.constants import STEEM_VOTE_REGENERATION_SECONDS, STEEM_1_PERCENT, STEEM_100_PERCENT, STEEM_VOTING_MANA_REGENERATION_SECONDS
 log = logging.getLogger(__name__)
+FUTURES_MODULE = None
+if not FUTURES_MODULE:
+    try:
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        FUTURES_MODULE = "futures"
+    except ImportError:
+        FUTURES_MODULE = None
+
+
+def construct_history_op(item, account_name):
+    """ Returns the dict of a raw account history item ``[index, event]``,
+        as it is returned by :func:`Account.history` without raw_output
+    """
+    item_index, event = item
+    if isinstance(event['op'], list):
+        op_type, op = event['op']
+    else:
+        op_type = event['op']['type']
+        if len(op_type) > 10 and op_type[len(op_type) - 10:] == "_operation":
+            op_type = op_type[:-10]
+        op = event['op']['value']
+    block_props = remove_from_dict(event, keys=['op'], keep_keys=False)
+    # index can change during reindexing in
+    # future hard-forks. Thus we cannot take it for granted.
+    immutable = op.copy()
+    immutable.update(block_props)
+    immutable.update({
+        'account': account_name,
+        'type': op_type,
+    })
+    _id = Blockchain.hash_op(immutable)
+    immutable.update({
+        '_id': _id,
+        'index': item_index,
+    })
+    return immutable
 
 
 class Account(BlockchainObject):
@@ -62,6 +99,7 @@ class Account(BlockchainObject):
     """
 
     type_id = 2
+    _cache = ObjectCache(max_entries=2000)
 
     def __init__(
         self,
@@ -119,49 +157,56 @@ class Account(BlockchainObject):
 
         super(Account, self).__init__(account, id_item="name", lazy=self.lazy, full=self.full, steem_instance=self.steem)
 
-    def _parse_json_data(self, account):
-        parse_int = [
-            "sbd_seconds", "savings_sbd_seconds", "average_bandwidth", "lifetime_bandwidth", "lifetime_market_bandwidth", "reputation", "withdrawn", "to_withdraw",
-        ]
-        for p in parse_int:
-            if p in account and isinstance(account.get(p), string_types):
-                account[p] = int(account.get(p, 0))
-        if "proxied_vsf_votes" in account:
+    _int_fields = [
+        "sbd_seconds", "savings_sbd_seconds", "average_bandwidth", "lifetime_bandwidth", "lifetime_market_bandwidth", "reputation", "withdrawn", "to_withdraw",
+    ]
+    _time_fields = [
+        "last_owner_update", "last_account_update", "created", "last_owner_proved", "last_active_proved",
+        "last_account_recovery", "last_vote_time", "sbd_seconds_last_update", "sbd_last_interest_payment",
+        "savings_sbd_seconds_last_update", "savings_sbd_last_interest_payment", "next_vesting_withdrawal",
+        "last_market_bandwidth_update", "last_post", "last_root_post", "last_bandwidth_update"
+    ]
+    _amount_fields = [
+        "balance",
+        "savings_balance",
+        "sbd_balance",
+        "savings_sbd_balance",
+        "reward_sbd_balance",
+        "reward_steem_balance",
+        "reward_vesting_balance",
+        "reward_vesting_steem",
+        "vesting_shares",
+        "delegated_vesting_shares",
+        "received_vesting_shares",
+        "vesting_withdraw_rate",
+        "vesting_balance",
+    ]
+
+    def _parse_field(self, key, value):
+        """ Returns the parsed value of one field of the account json"""
+        if key in self._int_fields:
+            if isinstance(value, string_types):
+                return int(value)
+        elif key == "proxied_vsf_votes":
             proxied_vsf_votes = []
-            for p_int in account["proxied_vsf_votes"]:
+            for p_int in value:
                 if isinstance(p_int, string_types):
                     proxied_vsf_votes.append(int(p_int))
                 else:
                     proxied_vsf_votes.append(p_int)
-            account["proxied_vsf_votes"] = proxied_vsf_votes
-        parse_times = [
-            "last_owner_update", "last_account_update", "created", "last_owner_proved", "last_active_proved",
-            "last_account_recovery", "last_vote_time", "sbd_seconds_last_update", "sbd_last_interest_payment",
-            "savings_sbd_seconds_last_update", "savings_sbd_last_interest_payment", "next_vesting_withdrawal",
-            "last_market_bandwidth_update", "last_post", "last_root_post", "last_bandwidth_update"
-        ]
-        for p in parse_times:
-            if p in account and isinstance(account.get(p), string_types):
-                account[p] = formatTimeString(account.get(p, "1970-01-01T00:00:00"))
-        # Parse Amounts
-        amounts = [
-            "balance",
-            "savings_balance",
-            "sbd_balance",
-            "savings_sbd_balance",
-            "reward_sbd_balance",
-            "reward_steem_balance",
-            "reward_vesting_balance",
-            "reward_vesting_steem",
-            "vesting_shares",
-            "delegated_vesting_shares",
-            "received_vesting_shares",
-            "vesting_withdraw_rate",
-            "vesting_balance",
-        ]
-        for p in amounts:
-            if p in account and isinstance(account.get(p), (string_types, list, dict)):
-                account[p] = Amount(account[p], steem_instance=self.steem)
+            return proxied_vsf_votes
+        elif key in self._time_fields:
+            if isinstance(value, string_types):
+                return formatTimeString(value)
+        elif key in self._amount_fields:
+            if isinstance(value, (string_types, list, dict)):
+                return Amount(value, steem_instance=self.steem)
+        return value
+
+    def _parse_json_data(self, account):
+        for p in self._int_fields + ["proxied_vsf_votes"] + self._time_fields + self._amount_fields:
+            if p in account:
+                account[p] = self._parse_field(p, account[p])
         return account
 
     def json(self):
@@ -1735,38 +1780,20 @@ class Account(BlockchainObject):
                 return
 
             if isinstance(event['op'], list):
-                op_type, op = event['op']
+                op_type = event['op'][0]
             else:
                 op_type = event['op']['type']
                 if len(op_type) > 10 and op_type[len(op_type) - 10:] == "_operation":
                     op_type = op_type[:-10]
-                op = event['op']['value']
-            block_props = remove_from_dict(event, keys=['op'], keep_keys=False)
-
-            def construct_op(account_name):
-                # verbatim output from steemd
-                if raw_output:
-                    return item
-
-                # index can change during reindexing in
-                # future hard-forks. Thus we cannot take it for granted.
-                immutable = op.copy()
-                immutable.update(block_props)
-                immutable.update({
-                    'account': account_name,
-                    'type': op_type,
-                })
-                _id = Blockchain.hash_op(immutable)
-                immutable.update({
-                    '_id': _id,
-                    'index': item_index,
-                })
-                return immutable
 
             if exclude_ops and op_type in exclude_ops:
                 continue
             if not only_ops or op_type in only_ops:
-                yield construct_op(self["name"])
+                if raw_output:
+                    # verbatim output from steemd
+                    yield item
+                else:
+                    yield construct_history_op(item, self["name"])
 
     def history(
         self, start=None, stop=None, use_block_num=True,
@@ -1844,6 +1871,28 @@ class Account(BlockchainObject):
 
                 0
 
+            When the Steem instance has a :class:`beem.historystore.HistoryStore`,
+            new operations are synced into the store and the operations are
+            read from it.
+
+        """
+        history_store = getattr(self.steem, "history_store", None)
+        if history_store is not None:
+            for item in history_store.history(self, start=start, stop=stop, use_block_num=use_block_num,
+                                              only_ops=only_ops, exclude_ops=exclude_ops,
+                                              batch_size=batch_size, raw_output=raw_output):
+                yield item
+            return
+        for item in self._history(start=start, stop=stop, use_block_num=use_block_num, only_ops=only_ops,
+                                  exclude_ops=exclude_ops, batch_size=batch_size, raw_output=raw_output):
+            yield item
+
+    def _history(
+        self, start=None, stop=None, use_block_num=True,
+        only_ops=[], exclude_ops=[], batch_size=1000, raw_output=False
+    ):
+        """ Returns a generator for the account transactions from the node,
+            see :func:`history`
         """
         _limit = batch_size
         max_index = self.virtual_op_count()
@@ -2008,7 +2057,18 @@ class Account(BlockchainObject):
 
                 0
 
+            When the Steem instance has a :class:`beem.historystore.HistoryStore`,
+            new operations are synced into the store and the operations are
+            read from it.
+
         """
+        history_store = getattr(self.steem, "history_store", None)
+        if history_store is not None:
+            for item in history_store.history(self, start=start, stop=stop, use_block_num=use_block_num,
+                                              only_ops=only_ops, exclude_ops=exclude_ops, batch_size=batch_size,
+                                              raw_output=raw_output, order=-1):
+                yield item
+            return
         _limit = batch_size
         first = self.virtual_op_count()
         start = addTzInfo(start)
@@ -3133,6 +3193,62 @@ class Account(BlockchainObject):
                     return
 
 
+class LazyParsedAccount(Account):
+    """ Account whose fields are parsed when they are first accessed
+
+        Balances are converted to :class:`beem.amount.Amount` and timestamps
+        to datetime only for the fields which are read, so that loading many
+        accounts of which only a few fields are used is cheap. It is used by
+        :class:`AccountsLoader` with ``lazy_parse=True``.
+
+        .. code-block:: python
+
+            >>> from beem.account import LazyParsedAccount
+            >>> from beem import Steem
+            >>> stm = Steem(offline=True)
+            >>> account = LazyParsedAccount({"name": "beem", "balance": "1.000 STEEM"}, steem_instance=stm)
+            >>> print(account["balance"])
+            1.000 STEEM
+
+    """
+    _unparsed = frozenset()
+
+    def _parse_json_data(self, account):
+        self._unparsed = set(key for key in account if key in self._int_fields or key in self._time_fields or
+                             key in self._amount_fields or key == "proxied_vsf_votes")
+        return account
+
+    def _parse_key(self, key):
+        if key in self._unparsed:
+            self._unparsed.discard(key)
+            dict.__setitem__(self, key, self._parse_field(key, dict.__getitem__(self, key)))
+
+    def parse_all(self):
+        """ Parses all fields which were not accessed yet"""
+        for key in list(self._unparsed):
+            self._parse_key(key)
+
+    def __getitem__(self, key):
+        self._parse_key(key)
+        return super(LazyParsedAccount, self).__getitem__(key)
+
+    def get(self, key, default=None):
+        self._parse_key(key)
+        return super(LazyParsedAccount, self).get(key, default)
+
+    def items(self):
+        self.parse_all()
+        return super(LazyParsedAccount, self).items()
+
+    def values(self):
+        self.parse_all()
+        return super(LazyParsedAccount, self).values()
+
+    def copy(self):
+        self.parse_all()
+        return super(LazyParsedAccount, self).copy()
+
+
 class AccountsObject(list):
     def printAsTable(self):
         t = PrettyTable(["Name"])
@@ -3195,27 +3311,339 @@ class Accounts(AccountsObject):
         :param list name_list: list of accounts to fetch
         :param int batch_limit: (optional) maximum number of accounts
             to fetch per call, defaults to 100
+        :param int rpc_batch_size: (optional) number of calls which are sent
+            as one JSON-RPC batch array, defaults to 1
+        :param int thread_num: (optional) number of calls which are sent at
+            the same time, defaults to 1
         :param Steem steem_instance: Steem() instance to use when
             accessing a RPCcreator = Account(creator, steem_instance=self)
+
+        For large lists, :class:`AccountsLoader` streams the accounts instead
+        of keeping all of them.
     """
-    def __init__(self, name_list, batch_limit=100, lazy=False, full=True, steem_instance=None):
+    def __init__(self, name_list, batch_limit=100, lazy=False, full=True, rpc_batch_size=1, thread_num=1,
+                 steem_instance=None):
         self.steem = steem_instance or shared_steem_instance()
         if not self.steem.is_connected():
             return
-        accounts = []
-        name_cnt = 0
-
-        while name_cnt < len(name_list):
-            self.steem.rpc.set_next_node_on_empty_reply(False)
-            if self.steem.rpc.get_use_appbase():
-                accounts += self.steem.rpc.find_accounts({'accounts': name_list[name_cnt:batch_limit + name_cnt]}, api="database")["accounts"]
-            else:
-                accounts += self.steem.rpc.get_accounts(name_list[name_cnt:batch_limit + name_cnt])
-            name_cnt += batch_limit
+        loader = AccountsLoader(name_list, batch_limit=batch_limit, rpc_batch_size=rpc_batch_size,
+                                thread_num=thread_num, steem_instance=self.steem)
 
         super(Accounts, self).__init__(
             [
                 Account(x, lazy=lazy, full=full, steem_instance=self.steem)
-                for x in accounts
+                for x in loader.raw_accounts()
             ]
         )
+
+
+class AccountsHistory(object):
+    """ Fetches the history of many accounts concurrently
+
+        :param list accounts: list of account names or :class:`Account` objects
+        :param start: start number/date of operations to return (*optional*)
+        :type start: int, datetime
+        :param stop: stop number/date of operations to return (*optional*)
+        :type stop: int, datetime
+        :param bool use_block_num: if true, start and stop are block numbers,
+            otherwise virtual OP count numbers.
+        :param array only_ops: Limit the history to these operations (*optional*)
+        :param array exclude_ops: Exclude these operations (*optional*)
+        :param int batch_size: internal api call batch size (*optional*)
+        :param int thread_num: maximum number of accounts, whose history is
+            fetched at the same time (default is 8)
+        :param Steem steem_instance: Steem instance
+
+        The history of every account is fetched by :func:`Account.history` in
+        a pool of thread_num threads, each with its own Steem instance on the
+        working nodes of steem_instance. A
+        :class:`beem.historystore.HistoryStore` of steem_instance is used by
+        all threads.
+
+        .. code-block:: python
+
+            from datetime import datetime, timedelta
+            from beem.account import AccountsHistory
+            stop = datetime.utcnow()
+            accounts_history = AccountsHistory(["gtg", "holger80"], start=stop - timedelta(days=7),
+                                               stop=stop, only_ops=["transfer"])
+            for op in accounts_history.history():
+                print(op["timestamp"], op["account"], op["amount"])
+
+        The history of an account which could not be fetched is skipped and
+        the exception is stored in ``errors``.
+
+    """
+    def __init__(self, accounts, start=None, stop=None, use_block_num=True, only_ops=[], exclude_ops=[],
+                 batch_size=1000, thread_num=8, steem_instance=None):
+        self.steem = steem_instance or shared_steem_instance()
+        self.accounts = [a["name"] if isinstance(a, dict) else a for a in accounts]
+        self.start = start
+        self.stop = stop
+        self.use_block_num = use_block_num
+        self.only_ops = only_ops
+        self.exclude_ops = exclude_ops
+        self.batch_size = batch_size
+        self.thread_num = thread_num
+        self.errors = {}
+        self._steem_instances = None
+
+    def _get_steem_instances(self):
+        """ Returns a queue with one Steem instance per thread"""
+        if self._steem_instances is None:
+            self._steem_instances = steem_instance_queue(self.steem, self.thread_num)
+        return self._steem_instances
+
+    def _get_account_history(self, name, steem, raw_output=False):
+        """ Returns the history of one account as list"""
+        account = Account(name, steem_instance=steem)
+        return list(account.history(start=self.start, stop=self.stop, use_block_num=self.use_block_num,
+                                    only_ops=self.only_ops, exclude_ops=self.exclude_ops,
+                                    batch_size=self.batch_size, raw_output=raw_output))
+
+    def _fetch(self, name, raw_output=False):
+        steem_instances = self._get_steem_instances()
+        steem = steem_instances.get()
+        try:
+            return self._get_account_history(name, steem, raw_output=raw_output)
+        finally:
+            steem_instances.put(steem)
+
+    def history_by_account(self, raw_output=False):
+        """ Yields ``(account name, list of operations)`` for every account, in
+            the order in which the accounts are finished
+
+            :param bool raw_output: if False, the operations are dicts, which
+                include all values. Otherwise, they are lists as returned by
+                the node.
+        """
+        self.errors = {}
+        if not self.steem.is_connected():
+            raise OfflineHasNoRPCException("No RPC available in offline mode!")
+        if FUTURES_MODULE is None or self.thread_num <= 1:
+            if FUTURES_MODULE is None:
+                log.warning("concurrent.futures is not available, accounts are fetched one after another")
+            for name in self.accounts:
+                try:
+                    yield name, self._get_account_history(name, self.steem, raw_output=raw_output)
+                except Exception as e:
+                    log.error("Could not fetch the history of %s: %s" % (name, str(e)))
+                    self.errors[name] = e
+            return
+        pool = ThreadPoolExecutor(max_workers=self.thread_num)
+        try:
+            futures = {pool.submit(self._fetch, name, raw_output=raw_output): name for name in self.accounts}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    ops = future.result()
+                except Exception as e:
+                    log.error("Could not fetch the history of %s: %s" % (name, str(e)))
+                    self.errors[name] = e
+                    continue
+                yield name, ops
+        finally:
+            pool.shutdown(wait=False)
+
+    def history(self, raw_output=False, reverse=False):
+        """ Returns a generator for the operations of all accounts in one
+            stream, ordered by time. Operations at the same time are ordered
+            by their position in the block.
+
+            :param bool raw_output: if False, the operations are dicts, which
+                include all values. Otherwise, ``(account name, [index, event])``
+                tuples are yielded.
+            :param bool reverse: if True, the latest operation is first
+
+            The operations are yielded when the history of all accounts was fetched.
+        """
+        def sort_key(event):
+            return (event["timestamp"], event["block"], event.get("trx_in_block", 0),
+                    event.get("op_in_trx", 0), event.get("virtual_op", 0))
+
+        streams = []
+        for n, (name, ops) in enumerate(self.history_by_account(raw_output=raw_output)):
+            if raw_output:
+                keyed = [(sort_key(item[1]), n, item[0], (name, item)) for item in ops]
+            else:
+                keyed = [(sort_key(op), n, op["index"], op) for op in ops]
+            streams.append(keyed)
+        merged = heapq.merge(*streams)
+        if reverse:
+            merged = reversed(list(merged))
+        for entry in merged:
+            yield entry[3]
+
+
+class AccountsLoader(object):
+    """ Loads many accounts in batches
+
+        :param list accounts: list of account names
+        :param int batch_limit: maximum number of accounts fetched by one
+            find_accounts/get_accounts call (default is 100)
+        :param int rpc_batch_size: number of calls which are sent together as
+            one JSON-RPC batch array (default is 1, no batch array). When the
+            node does not support batch arrays, the calls are sent one by one
+        :param int thread_num: number of requests which are sent at the same
+            time, each thread uses its own Steem instance (default is 1)
+        :param bool lazy_parse: if True, :func:`accounts` returns
+            :class:`LazyParsedAccount` objects, which parse their fields when
+            they are first accessed
+        :param Steem steem_instance: Steem instance
+
+        The accounts are returned in the order of the list. Accounts which
+        do not exist are skipped.
+
+        .. code-block:: python
+
+            from beem.account import AccountsLoader
+            from beem.blockchain import Blockchain
+            names = list(Blockchain().get_all_accounts(limit=10000))
+            loader = AccountsLoader(names, rpc_batch_size=10, thread_num=4)
+            for account in loader.accounts():
+                print(account["name"], account["balance"])
+            columns = loader.columns(["name", "vesting_shares", "created"])
+
+    """
+    def __init__(self, accounts, batch_limit=100, rpc_batch_size=1, thread_num=1, lazy_parse=False,
+                 steem_instance=None):
+        self.steem = steem_instance or shared_steem_instance()
+        self.names = [a["name"] if isinstance(a, dict) else a for a in accounts]
+        self.batch_limit = batch_limit
+        self.rpc_batch_size = rpc_batch_size
+        self.thread_num = thread_num
+        self.lazy_parse = lazy_parse
+        self._batch_not_supported = False
+        self._steem_instances = None
+
+    def _get_steem_instances(self):
+        """ Returns a queue with one Steem instance per thread"""
+        if self._steem_instances is None:
+            self._steem_instances = steem_instance_queue(self.steem, self.thread_num)
+        return self._steem_instances
+
+    def _get_requests(self):
+        """ Returns the name lists of all requests, one request holds
+            rpc_batch_size calls of batch_limit names
+        """
+        calls = [self.names[i:i + self.batch_limit] for i in range(0, len(self.names), self.batch_limit)]
+        batch_size = max(self.rpc_batch_size, 1)
+        return [calls[i:i + batch_size] for i in range(0, len(calls), batch_size)]
+
+    def _get_accounts(self, calls, steem):
+        """ Fetches the accounts of all calls with one request. When the node
+            does not support batched calls, the calls are sent one by one.
+        """
+        steem.rpc.set_next_node_on_empty_reply(False)
+        if len(calls) == 1:
+            if steem.rpc.get_use_appbase():
+                return steem.rpc.find_accounts({'accounts': calls[0]}, api="database")["accounts"]
+            return steem.rpc.get_accounts(calls[0])
+        accounts = []
+        if self._batch_not_supported:
+            for names in calls:
+                accounts.extend(self._get_accounts([names], steem))
+            return accounts
+        try:
+            if steem.rpc.get_use_appbase():
+                replies = steem.rpc.find_accounts([{'accounts': names} for names in calls], api="database")
+            else:
+                for names in calls[:-1]:
+                    steem.rpc.get_accounts(names, add_to_queue=True)
+                replies = steem.rpc.get_accounts(calls[-1], add_to_queue=False)
+            if not isinstance(replies, list) or len(replies) != len(calls):
+                raise BatchedCallsNotSupported()
+        except BatchedCallsNotSupported:
+            log.warning("Batched calls are not supported, accounts are fetched with one call per batch_limit names")
+            self._batch_not_supported = True
+            return self._get_accounts(calls, steem)
+        for reply in replies:
+            if isinstance(reply, dict):
+                reply = reply["accounts"]
+            accounts.extend(reply)
+        return accounts
+
+    def _fetch(self, calls):
+        steem_instances = self._get_steem_instances()
+        steem = steem_instances.get()
+        try:
+            return self._get_accounts(calls, steem)
+        finally:
+            steem_instances.put(steem)
+
+    def raw_accounts(self):
+        """ Returns a generator for the account dicts as returned by the node"""
+        if not self.steem.is_connected():
+            raise OfflineHasNoRPCException("No RPC available in offline mode!")
+        requests = self._get_requests()
+        if FUTURES_MODULE is None or self.thread_num <= 1:
+            if FUTURES_MODULE is None and self.thread_num > 1:
+                log.warning("concurrent.futures is not available, accounts are fetched one after another")
+            for calls in requests:
+                for account in self._get_accounts(calls, self.steem):
+                    yield account
+            return
+        pool = ThreadPoolExecutor(max_workers=self.thread_num)
+        try:
+            # Keep at most two requests per thread in flight, so that the
+            # accounts are streamed instead of collected
+            futures = []
+            for calls in requests:
+                futures.append(pool.submit(self._fetch, calls))
+                if len(futures) < 2 * self.thread_num:
+                    continue
+                for account in futures.pop(0).result():
+                    yield account
+            for future in futures:
+                for account in future.result():
+                    yield account
+        finally:
+            pool.shutdown(wait=False)
+
+    def accounts(self):
+        """ Returns a generator for :class:`Account` objects, or
+            :class:`LazyParsedAccount` objects with lazy_parse
+        """
+        klass = LazyParsedAccount if self.lazy_parse else Account
+        for account in self.raw_accounts():
+            yield klass(account, steem_instance=self.steem)
+
+    def _parse_column_value(self, key, value):
+        if key in Account._amount_fields:
+            if isinstance(value, string_types):
+                return float(value.split(" ")[0])
+            elif isinstance(value, dict) and "amount" in value and "precision" in value:
+                return int(value["amount"]) / 10 ** int(value["precision"])
+            return float(Amount(value, steem_instance=self.steem))
+        elif key in Account._time_fields:
+            return formatToTimeStamp(formatTimeString(value))
+        elif key in Account._int_fields:
+            return int(value)
+        return value
+
+    def columns(self, fields=["name", "balance", "sbd_balance", "vesting_shares", "delegated_vesting_shares",
+                              "received_vesting_shares", "reputation", "post_count", "created"]):
+        """ Returns the accounts as compact columns
+
+            :param list fields: account fields which are returned
+            :returns: dict with a list for each field
+
+            Amounts are returned as float, timestamps as unix timestamps and
+            integer fields as int, without creating :class:`Account` or
+            :class:`beem.amount.Amount` objects per account. Missing fields
+            are None.
+
+            .. code-block:: python
+
+                columns = AccountsLoader(names).columns(["name", "vesting_shares"])
+                total_vests = sum(columns["vesting_shares"])
+
+        """
+        columns = {key: [] for key in fields}
+        for account in self.raw_accounts():
+            for key in fields:
+                value = account.get(key)
+                if value is not None:
+                    value = self._parse_column_value(key, value)
+                columns[key].append(value)
+        return columns
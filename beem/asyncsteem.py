@@ -0,0 +1,212 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import ast
+import asyncio
+import logging
+from beemapi.asyncrpc import AsyncSteemNodeRPC
+from beemapi.exceptions import ApiNotSupported
+from .storage import configStorage as config
+from .exceptions import BlockDoesNotExistsException, OfflineHasNoRPCException
+
+log = logging.getLogger(__name__)
+
+
+class AsyncSteem(object):
+    """ Connect to the Steem network with a non-blocking asyncio rpc.
+
+        :param str node: Node to connect to *(optional)*
+        :param str rpcuser: RPC user *(optional)*
+        :param str rpcpassword: RPC password *(optional)*
+        :param int num_retries: Set the maximum number of reconnects to the nodes before
+            NumRetriesReached is raised. Disabled for -1. (default is -1)
+        :param int num_retries_call: Repeat num_retries_call times a rpc call on node error (default is 5)
+        :param int timeout: Timeout setting for https nodes (default is 60)
+        :param int max_connections: Maximum number of simultaneous http connections (default is 100)
+        :param bool use_condenser: Use the old condenser_api rpc protocol on nodes with version
+            0.19.4 or higher.
+
+        All calls are coroutines, so that one process can keep hundreds of
+        calls in flight with a single instance. The raw rpc is available as
+        ``AsyncSteem.rpc``, all api calls of :class:`beemapi.steemnoderpc.SteemNodeRPC`
+        can be awaited there.
+
+        .. note:: beem.asyncsteem needs Python 3.5 or newer and aiohttp, and
+                  is not imported by ``from beem import *``.
+
+        .. code-block:: python
+
+            import asyncio
+            from beem.asyncsteem import AsyncSteem
+
+            async def main():
+                async with AsyncSteem(node="https://api.steemit.com") as stm:
+                    blocks = await stm.get_blocks(range(1, 1001))
+
+            asyncio.get_event_loop().run_until_complete(main())
+
+    """
+
+    def __init__(self,
+                 node="",
+                 rpcuser=None,
+                 rpcpassword=None,
+                 **kwargs):
+        self.rpc = None
+        self.offline = bool(kwargs.get("offline", False))
+        self.node = node
+        self.rpcuser = rpcuser
+        self.rpcpassword = rpcpassword
+        self.kwargs = kwargs
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def connect(self, node="", rpcuser="", rpcpassword="", **kwargs):
+        """ Connect to Steem network
+        """
+        if self.offline:
+            return
+        node = node or self.node
+        rpcuser = rpcuser or self.rpcuser
+        rpcpassword = rpcpassword or self.rpcpassword
+        kwargs = dict(self.kwargs, **kwargs)
+        if not node:
+            node = self.get_default_nodes()
+            if not bool(node):
+                raise ValueError("A Steem node needs to be provided!")
+
+        if not rpcuser and "rpcuser" in config:
+            rpcuser = config["rpcuser"]
+
+        if not rpcpassword and "rpcpassword" in config:
+            rpcpassword = config["rpcpassword"]
+
+        self.rpc = AsyncSteemNodeRPC(node, rpcuser, rpcpassword, **kwargs)
+        await self.rpc.rpcconnect()
+
+    async def close(self):
+        """Closes all open connections"""
+        if self.rpc is not None:
+            await self.rpc.rpcclose()
+
+    def is_connected(self):
+        """Returns if rpc is connected"""
+        return self.rpc is not None
+
+    def get_default_nodes(self):
+        """Returns the default nodes"""
+        if "node" in config:
+            nodes = config["node"]
+        elif "nodes" in config:
+            nodes = config["nodes"]
+        elif "default_nodes" in config and bool(config["default_nodes"]):
+            nodes = config["default_nodes"]
+        else:
+            nodes = []
+        if isinstance(nodes, str) and nodes[0] == '[' and nodes[-1] == ']':
+            nodes = ast.literal_eval(nodes)
+        return nodes
+
+    def __repr__(self):
+        if self.offline:
+            return "<%s offline=True>" % (
+                self.__class__.__name__)
+        elif self.rpc is not None and self.rpc.url:
+            return "<%s node=%s>" % (
+                self.__class__.__name__, str(self.rpc.url))
+        else:
+            return "<%s>" % (self.__class__.__name__)
+
+    def _check_connected(self):
+        if not self.is_connected():
+            raise OfflineHasNoRPCException("No RPC available in offline mode!")
+
+    async def get_dynamic_global_properties(self):
+        """ This call returns the *dynamic global properties*
+        """
+        self._check_connected()
+        return await self.rpc.get_dynamic_global_properties(api="database")
+
+    async def get_config(self):
+        """ Returns internal chain configuration.
+        """
+        self._check_connected()
+        return await self.rpc.get_config(api="database")
+
+    async def get_block(self, block_num, only_ops=False, only_virtual_ops=False):
+        """ Returns the block (or only its operations) as dict, like
+            :class:`beem.block.Block` would receive it from the node.
+
+            :param int block_num: block number
+            :param bool only_ops: Includes only operations, when set to True (default: False)
+            :param bool only_virtual_ops: Includes only virtual operations (default: False)
+        """
+        self._check_connected()
+        if only_ops or only_virtual_ops:
+            if self.rpc.get_use_appbase():
+                try:
+                    ops = (await self.rpc.get_ops_in_block({"block_num": block_num, 'only_virtual': only_virtual_ops}, api="account_history"))["ops"]
+                except ApiNotSupported:
+                    ops = await self.rpc.get_ops_in_block(block_num, only_virtual_ops, api="condenser")
+            else:
+                ops = await self.rpc.get_ops_in_block(block_num, only_virtual_ops)
+            if bool(ops):
+                block = {'block': ops[0]["block"],
+                         'timestamp': ops[0]["timestamp"],
+                         'operations': ops}
+            else:
+                block = {'block': block_num,
+                         'timestamp': "1970-01-01T00:00:00",
+                         'operations': []}
+        else:
+            if self.rpc.get_use_appbase():
+                try:
+                    block = await self.rpc.get_block({"block_num": block_num}, api="block")
+                    if block and "block" in block:
+                        block = block["block"]
+                except ApiNotSupported:
+                    block = await self.rpc.get_block(block_num, api="condenser")
+            else:
+                block = await self.rpc.get_block(block_num)
+        if not block:
+            raise BlockDoesNotExistsException("output: %s of identifier %s" % (str(block), str(block_num)))
+        return block
+
+    async def get_blocks(self, block_nums, only_ops=False, only_virtual_ops=False, max_concurrency=100):
+        """ Fetches many blocks concurrently and returns them in the order of block_nums
+
+            :param list block_nums: block numbers
+            :param int max_concurrency: maximum number of calls in flight (default is 100)
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(block_num):
+            async with semaphore:
+                return await self.get_block(block_num, only_ops=only_ops, only_virtual_ops=only_virtual_ops)
+        return await asyncio.gather(*[fetch(block_num) for block_num in block_nums])
+
+    async def get_account_history(self, account, start=-1, limit=0):
+        """ Returns raw account history entries as ``[index, op]`` pairs
+
+            :param str account: account name
+            :param int start: last op index which is returned (-1 for the newest op)
+            :param int limit: number of ops before start which are returned
+        """
+        self._check_connected()
+        if self.rpc.get_use_appbase():
+            try:
+                ret = (await self.rpc.get_account_history({'account': account, 'start': start, 'limit': limit}, api="account_history"))['history']
+            except ApiNotSupported:
+                ret = await self.rpc.get_account_history(account, start, limit, api="condenser")
+        else:
+            ret = await self.rpc.get_account_history(account, start, limit, api="database")
+            if len(ret) == 0 and limit == 0:
+                ret = await self.rpc.get_account_history(account, start, limit + 1, api="database")
+        return ret
@@ -7,7 +7,7 @@ from datetime import datetime, timedelta, date
 import json
 from .exceptions import BlockDoesNotExistsException
 from .utils import parse_time, formatTimeString
-from .blockchainobject import BlockchainObject
+from .blockchainobject import BlockchainObject, ObjectCache
 from beemapi.exceptions import ApiNotSupported
 from beemgraphenebase.py23 import bytes_types, integer_types, string_types, text_type
 
@@ -39,9 +39,13 @@ class Block(BlockchainObject):
 
         .. note:: This class comes with its own caching function to reduce the
                   load on the API server. Instances of this class can be
-                  refreshed with ``Account.refresh()``.
+                  refreshed with ``Account.refresh()``. When the Steem instance
+                  has a :class:`beem.blockstore.BlockStore`, irreversible blocks
+                  are read from it and stored into it.
 
     """
+    _cache = ObjectCache(max_entries=1000)
+
     def __init__(
         self,
         block,
@@ -125,6 +129,13 @@ class Block(BlockchainObject):
         """
         if self.identifier is None:
             return
+        block_store = getattr(self.steem, "block_store", None)
+        if block_store is not None:
+            block = block_store.get(self.identifier, only_ops=self.only_ops, only_virtual_ops=self.only_virtual_ops)
+            if block is not None:
+                block = self._parse_json_data(block)
+                super(Block, self).__init__(block, lazy=self.lazy, full=self.full, steem_instance=self.steem)
+                return
         if not self.steem.is_connected():
             return
         self.steem.rpc.set_next_node_on_empty_reply(False)
@@ -156,6 +167,10 @@ class Block(BlockchainObject):
                 block = self.steem.rpc.get_block(self.identifier)
         if not block:
             raise BlockDoesNotExistsException("output: %s of identifier %s" % (str(block), str(self.identifier)))
+        if block_store is not None:
+            if block_store.last_irreversible_block_num is None:
+                self.steem.get_dynamic_global_properties(False)
+            block_store.store(self.identifier, block, only_ops=self.only_ops, only_virtual_ops=self.only_virtual_ops)
         block = self._parse_json_data(block)
         super(Block, self).__init__(block, lazy=self.lazy, full=self.full, steem_instance=self.steem)
 
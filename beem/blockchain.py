@@ -12,6 +12,7 @@ import time
 import hashlib
 import json
 import math
+from types import GeneratorType
 from threading import Thread, Event
 from time import sleep
 import logging
@@ -23,7 +24,7 @@ from beemapi.steemnoderpc import SteemNodeRPC
 from .exceptions import BatchedCallsNotSupported, BlockDoesNotExistsException, BlockWaitTimeExceeded, OfflineHasNoRPCException
 from beemapi.exceptions import NumRetriesReached
 from beemgraphenebase.py23 import py23_bytes
-from beem.instance import shared_steem_instance
+from beem.instance import shared_steem_instance, steem_instance_queue
 from .amount import Amount
 import beem as stm
 log = logging.getLogger(__name__)
@@ -34,7 +35,7 @@ else:
 FUTURES_MODULE = None
 if not FUTURES_MODULE:
     try:
-        from concurrent.futures import ThreadPoolExecutor, wait, as_completed
+        from concurrent.futures import ThreadPoolExecutor
         FUTURES_MODULE = "futures"
         # FUTURES_MODULE = None
     except ImportError:
@@ -373,9 +374,12 @@ class Blockchain(object):
             :param int start: Starting block
             :param int stop: Stop at this block
             :param int max_batch_size: only for appbase nodes. When not None, batch calls of are used.
-                Cannot be combined with threading
-            :param bool threading: Enables threading. Cannot be combined with batch calls
+                When combined with threading, every thread fetches ranges of max_batch_size
+                blocks with one batched call.
+            :param bool threading: Enables threading
             :param int thread_num: Defines the number of threads, when `threading` is set.
+                The threads keep fetching blocks in a sliding window ahead of the yielded block,
+                blocks are still yielded in order.
             :param bool only_ops: Only yield operations (default: False).
                 Cannot be combined with ``only_virtual_ops=True``.
             :param bool only_virtual_ops: Only yield virtual operations (default: False)
@@ -392,18 +396,13 @@ class Blockchain(object):
         if not start:
             start = current_block_num
         head_block_reached = False
-        if threading and FUTURES_MODULE is not None:
-            pool = ThreadPoolExecutor(max_workers=thread_num)
-        elif threading:
-            pool = Pool(thread_num, batch_mode=True)
+        if threading and FUTURES_MODULE is None:
+            log.warning("concurrent.futures is not available, blocks are fetched without threading")
+            threading = False
         if threading:
-            steem_instance = [self.steem]
-            nodelist = self.steem.rpc.nodes.export_working_nodes()
-            for i in range(thread_num - 1):
-                steem_instance.append(stm.Steem(node=nodelist,
-                                                num_retries=self.steem.rpc.num_retries,
-                                                num_retries_call=self.steem.rpc.num_retries_call,
-                                                timeout=self.steem.rpc.timeout))
+            # Every worker thread needs its own Steem instance, they are
+            # handed out through a queue to whichever thread is free
+            steem_instances = steem_instance_queue(self.steem, thread_num)
         # We are going to loop indefinitely
         latest_block = 0
         while True:
@@ -413,77 +412,10 @@ class Blockchain(object):
                 current_block_num = self.get_current_block_num()
                 head_block = current_block_num
             if threading and not head_block_reached:
-                latest_block = start - 1
-                result_block_nums = []
-                for blocknum in range(start, head_block + 1, thread_num):
-                    # futures = []
-                    i = 0
-                    if FUTURES_MODULE is not None:
-                        futures = []
-                    block_num_list = []
-                    # freeze = self.steem.rpc.nodes.freeze_current_node
-                    num_retries = self.steem.rpc.nodes.num_retries
-                    # self.steem.rpc.nodes.freeze_current_node = True
-                    self.steem.rpc.nodes.num_retries = thread_num
-                    error_cnt = self.steem.rpc.nodes.node.error_cnt
-                    while i < thread_num and blocknum + i <= head_block:
-                        block_num_list.append(blocknum + i)
-                        results = []
-                        if FUTURES_MODULE is not None:
-                            futures.append(pool.submit(Block, blocknum + i, only_ops=only_ops, only_virtual_ops=only_virtual_ops, steem_instance=steem_instance[i]))
-                        else:
-                            pool.enqueue(Block, blocknum + i, only_ops=only_ops, only_virtual_ops=only_virtual_ops, steem_instance=steem_instance[i])
-                        i += 1
-                    if FUTURES_MODULE is not None:
-                        try:
-                            results = [r.result() for r in as_completed(futures)]
-                        except Exception as e:
-                            log.error(str(e))
-                    else:
-                        pool.run(True)
-                        pool.join()
-                        for result in pool.results():
-                            results.append(result)
-                        pool.abort()
-                    self.steem.rpc.nodes.num_retries = num_retries
-                    # self.steem.rpc.nodes.freeze_current_node = freeze
-                    new_error_cnt = self.steem.rpc.nodes.node.error_cnt
-                    self.steem.rpc.nodes.node.error_cnt = error_cnt
-                    if new_error_cnt > error_cnt:
-                        self.steem.rpc.nodes.node.error_cnt += 1
-                    #    self.steem.rpc.next()
-
-                    checked_results = []
-                    for b in results:
-                        if b.block_num is not None and int(b.block_num) not in result_block_nums:
-                            b["id"] = b.block_num
-                            b.identifier = b.block_num
-                            checked_results.append(b)
-                            result_block_nums.append(int(b.block_num))
-
-                    missing_block_num = list(set(block_num_list).difference(set(result_block_nums)))
-                    while len(missing_block_num) > 0:
-                        for blocknum in missing_block_num:
-                            try:
-                                block = Block(blocknum, only_ops=only_ops, only_virtual_ops=only_virtual_ops, steem_instance=self.steem)
-                                checked_results.append(block)
-                                result_block_nums.append(int(block.block_num))
-                            except Exception as e:
-                                log.error(str(e))
-                        missing_block_num = list(set(block_num_list).difference(set(result_block_nums)))
-                    from operator import itemgetter
-                    blocks = sorted(checked_results, key=itemgetter('id'))
-                    for b in blocks:
-                        if latest_block < int(b.block_num):
-                            latest_block = int(b.block_num)
-                        yield b
-
-                if latest_block <= head_block:
-                    for blocknum in range(latest_block + 1, head_block + 1):
-                        if blocknum not in result_block_nums:
-                            block = Block(blocknum, only_ops=only_ops, only_virtual_ops=only_virtual_ops, steem_instance=self.steem)
-                            result_block_nums.append(blocknum)
-                            yield block
+                for block in self._prefetch_blocks(start, head_block, steem_instances, thread_num,
+                                                   batch_size=max_batch_size or 1,
+                                                   only_ops=only_ops, only_virtual_ops=only_virtual_ops):
+                    yield block
             elif max_batch_size is not None and (head_block - start) >= max_batch_size and not head_block_reached:
                 if not self.steem.is_connected():
                     raise OfflineHasNoRPCException("No RPC available in offline mode!")
@@ -494,46 +426,53 @@ class Blockchain(object):
                     # Get full block
                     if (head_block - blocknumblock) < batches:
                         batches = head_block - blocknumblock + 1
+                    if self.steem.block_store is not None:
+                        stored = self.steem.block_store.get_range(blocknumblock, blocknumblock + batches - 1, only_ops=only_ops, only_virtual_ops=only_virtual_ops)
+                        if len(stored) == batches:
+                            for blocknum in range(blocknumblock, blocknumblock + batches):
+                                block = Block(stored[blocknum], only_ops=only_ops, only_virtual_ops=only_virtual_ops, steem_instance=self.steem)
+                                block["id"] = block.block_num
+                                block.identifier = block.block_num
+                                yield block
+                            latest_block = blocknumblock + batches - 1
+                            continue
+                    if only_ops or only_virtual_ops:
+                        # get_ops_in_block replies are unpacked into blocks by _get_block_batch
+                        for block in self._get_block_batch(list(range(blocknumblock, blocknumblock + batches)), self.steem,
+                                                           only_ops=only_ops, only_virtual_ops=only_virtual_ops):
+                            block["id"] = block.block_num
+                            block.identifier = block.block_num
+                            yield block
+                        latest_block = blocknumblock + batches - 1
+                        continue
                     for blocknum in range(blocknumblock, blocknumblock + batches - 1):
-                        if only_virtual_ops:
-                            if self.steem.rpc.get_use_appbase():
-                                # self.steem.rpc.get_ops_in_block({"block_num": blocknum, 'only_virtual': only_virtual_ops}, api="account_history", add_to_queue=True)
-                                self.steem.rpc.get_ops_in_block(blocknum, only_virtual_ops, add_to_queue=True)
-                            else:
-                                self.steem.rpc.get_ops_in_block(blocknum, only_virtual_ops, add_to_queue=True)
+                        if self.steem.rpc.get_use_appbase():
+                            self.steem.rpc.get_block({"block_num": blocknum}, api="block", add_to_queue=True)
                         else:
-                            if self.steem.rpc.get_use_appbase():
-                                self.steem.rpc.get_block({"block_num": blocknum}, api="block", add_to_queue=True)
-                            else:
-                                self.steem.rpc.get_block(blocknum, add_to_queue=True)
+                            self.steem.rpc.get_block(blocknum, add_to_queue=True)
                         latest_block = blocknum
                     if batches >= 1:
                         latest_block += 1
                     if latest_block <= head_block:
-                        if only_virtual_ops:
-                            if self.steem.rpc.get_use_appbase():
-                                # self.steem.rpc.get_ops_in_block({"block_num": blocknum, 'only_virtual': only_virtual_ops}, api="account_history", add_to_queue=False)
-                                block_batch = self.steem.rpc.get_ops_in_block(blocknum, only_virtual_ops, add_to_queue=False)
-                            else:
-                                block_batch = self.steem.rpc.get_ops_in_block(blocknum, only_virtual_ops, add_to_queue=False)
+                        if self.steem.rpc.get_use_appbase():
+                            block_batch = self.steem.rpc.get_block({"block_num": latest_block}, api="block", add_to_queue=False)
                         else:
-                            if self.steem.rpc.get_use_appbase():
-                                block_batch = self.steem.rpc.get_block({"block_num": latest_block}, api="block", add_to_queue=False)
-                            else:
-                                block_batch = self.steem.rpc.get_block(latest_block, add_to_queue=False)
+                            block_batch = self.steem.rpc.get_block(latest_block, add_to_queue=False)
                         if not bool(block_batch):
                             raise BatchedCallsNotSupported()
                         blocknum = latest_block - len(block_batch) + 1
                         if not isinstance(block_batch, list):
                             block_batch = [block_batch]
+                        raw_blocks = []
                         for block in block_batch:
                             if not bool(block):
                                 continue
                             if self.steem.rpc.get_use_appbase():
-                                if only_virtual_ops:
-                                    block = block["ops"]
-                                else:
-                                    block = block["block"]
+                                block = block["block"]
+                            raw_blocks.append(block)
+                        if self.steem.block_store is not None:
+                            self.steem.block_store.store_many([(int(block["block_id"][:8], base=16), block) for block in raw_blocks if "block_id" in block])
+                        for block in raw_blocks:
                             block = Block(block, only_ops=only_ops, only_virtual_ops=only_virtual_ops, steem_instance=self.steem)
                             block["id"] = block.block_num
                             block.identifier = block.block_num
@@ -555,6 +494,146 @@ class Blockchain(object):
             # Sleep for one block
             time.sleep(self.block_interval)
 
+    def _prefetch_blocks(self, start, stop, steem_instances, thread_num, batch_size=1, only_ops=False, only_virtual_ops=False):
+        """ Yields the blocks from start to stop in order, while they are fetched by
+            thread_num worker threads.
+
+            Each request covers batch_size consecutive blocks, which are fetched with
+            one batched call when batch_size is larger than one. The workers always
+            have up to ``4 * thread_num`` requests queued, so that a slow request only
+            delays the blocks it belongs to and not the requests behind it. Finished
+            requests wait in a reorder buffer until all blocks before them were yielded.
+        """
+        window = 4 * thread_num
+        chunk_starts = list(range(start, stop + 1, batch_size))
+        batch_not_supported = Event()
+        pending = {}
+        next_submit = 0
+        pool = ThreadPoolExecutor(max_workers=thread_num)
+        try:
+            for i, chunk_start in enumerate(chunk_starts):
+                while next_submit < len(chunk_starts) and next_submit - i < window:
+                    submit_start = chunk_starts[next_submit]
+                    block_nums = list(range(submit_start, min(submit_start + batch_size, stop + 1)))
+                    pending[next_submit] = pool.submit(self._get_blocks_with_retry, block_nums, steem_instances,
+                                                       batch_not_supported, only_ops=only_ops,
+                                                       only_virtual_ops=only_virtual_ops)
+                    next_submit += 1
+                try:
+                    blocks = pending.pop(i).result()
+                except Exception as e:
+                    log.error(str(e))
+                    blocks = [self.wait_for_and_get_block(blocknum, only_ops=only_ops, only_virtual_ops=only_virtual_ops)
+                              for blocknum in range(chunk_start, min(chunk_start + batch_size, stop + 1))]
+                for block in blocks:
+                    block["id"] = block.block_num
+                    block.identifier = block.block_num
+                    yield block
+        finally:
+            for future in pending.values():
+                future.cancel()
+            pool.shutdown(wait=False)
+
+    def _get_blocks_with_retry(self, block_nums, steem_instances, batch_not_supported, only_ops=False, only_virtual_ops=False, retries=3):
+        """ Fetches the blocks in block_nums with a Steem instance from the steem_instances queue.
+
+            More than one block is fetched with a single batched call, until a node raises
+            BatchedCallsNotSupported. Then batch_not_supported is set and all workers fetch
+            their blocks one by one. On errors, the request is repeated on the next node
+            up to retries times.
+        """
+        steem = steem_instances.get()
+        try:
+            blocks = {}
+            if steem.block_store is not None:
+                stored = steem.block_store.get_range(block_nums[0], block_nums[-1], only_ops=only_ops, only_virtual_ops=only_virtual_ops)
+                for block_number in stored:
+                    blocks[block_number] = Block(stored[block_number], only_ops=only_ops, only_virtual_ops=only_virtual_ops, steem_instance=steem)
+            cnt = 0
+            while True:
+                missing_block_nums = [block_number for block_number in block_nums if block_number not in blocks]
+                try:
+                    if len(missing_block_nums) > 1 and not batch_not_supported.is_set():
+                        for block in self._get_block_batch(missing_block_nums, steem, only_ops=only_ops, only_virtual_ops=only_virtual_ops):
+                            blocks[int(block.block_num)] = block
+                    for block_number in missing_block_nums:
+                        if block_number in blocks:
+                            continue
+                        block = Block(block_number, only_ops=only_ops, only_virtual_ops=only_virtual_ops, steem_instance=steem)
+                        if block.block_num is None or int(block.block_num) != block_number:
+                            raise BlockDoesNotExistsException("Received wrong block for %d" % block_number)
+                        blocks[block_number] = block
+                    return [blocks[block_number] for block_number in block_nums]
+                except BatchedCallsNotSupported:
+                    log.warning("Batched calls are not supported, blocks are fetched one by one")
+                    batch_not_supported.set()
+                except Exception as e:
+                    cnt += 1
+                    if cnt >= retries:
+                        raise
+                    log.warning("Retry blocks %d - %d: %s" % (block_nums[0], block_nums[-1], str(e)))
+                    if steem.rpc.nodes.working_nodes_count > 1:
+                        steem.rpc.next()
+        finally:
+            steem_instances.put(steem)
+
+    def _get_block_batch(self, block_nums, steem, only_ops=False, only_virtual_ops=False):
+        """ Fetches all blocks in block_nums with one batched call. The reply
+            is decoded block by block.
+        """
+        steem.rpc.set_next_node_on_empty_reply(False)
+        ops_only = only_ops or only_virtual_ops
+        if steem.rpc.get_use_appbase():
+            if ops_only:
+                block_batch = steem.rpc.get_ops_in_block([{"block_num": blocknum, 'only_virtual': only_virtual_ops} for blocknum in block_nums], api="account_history", stream_reply=True)
+            else:
+                block_batch = steem.rpc.get_block([{"block_num": blocknum} for blocknum in block_nums], api="block", stream_reply=True)
+        else:
+            for blocknum in block_nums[:-1]:
+                if ops_only:
+                    steem.rpc.get_ops_in_block(blocknum, only_virtual_ops, add_to_queue=True)
+                else:
+                    steem.rpc.get_block(blocknum, add_to_queue=True)
+            if ops_only:
+                block_batch = steem.rpc.get_ops_in_block(block_nums[-1], only_virtual_ops, add_to_queue=False, stream_reply=True)
+            else:
+                block_batch = steem.rpc.get_block(block_nums[-1], add_to_queue=False, stream_reply=True)
+        if not bool(block_batch) or not isinstance(block_batch, (list, GeneratorType)):
+            raise BatchedCallsNotSupported()
+        raw_blocks = []
+        for block in block_batch:
+            if len(raw_blocks) >= len(block_nums):
+                raise BatchedCallsNotSupported()
+            blocknum = block_nums[len(raw_blocks)]
+            if steem.rpc.get_use_appbase() and isinstance(block, dict):
+                if ops_only:
+                    block = block.get("ops")
+                else:
+                    block = block.get("block")
+            if ops_only and isinstance(block, list):
+                if bool(block):
+                    block = {'block': block[0]["block"],
+                             'timestamp': block[0]["timestamp"],
+                             'operations': block}
+                else:
+                    block = {'block': blocknum,
+                             'timestamp': "1970-01-01T00:00:00",
+                             'operations': []}
+            if not bool(block):
+                raise BlockDoesNotExistsException("output: %s of identifier %s" % (str(block), str(blocknum)))
+            raw_blocks.append((blocknum, block))
+        if len(raw_blocks) != len(block_nums):
+            raise BatchedCallsNotSupported()
+        if steem.block_store is not None:
+            steem.block_store.store_many(raw_blocks, only_ops=only_ops, only_virtual_ops=only_virtual_ops)
+        blocks = []
+        for blocknum, block in raw_blocks:
+            block = Block(block, only_ops=only_ops, only_virtual_ops=only_virtual_ops, steem_instance=steem)
+            if block.block_num is None or int(block.block_num) != blocknum:
+                raise BlockDoesNotExistsException("Received wrong block for %d" % blocknum)
+            blocks.append(block)
+        return blocks
+
     def wait_for_and_get_block(self, block_number, blocks_waiting_for=None, only_ops=False, only_virtual_ops=False, block_number_check_cnt=-1, last_current_block_num=None):
         """ Get the desired block from the chain, if the current head block is smaller (for both head and irreversible)
             then we wait, but a maxmimum of blocks_waiting_for * max_block_wait_repetition time before failure.
@@ -568,6 +647,9 @@ class Blockchain(object):
             :param int last_current_block_num: can be used to reduce the number of get_current_block_num() api calls
 
         """
+        if self.steem.block_store is not None and self.steem.block_store.is_irreversible(block_number):
+            # Irreversible blocks are read from the block store, when they are stored there
+            return Block(block_number, only_ops=only_ops, only_virtual_ops=only_virtual_ops, steem_instance=self.steem)
         if last_current_block_num is None:
             last_current_block_num = self.get_current_block_num()
         elif last_current_block_num - block_number < 50:
@@ -643,17 +725,23 @@ class Blockchain(object):
                 ops_stat = block.ops_statistics(add_to_ops_stat=ops_stat)
         return ops_stat
 
-    def stream(self, opNames=[], raw_ops=False, *args, **kwargs):
+    def stream(self, opNames=[], raw_ops=False, filter_ops=False, *args, **kwargs):
         """ Yield specific operations (e.g. comments) only
 
             :param array opNames: List of operations to filter for
             :param bool raw_ops: When set to True, it returns the unmodified operations (default: False)
+            :param bool filter_ops: When True, the cheapest api for opNames is used. When opNames has only
+                virtual operations, only virtual operations are fetched with batched get_ops_in_block calls
+                (max_batch_size is 50, when not set). (default: False)
             :param int start: Start at this block
             :param int stop: Stop at this block
             :param int max_batch_size: only for appbase nodes. When not None, batch calls of are used.
-                Cannot be combined with threading
-            :param bool threading: Enables threading. Cannot be combined with batch calls
+                When combined with threading, every thread fetches ranges of max_batch_size
+                blocks with one batched call.
+            :param bool threading: Enables threading
             :param int thread_num: Defines the number of threads, when `threading` is set.
+                The threads keep fetching blocks in a sliding window ahead of the yielded block,
+                blocks are still yielded in order.
             :param bool only_ops: Only yield operations (default: False)
                 Cannot be combined with ``only_virtual_ops=True``
             :param bool only_virtual_ops: Only yield virtual operations (default: False)
@@ -702,6 +790,13 @@ class Blockchain(object):
                 }
 
         """
+        if filter_ops and bool(opNames) and not kwargs.get("only_ops", False):
+            import beembase.operationids
+            if all(op_name in beembase.operationids.virtual_ops for op_name in opNames):
+                kwargs["only_virtual_ops"] = True
+                if kwargs.get("max_batch_size") is None:
+                    kwargs["max_batch_size"] = 50
+        op_names = set(opNames)
         for block in self.blocks(**kwargs):
             if "transactions" in block:
                 trx = block["transactions"]
@@ -715,45 +810,47 @@ class Blockchain(object):
                 if "operations" not in trx[trx_nr]:
                     continue
                 for event in trx[trx_nr]["operations"]:
+                    # The operation type is checked first, so that nothing is
+                    # computed for operations which are filtered out
                     if isinstance(event, list):
                         op_type, op = event
-                        trx_id = block["transaction_ids"][trx_nr]
-                        block_num = block.get("id")
-                        _id = self.hash_op(event)
-                        timestamp = block.get("timestamp")
+                        op_event = None
                     elif isinstance(event, dict) and "type" in event and "value" in event:
                         op_type = event["type"]
-                        if len(op_type) > 10 and op_type[len(op_type) - 10:] == "_operation":
-                            op_type = op_type[:-10]
                         op = event["value"]
-                        trx_id = block["transaction_ids"][trx_nr]
-                        block_num = block.get("id")
-                        _id = self.hash_op(event)
-                        timestamp = block.get("timestamp")
+                        op_event = None
                     elif "op" in event and isinstance(event["op"], dict) and "type" in event["op"] and "value" in event["op"]:
                         op_type = event["op"]["type"]
-                        if len(op_type) > 10 and op_type[len(op_type) - 10:] == "_operation":
-                            op_type = op_type[:-10]
                         op = event["op"]["value"]
-                        trx_id = event.get("trx_id")
-                        block_num = event.get("block")
-                        _id = self.hash_op(event["op"])
-                        timestamp = event.get("timestamp")
+                        op_event = event
                     else:
                         op_type, op = event["op"]
-                        trx_id = event.get("trx_id")
-                        block_num = event.get("block")
-                        _id = self.hash_op(event["op"])
-                        timestamp = event.get("timestamp")
-                    if not bool(opNames) or op_type in opNames and block_num > 0:
+                        op_event = event
+                    if len(op_type) > 10 and op_type[len(op_type) - 10:] == "_operation":
+                        op_type = op_type[:-10]
+                    if bool(op_names) and op_type not in op_names:
+                        continue
+                    if op_event is None:
+                        block_num = block.get("id")
+                        timestamp = block.get("timestamp")
+                    else:
+                        block_num = op_event.get("block")
+                        timestamp = op_event.get("timestamp")
+                    if not bool(op_names) or block_num > 0:
                         if raw_ops:
                             yield {"block_num": block_num,
                                    "trx_num": trx_nr,
                                    "op": [op_type, op],
                                    "timestamp": timestamp}
                         else:
+                            if op_event is None:
+                                trx_id = block["transaction_ids"][trx_nr]
+                                _id = self.hash_op(event)
+                            else:
+                                trx_id = op_event.get("trx_id")
+                                _id = self.hash_op(op_event["op"])
                             updated_op = {"type": op_type}
-                            updated_op.update(op.copy())
+                            updated_op.update(op)
                             updated_op.update({"_id": _id,
                                                "timestamp": timestamp,
                                                "block_num": block_num,
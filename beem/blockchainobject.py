@@ -7,19 +7,61 @@ from builtins import str
 from future.utils import python_2_unicode_compatible
 from beemgraphenebase.py23 import bytes_types, integer_types, string_types, text_type
 from beem.instance import shared_steem_instance
+from collections import OrderedDict
 from datetime import datetime, timedelta
+import heapq
+import itertools
 import json
+import sys
 import threading
 
 
+def _get_size(obj):
+    """ Returns the approximated memory size of obj and its content in bytes"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += _get_size(key) + _get_size(value)
+    elif isinstance(obj, (list, tuple, set)):
+        for value in obj:
+            size += _get_size(value)
+    return size
+
+
 @python_2_unicode_compatible
 class ObjectCache(dict):
-
-    def __init__(self, initial_data={}, default_expiration=10, auto_clean=True):
-        super(ObjectCache, self).__init__(initial_data)
+    """ Cache which stores objects for default_expiration seconds.
+
+        :param int default_expiration: seconds until a stored object expires (default is 10)
+        :param bool auto_clean: when True, expired objects are removed on every insert (default is True)
+        :param int max_entries: maximum number of stored objects, the least recently used
+            object is evicted when it is exceeded (default is None, no limit)
+        :param int max_bytes: maximum approximated memory size of all stored objects, the least
+            recently used objects are evicted when it is exceeded (default is None, no limit)
+
+        Expiration times are kept in a heap and the usage order in an ordered
+        dict, so that inserts, lookups, cleaning and eviction do not need to
+        walk over all stored objects.
+    """
+
+    def __init__(self, initial_data={}, default_expiration=10, auto_clean=True, max_entries=None, max_bytes=None):
+        super(ObjectCache, self).__init__()
         self.default_expiration = default_expiration
         self.auto_clean = auto_clean
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
         self.lock = threading.RLock()
+        self._expiration_heap = []
+        self._insert_cnt = itertools.count()
+        self._lru = OrderedDict()
+        self._sizes = {}
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        for key in initial_data:
+            self[key] = initial_data[key]
 
     def __setitem__(self, key, value):
         data = {
@@ -28,42 +70,78 @@ class ObjectCache(dict):
             "data": value
         }
         with self.lock:
-            if key in self:
+            if dict.__contains__(self, key):
                 del self[key]
             dict.__setitem__(self, key, data)
-        if self.auto_clean:
-            self.clear_expired_items()
+            heapq.heappush(self._expiration_heap, (data["expires"], next(self._insert_cnt), key))
+            self._lru[key] = None
+            if self.max_bytes is not None:
+                size = _get_size(value)
+                self._sizes[key] = size
+                self.n_bytes += size
+            if len(self._expiration_heap) > 2 * len(self) + 100:
+                self._rebuild_expiration_heap()
+            if self.auto_clean:
+                self.clear_expired_items()
+            self.evict()
+
+    def __delitem__(self, key):
+        with self.lock:
+            dict.__delitem__(self, key)
+            self._lru.pop(key, None)
+            self.n_bytes -= self._sizes.pop(key, 0)
 
     def __getitem__(self, key):
         with self.lock:
             if key in self:
                 value = dict.__getitem__(self, key)
                 if value is not None:
+                    self.hits += 1
+                    self._lru[key] = self._lru.pop(key)
                     return value["data"]
+            self.misses += 1
 
     def get(self, key, default):
         with self.lock:
-            if key in self:
-                if self[key] is not None:
-                    return self[key]
-                else:
-                    return default
+            value = self[key]
+            if value is not None:
+                return value
             else:
                 return default
 
+    def clear(self):
+        with self.lock:
+            dict.clear(self)
+            self._expiration_heap = []
+            self._lru.clear()
+            self._sizes.clear()
+            self.n_bytes = 0
+
+    def _rebuild_expiration_heap(self):
+        """ Removes the heap entries of replaced and deleted objects"""
+        heap = [(value["expires"], next(self._insert_cnt), key) for key, value in dict.items(self)]
+        heapq.heapify(heap)
+        self._expiration_heap = heap
+
     def clear_expired_items(self):
         with self.lock:
-            del_list = []
             utc_now = datetime.utcnow()
-            for key in self:
-                value = dict.__getitem__(self, key)
-                if value is None:
-                    del_list.append(key)
-                    continue
-                if utc_now >= value["expires"]:
-                    del_list.append(key)
-            for key in del_list:
-                del self[key]
+            heap = self._expiration_heap
+            while heap and heap[0][0] <= utc_now:
+                expires, cnt, key = heapq.heappop(heap)
+                value = dict.get(self, key)
+                # Skip heap entries of objects which were replaced or deleted
+                if value is not None and value["expires"] == expires:
+                    del self[key]
+                    self.expirations += 1
+
+    def evict(self):
+        """ Removes the least recently used objects until max_entries and max_bytes are kept"""
+        with self.lock:
+            while len(self) > 0 and ((self.max_entries is not None and len(self) > self.max_entries) or
+                                     (self.max_bytes is not None and self.n_bytes > self.max_bytes)):
+                del self[next(iter(self._lru))]
+                self.evictions += 1
 
     def __contains__(self, key):
         with self.lock:
@@ -77,6 +155,14 @@ class ObjectCache(dict):
                     value["data"] = None
             return False
 
+    def get_stats(self):
+        """ Returns the number of stored objects, their approximated size (only counted
+            when max_bytes is set) and the hit, miss, eviction and expiration counters
+        """
+        with self.lock:
+            return {"n": len(self), "bytes": self.n_bytes, "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "expirations": self.expirations}
+
     def __str__(self):
         if self.auto_clean:
             self.clear_expired_items()
@@ -158,7 +244,29 @@ class BlockchainObject(dict):
 
     @staticmethod
     def clear_cache():
-        BlockchainObject._cache = ObjectCache()
+        """ Clears the shared cache and the caches of all classes with an own cache policy"""
+        classes = [BlockchainObject]
+        while classes:
+            klass = classes.pop()
+            if "_cache" in klass.__dict__:
+                klass._cache.clear()
+            classes.extend(klass.__subclasses__())
+
+    @classmethod
+    def set_cache_policy(cls, **kwargs):
+        """ Changes the cache policy of the class, e.g. ``Block.set_cache_policy(max_entries=100)``.
+            Classes without an own cache change the cache shared with BlockchainObject.
+
+            :param int default_expiration: seconds until a cached object expires
+            :param bool auto_clean: remove expired objects on every insert
+            :param int max_entries: maximum number of cached objects (None for no limit)
+            :param int max_bytes: maximum approximated memory size of all cached objects (None for no limit)
+        """
+        for key in kwargs:
+            if key not in ["default_expiration", "auto_clean", "max_entries", "max_bytes"]:
+                raise ValueError("%s is not a cache policy parameter" % key)
+            setattr(cls._cache, key, kwargs[key])
+        cls._cache.evict()
 
     def test_valid_objectid(self, i):
         if isinstance(i, string_types):
@@ -178,28 +286,31 @@ class BlockchainObject(dict):
     def cache(self):
         # store in cache
         if dict.__contains__(self, self.id_item):
-            BlockchainObject._cache[self.get(self.id_item)] = self
+            self._cache[self.get(self.id_item)] = self
 
     def clear_cache_from_expired_items(self):
-        BlockchainObject._cache.clear_expired_items()
+        self._cache.clear_expired_items()
 
     def set_cache_expiration(self, expiration):
-        BlockchainObject._cache.default_expiration = expiration
+        self._cache.default_expiration = expiration
 
     def set_cache_auto_clean(self, auto_clean):
-        BlockchainObject._cache.auto_clean = auto_clean
+        self._cache.auto_clean = auto_clean
 
     def get_cache_expiration(self):
-        return BlockchainObject._cache.default_expiration
+        return self._cache.default_expiration
 
     def get_cache_auto_clean(self):
-        return BlockchainObject._cache.auto_clean
+        return self._cache.auto_clean
+
+    def get_cache_stats(self):
+        return self._cache.get_stats()
 
     def iscached(self, id):
-        return id in BlockchainObject._cache
+        return id in self._cache
 
     def getcache(self, id):
-        return BlockchainObject._cache.get(id, None)
+        return self._cache.get(id, None)
 
     def __getitem__(self, key):
         if not self.cached:
@@ -0,0 +1,276 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.utils import python_2_unicode_compatible
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+import logging
+from .storage import DataDir
+log = logging.getLogger(__name__)
+
+
+@python_2_unicode_compatible
+class BlockStore(DataDir):
+    """ Persistent on-disk store for irreversible blocks.
+
+        Blocks are stored as zlib compressed json blobs in a SQLite database,
+        keyed by block number. Full blocks, blocks with only operations and
+        blocks with only virtual operations are stored separately.
+
+        :param str path: Path to the SQLite file (default is ``blocks.sqlite`` in the beem data dir)
+        :param int max_size: Maximum size of all compressed blocks in bytes. When it is
+            reached, the oldest stored blocks are evicted. (default is None, no limit)
+        :param int max_blocks: Maximum number of stored blocks (default is None, no limit)
+
+        The store is used by :class:`beem.block.Block` and
+        :class:`beem.blockchain.Blockchain`, when it is given to the
+        Steem instance:
+
+        .. code-block:: python
+
+            from beem import Steem
+            from beem.blockstore import BlockStore
+            from beem.blockchain import Blockchain
+            stm = Steem(block_store=BlockStore(max_size=10 * 1024 ** 3))
+            for block in Blockchain(steem_instance=stm).blocks(start=1, stop=1000):
+                print(block)
+
+        Only blocks up to the last irreversible block are written to the store.
+
+    """
+    __tablename__ = 'blocks'
+    storageDatabase = "blocks.sqlite"
+
+    def __init__(self, path=None, max_size=None, max_blocks=None):
+        super(BlockStore, self).__init__()
+        if path is not None:
+            self.sqlDataBaseFile = path
+        elif self.sqlDataBaseFile != ":memory:":
+            self.sqlDataBaseFile = os.path.join(self.data_dir, self.storageDatabase)
+        self.max_size = max_size
+        self.max_blocks = max_blocks
+        self.last_irreversible_block_num = None
+        self.lock = threading.RLock()
+        if self.sqlDataBaseFile == ":memory:":
+            # Every connection would open a new empty in-memory database
+            self._memory_connection = sqlite3.connect(":memory:", check_same_thread=False)
+        else:
+            self._memory_connection = None
+        if not self.exists_table():
+            self.create_table()
+        self._size, self._count = self._get_size_and_count()
+
+    def _connect(self):
+        if self._memory_connection is not None:
+            return self._memory_connection
+        return sqlite3.connect(self.sqlDataBaseFile, timeout=30)
+
+    def exists_table(self):
+        """ Check if the database table exists
+        """
+        query = ("SELECT name FROM sqlite_master "
+                 "WHERE type='table' AND name=?", (self.__tablename__, ))
+        connection = self._connect()
+        cursor = connection.cursor()
+        cursor.execute(*query)
+        return True if cursor.fetchone() else False
+
+    def create_table(self):
+        """ Create the new table in the SQLite database
+        """
+        query = ("CREATE TABLE {0} ("
+                 "block_num INTEGER,"
+                 "kind INTEGER,"
+                 "stored REAL,"
+                 "size INTEGER,"
+                 "data BLOB,"
+                 "PRIMARY KEY (block_num, kind))".format(self.__tablename__))
+        connection = self._connect()
+        cursor = connection.cursor()
+        cursor.execute(query)
+        cursor.execute("CREATE INDEX {0}_stored ON {0} (stored)".format(self.__tablename__))
+        connection.commit()
+
+    def _get_size_and_count(self):
+        query = ("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM {0}".format(self.__tablename__))
+        connection = self._connect()
+        cursor = connection.cursor()
+        cursor.execute(query)
+        size, count = cursor.fetchone()
+        return size, count
+
+    @staticmethod
+    def _kind(only_ops=False, only_virtual_ops=False):
+        if only_virtual_ops:
+            return 2
+        elif only_ops:
+            return 1
+        return 0
+
+    @staticmethod
+    def _encode(block):
+        return zlib.compress(json.dumps(block, separators=(',', ':')).encode("utf-8"))
+
+    @staticmethod
+    def _decode(data):
+        return json.loads(zlib.decompress(data).decode("utf-8"))
+
+    def set_last_irreversible_block_num(self, block_num):
+        """ Sets the last irreversible block number, only blocks up to this
+            number are stored
+        """
+        if block_num is None:
+            return
+        with self.lock:
+            if self.last_irreversible_block_num is None or block_num > self.last_irreversible_block_num:
+                self.last_irreversible_block_num = int(block_num)
+
+    def is_irreversible(self, block_num):
+        """ Returns True, when block_num is not newer than the last irreversible block"""
+        return self.last_irreversible_block_num is not None and block_num <= self.last_irreversible_block_num
+
+    def get(self, block_num, only_ops=False, only_virtual_ops=False):
+        """ Returns the raw block as received from the node or None
+
+            :param int block_num: block number
+            :param bool only_ops: block with only operations
+            :param bool only_virtual_ops: block with only virtual operations
+        """
+        query = ("SELECT data FROM {0} WHERE block_num=? AND kind=?".format(self.__tablename__),
+                 (block_num, self._kind(only_ops, only_virtual_ops)))
+        with self.lock:
+            connection = self._connect()
+            cursor = connection.cursor()
+            cursor.execute(*query)
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        return self._decode(row[0])
+
+    def get_range(self, start, stop, only_ops=False, only_virtual_ops=False):
+        """ Returns all stored blocks from start to stop (including stop) as
+            dict of block number and raw block. Missing blocks are not included.
+
+            :param int start: first block number
+            :param int stop: last block number
+        """
+        query = ("SELECT block_num, data FROM {0} WHERE kind=? AND block_num>=? AND block_num<=? "
+                 "ORDER BY block_num".format(self.__tablename__),
+                 (self._kind(only_ops, only_virtual_ops), start, stop))
+        with self.lock:
+            connection = self._connect()
+            cursor = connection.cursor()
+            cursor.execute(*query)
+            blocks = {}
+            for block_num, data in cursor.fetchall():
+                blocks[block_num] = self._decode(data)
+        return blocks
+
+    def store(self, block_num, block, only_ops=False, only_virtual_ops=False):
+        """ Stores a single raw block, when it is irreversible
+
+            :param int block_num: block number
+            :param dict block: block as received from the node
+        """
+        self.store_many([(block_num, block)], only_ops=only_ops, only_virtual_ops=only_virtual_ops)
+
+    def store_many(self, blocks, only_ops=False, only_virtual_ops=False):
+        """ Stores many raw blocks in one transaction. Blocks which are not
+            irreversible are skipped.
+
+            :param list blocks: list of (block_num, block) tuples
+        """
+        kind = self._kind(only_ops, only_virtual_ops)
+        now = time.time()
+        rows = {}
+        for block_num, block in blocks:
+            if not bool(block) or not self.is_irreversible(block_num):
+                continue
+            data = self._encode(block)
+            rows[block_num] = (block_num, kind, now, len(data), sqlite3.Binary(data))
+        if len(rows) == 0:
+            return
+        query = ("INSERT OR REPLACE INTO {0} (block_num, kind, stored, size, data) "
+                 "VALUES (?, ?, ?, ?, ?)".format(self.__tablename__))
+        with self.lock:
+            connection = self._connect()
+            cursor = connection.cursor()
+            # Replaced blocks must not be counted twice
+            cursor.execute("SELECT block_num, size FROM {0} WHERE kind=? AND block_num>=? AND block_num<=?".format(self.__tablename__),
+                           (kind, min(rows), max(rows)))
+            replaced = [size for block_num, size in cursor.fetchall() if block_num in rows]
+            cursor.executemany(query, list(rows.values()))
+            connection.commit()
+            self._size += sum([r[3] for r in rows.values()]) - sum(replaced)
+            self._count += len(rows) - len(replaced)
+            if (self.max_size is not None and self._size > self.max_size) or \
+               (self.max_blocks is not None and self._count > self.max_blocks):
+                self.evict()
+
+    def evict(self):
+        """ Removes the oldest stored blocks, until the store is 10% below
+            max_size and max_blocks
+        """
+        with self.lock:
+            self._size, self._count = self._get_size_and_count()
+            connection = self._connect()
+            cursor = connection.cursor()
+            cursor.execute("SELECT block_num, kind, size FROM {0} ORDER BY stored, block_num".format(self.__tablename__))
+            size = self._size
+            count = self._count
+            delete_list = []
+            for block_num, kind, block_size in cursor:
+                if (self.max_size is None or size <= 0.9 * self.max_size) and \
+                   (self.max_blocks is None or count <= 0.9 * self.max_blocks):
+                    break
+                delete_list.append((block_num, kind))
+                size -= block_size
+                count -= 1
+            cursor.executemany("DELETE FROM {0} WHERE block_num=? AND kind=?".format(self.__tablename__), delete_list)
+            connection.commit()
+            self._size = size
+            self._count = count
+            log.debug("Evicted %d blocks from the block store" % len(delete_list))
+
+    def compact(self):
+        """ Rebuilds the database file and frees the space of deleted blocks
+        """
+        with self.lock:
+            connection = self._connect()
+            connection.execute("VACUUM")
+            connection.commit()
+
+    def wipe(self, sure=False):
+        """ Delete all stored blocks
+        """
+        if not sure:
+            log.error(
+                "You need to confirm that you are sure "
+                "and understand the implications of "
+                "wiping the block store!"
+            )
+            return
+        with self.lock:
+            connection = self._connect()
+            cursor = connection.cursor()
+            cursor.execute("DELETE FROM {0} ".format(self.__tablename__))
+            connection.commit()
+            self._size = 0
+            self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def size(self):
+        """ Returns the size of all compressed blocks in bytes"""
+        return self._size
+
+    def __str__(self):
+        return "BlockStore(n=%d, size=%d, path=%s)" % (self._count, self._size, self.sqlDataBaseFile)
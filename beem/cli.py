@@ -3224,17 +3224,15 @@ def verify(blocknumber, trx, use_api):
     t.align = "l"
     if not use_api:
         from beembase.signedtransactions import Signed_Transaction
-    for trx in trxs:
+        from beemgraphenebase.signedtransactions import verify_transactions
+        # trx is now identical to the output of get_transaction
+        # all signatures of the block are verified together
+        signed_txs = [Signed_Transaction(trx.copy()) for trx in trxs]
+        trx_keys = verify_transactions(signed_txs, stm.chain_params)
+    for trx_num, trx in enumerate(trxs):
         if not use_api:
-            # trx is now identical to the output of get_transaction
-            # This is just for testing porpuse
-            if True:
-                signed_tx = Signed_Transaction(trx.copy())
-            else:
-                tx = b.get_transaction(trx["transaction_id"])
-                signed_tx = Signed_Transaction(tx)
             public_keys = []
-            for key in signed_tx.verify(chain=stm.chain_params, recover_parameter=True):
+            for key in trx_keys[trx_num]:
                 public_keys.append(format(Base58(key, prefix=stm.prefix), stm.prefix))
         else:
             tx = TransactionBuilder(tx=trx, steem_instance=stm)
@@ -15,7 +15,7 @@ from .account import Account
 from .amount import Amount
 from .price import Price
 from .utils import resolve_authorperm, construct_authorperm, derive_permlink, remove_from_dict, make_patch, formatTimeString, formatToTimeStamp
-from .blockchainobject import BlockchainObject
+from .blockchainobject import BlockchainObject, ObjectCache
 from .exceptions import ContentDoesNotExistsException, VotingInvalidOnArchivedPost
 from beembase import operations
 from beemgraphenebase.py23 import py23_bytes, bytes_types, integer_types, string_types, text_type
@@ -45,6 +45,7 @@ class Comment(BlockchainObject):
 
     """
     type_id = 8
+    _cache = ObjectCache(max_entries=2000)
 
     def __init__(
         self,
@@ -0,0 +1,374 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from future.utils import python_2_unicode_compatible
+from datetime import datetime, date, time
+import json
+import os
+import sqlite3
+import threading
+import time as timemodule
+import logging
+import pytz
+from .storage import DataDir
+from .utils import addTzInfo, formatTimeString
+log = logging.getLogger(__name__)
+
+
+def _op_type(event):
+    """ Returns the operation type of an account history event without the
+        ``_operation`` suffix
+    """
+    if isinstance(event['op'], list):
+        return event['op'][0]
+    op_type = event['op']['type']
+    if len(op_type) > 10 and op_type[len(op_type) - 10:] == "_operation":
+        op_type = op_type[:-10]
+    return op_type
+
+
+@python_2_unicode_compatible
+class HistoryStore(DataDir):
+    """ Persistent on-disk store for the account history.
+
+        The operations of every account are stored in a SQLite database,
+        keyed by account and operation index, with indexes on block number,
+        timestamp and operation type. A cursor stores the last synced index
+        of every account, so that :func:`sync` only fetches newer operations.
+
+        :param str path: Path to the SQLite file (default is ``history.sqlite`` in the beem data dir)
+
+        The store is used by :func:`beem.account.Account.history` and
+        :func:`beem.account.Account.history_reverse`, when it is given to the
+        Steem instance:
+
+        .. code-block:: python
+
+            from beem import Steem
+            from beem.account import Account
+            from beem.historystore import HistoryStore
+            stm = Steem(history_store=HistoryStore())
+            for op in Account("holger80", steem_instance=stm).history(only_ops=["transfer"]):
+                print(op)
+
+        Only operations up to the last irreversible block are written to the
+        store. Newer operations are fetched from the node on every call.
+
+    """
+    __tablename__ = 'account_history'
+    __cursortablename__ = 'account_history_cursors'
+    storageDatabase = "history.sqlite"
+
+    def __init__(self, path=None):
+        super(HistoryStore, self).__init__()
+        if path is not None:
+            self.sqlDataBaseFile = path
+        elif self.sqlDataBaseFile != ":memory:":
+            self.sqlDataBaseFile = os.path.join(self.data_dir, self.storageDatabase)
+        self.last_irreversible_block_num = None
+        self.lock = threading.RLock()
+        if self.sqlDataBaseFile == ":memory:":
+            # Every connection would open a new empty in-memory database
+            self._memory_connection = sqlite3.connect(":memory:", check_same_thread=False)
+        else:
+            self._memory_connection = None
+        if not self.exists_table():
+            self.create_table()
+
+    def _connect(self):
+        if self._memory_connection is not None:
+            return self._memory_connection
+        return sqlite3.connect(self.sqlDataBaseFile, timeout=30)
+
+    def exists_table(self):
+        """ Check if the database table exists
+        """
+        query = ("SELECT name FROM sqlite_master "
+                 "WHERE type='table' AND name=?", (self.__tablename__, ))
+        connection = self._connect()
+        cursor = connection.cursor()
+        cursor.execute(*query)
+        return True if cursor.fetchone() else False
+
+    def create_table(self):
+        """ Create the new tables in the SQLite database
+        """
+        connection = self._connect()
+        cursor = connection.cursor()
+        cursor.execute("CREATE TABLE {0} ("
+                       "account TEXT,"
+                       "op_index INTEGER,"
+                       "block INTEGER,"
+                       "timestamp TEXT,"
+                       "op_type TEXT,"
+                       "data TEXT,"
+                       "PRIMARY KEY (account, op_index))".format(self.__tablename__))
+        for column in ["block", "timestamp", "op_type"]:
+            cursor.execute("CREATE INDEX {0}_{1} ON {0} (account, {1})".format(self.__tablename__, column))
+        cursor.execute("CREATE TABLE {0} ("
+                       "account TEXT PRIMARY KEY,"
+                       "op_index INTEGER,"
+                       "block INTEGER,"
+                       "synced REAL)".format(self.__cursortablename__))
+        connection.commit()
+
+    def set_last_irreversible_block_num(self, block_num):
+        """ Sets the last irreversible block number, only operations up to
+            this block are stored
+        """
+        if block_num is None:
+            return
+        with self.lock:
+            if self.last_irreversible_block_num is None or block_num > self.last_irreversible_block_num:
+                self.last_irreversible_block_num = int(block_num)
+
+    def is_irreversible(self, block_num):
+        """ Returns True, when block_num is not newer than the last irreversible block"""
+        return self.last_irreversible_block_num is not None and block_num <= self.last_irreversible_block_num
+
+    def get_cursor(self, account):
+        """ Returns the index of the last stored operation of an account or
+            -1, when no operation is stored
+        """
+        query = ("SELECT op_index FROM {0} WHERE account=?".format(self.__cursortablename__), (account, ))
+        with self.lock:
+            connection = self._connect()
+            cursor = connection.cursor()
+            cursor.execute(*query)
+            row = cursor.fetchone()
+        if row is None:
+            return -1
+        return row[0]
+
+    def get_accounts(self):
+        """ Returns a dict of account name and (last stored index, last
+            stored block, time of the last sync) for all synced accounts
+        """
+        query = "SELECT account, op_index, block, synced FROM {0}".format(self.__cursortablename__)
+        with self.lock:
+            connection = self._connect()
+            cursor = connection.cursor()
+            cursor.execute(query)
+            return {r[0]: (r[1], r[2], r[3]) for r in cursor.fetchall()}
+
+    def store_many(self, account, items):
+        """ Stores raw account history items ``[index, event]`` in one
+            transaction and moves the cursor of the account.
+
+            The items have to follow the cursor without gaps. Storing stops
+            at the first item which is not irreversible, so that the cursor
+            never skips an operation.
+
+            :param str account: account name
+            :param list items: raw items as returned by ``get_account_history``
+            :returns: the number of stored items
+        """
+        rows = []
+        with self.lock:
+            op_index = self.get_cursor(account)
+            block = None
+            for item_index, event in items:
+                if item_index <= op_index:
+                    continue
+                if item_index != op_index + 1 or not self.is_irreversible(event["block"]):
+                    break
+                rows.append((account, item_index, event["block"], event["timestamp"], _op_type(event),
+                             json.dumps(event, separators=(',', ':'))))
+                op_index = item_index
+                block = event["block"]
+            if len(rows) == 0:
+                return 0
+            connection = self._connect()
+            cursor = connection.cursor()
+            cursor.executemany("INSERT OR REPLACE INTO {0} (account, op_index, block, timestamp, op_type, data) "
+                               "VALUES (?, ?, ?, ?, ?, ?)".format(self.__tablename__), rows)
+            cursor.execute("INSERT OR REPLACE INTO {0} (account, op_index, block, synced) "
+                           "VALUES (?, ?, ?, ?)".format(self.__cursortablename__),
+                           (account, op_index, block, timemodule.time()))
+            connection.commit()
+        return len(rows)
+
+    def _sync(self, account, batch_size=1000):
+        """ Stores all new irreversible operations and returns the number of
+            stored operations and the newer operations, which were not stored
+        """
+        steem = account.steem
+        props = steem.get_dynamic_global_properties(False)
+        if props is not None:
+            self.set_last_irreversible_block_num(props.get("last_irreversible_block_num"))
+        name = account["name"]
+        count = 0
+        pending = []
+        batch = []
+        for item in account._history(start=self.get_cursor(name) + 1, use_block_num=False,
+                                     batch_size=batch_size, raw_output=True):
+            if pending or not self.is_irreversible(item[1]["block"]):
+                pending.append(item)
+                continue
+            batch.append(item)
+            if len(batch) >= batch_size:
+                count += self.store_many(name, batch)
+                batch = []
+        if batch:
+            count += self.store_many(name, batch)
+        log.debug("Stored %d operations of %s" % (count, name))
+        return count, pending
+
+    def sync(self, account, steem_instance=None, batch_size=1000):
+        """ Fetches all operations of an account which are newer than its
+            cursor and stores the irreversible ones
+
+            :param account: account name or :class:`beem.account.Account`
+            :param int batch_size: internal api call batch size (*optional*)
+            :returns: the number of stored operations
+        """
+        account = self._get_account(account, steem_instance)
+        return self._sync(account, batch_size=batch_size)[0]
+
+    @staticmethod
+    def _get_account(account, steem_instance):
+        from .account import Account
+        if not isinstance(account, Account):
+            account = Account(account, steem_instance=steem_instance)
+        return account
+
+    @staticmethod
+    def _bound(value, use_block_num):
+        """ Returns the column and value of a start or stop parameter"""
+        if isinstance(value, (datetime, date, time)):
+            value = addTzInfo(value)
+            if isinstance(value, datetime):
+                value = value.astimezone(pytz.utc)
+            return "timestamp", formatTimeString(value)
+        elif use_block_num:
+            return "block", value
+        return "op_index", value
+
+    def history(self, account, start=None, stop=None, use_block_num=True, only_ops=[], exclude_ops=[],
+                batch_size=1000, raw_output=False, order=1, sync=True, steem_instance=None):
+        """ Returns a generator for the operations of an account, after
+            syncing new operations into the store. The parameters are the
+            same as for :func:`beem.account.Account.history` and
+            :func:`beem.account.Account.history_reverse`.
+
+            :param account: account name or :class:`beem.account.Account`
+            :param int order: 1 for chronological, -1 for reverse order. With order=-1,
+                start is the latest and stop the earliest operation.
+            :param bool sync: When False, only stored operations are returned and
+                the node is not called
+        """
+        from .account import construct_history_op
+        if sync:
+            account = self._get_account(account, steem_instance)
+            pending = self._sync(account, batch_size=batch_size)[1]
+            name = account["name"]
+        else:
+            pending = []
+            name = account if not isinstance(account, dict) else account["name"]
+        if order != -1 and order != 1:
+            raise ValueError("order must be -1 or 1!")
+        if order == -1:
+            start, stop = stop, start
+            if not use_block_num:
+                max_index = pending[-1][0] if pending else self.get_cursor(name)
+                if isinstance(start, int) and start < 0:
+                    start += max_index
+                if isinstance(stop, int) and stop < 0:
+                    stop += max_index
+        where = ["account=?"]
+        args = [name]
+        bounds = []
+        if start is not None:
+            column, value = self._bound(start, use_block_num)
+            where.append("%s>=?" % column)
+            args.append(value)
+            bounds.append((column, value, 1))
+        if stop is not None:
+            column, value = self._bound(stop, use_block_num)
+            where.append("%s<=?" % column)
+            args.append(value)
+            bounds.append((column, value, -1))
+        if only_ops:
+            where.append("op_type IN (%s)" % ",".join(["?"] * len(only_ops)))
+            args.extend(only_ops)
+        if exclude_ops:
+            where.append("op_type NOT IN (%s)" % ",".join(["?"] * len(exclude_ops)))
+            args.extend(exclude_ops)
+        query = ("SELECT op_index, data FROM {0} WHERE {1} ORDER BY op_index {2}".format(
+            self.__tablename__, " AND ".join(where), "ASC" if order == 1 else "DESC"), args)
+
+        def matches(item):
+            item_index, event = item
+            values = {"op_index": item_index, "block": event["block"], "timestamp": event["timestamp"]}
+            for column, value, sign in bounds:
+                if (values[column] < value and sign == 1) or (values[column] > value and sign == -1):
+                    return False
+            op_type = _op_type(event)
+            if exclude_ops and op_type in exclude_ops:
+                return False
+            return not only_ops or op_type in only_ops
+
+        def stored():
+            with self.lock:
+                connection = self._connect()
+                cursor = connection.cursor()
+                cursor.execute(*query)
+            while True:
+                with self.lock:
+                    rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for item_index, data in rows:
+                    yield [item_index, json.loads(data)]
+
+        # stored operations are filtered by the query, pending ones here
+        if order == 1:
+            sources = [(stored(), False), (pending, True)]
+        else:
+            sources = [(reversed(pending), True), (stored(), False)]
+        for source, check in sources:
+            for item in source:
+                if check and not matches(item):
+                    continue
+                if raw_output:
+                    yield item
+                else:
+                    yield construct_history_op(item, name)
+
+    def remove(self, account):
+        """ Removes all stored operations and the cursor of an account"""
+        with self.lock:
+            connection = self._connect()
+            cursor = connection.cursor()
+            cursor.execute("DELETE FROM {0} WHERE account=?".format(self.__tablename__), (account, ))
+            cursor.execute("DELETE FROM {0} WHERE account=?".format(self.__cursortablename__), (account, ))
+            connection.commit()
+
+    def wipe(self, sure=False):
+        """ Delete all stored operations and cursors
+        """
+        if not sure:
+            log.error(
+                "You need to confirm that you are sure "
+                "and understand the implications of "
+                "wiping the history store!"
+            )
+            return
+        with self.lock:
+            connection = self._connect()
+            cursor = connection.cursor()
+            cursor.execute("DELETE FROM {0} ".format(self.__tablename__))
+            cursor.execute("DELETE FROM {0} ".format(self.__cursortablename__))
+            connection.commit()
+
+    def __len__(self):
+        with self.lock:
+            connection = self._connect()
+            cursor = connection.cursor()
+            cursor.execute("SELECT COUNT(*) FROM {0}".format(self.__tablename__))
+            return cursor.fetchone()[0]
+
+    def __str__(self):
+        return "HistoryStore(n=%d, path=%s)" % (len(self), self.sqlDataBaseFile)
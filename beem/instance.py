@@ -4,7 +4,12 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 from builtins import object
+from builtins import range
 import beem as stm
+try:
+    from Queue import Queue
+except ImportError:
+    from queue import Queue
 
 
 class SharedInstance(object):
@@ -44,6 +49,35 @@ def set_shared_steem_instance(steem_instance):
     SharedInstance.instance = steem_instance
 
 
+def steem_instance_queue(steem_instance, count):
+    """ Returns a queue with count new Steem instances for worker threads.
+
+        :param Steem steem_instance: the instances connect to its working
+            nodes and use its rpc settings, chains and block/history stores
+        :param int count: number of instances, the http pool of every
+            instance has at least count connections
+
+        A thread takes an instance from the queue and puts it back when it is
+        done, so that an instance is never used by two threads at once.
+    """
+    rpc = steem_instance.rpc
+    nodelist = rpc.nodes.export_working_nodes()
+    steem_instances = Queue()
+    for i in range(count):
+        steem_instances.put(stm.Steem(node=nodelist,
+                                      num_retries=rpc.num_retries,
+                                      num_retries_call=rpc.num_retries_call,
+                                      timeout=rpc.timeout,
+                                      pool_maxsize=max(count, rpc.pool_maxsize or 10),
+                                      pool_per_node=rpc.pool_per_node,
+                                      use_http2=rpc.use_http2,
+                                      blocking=steem_instance.blocking,
+                                      custom_chains=steem_instance.custom_chains,
+                                      block_store=steem_instance.block_store,
+                                      history_store=steem_instance.history_store))
+    return steem_instances
+
+
 def clear_cache():
     """ Clear Caches
     """
@@ -11,8 +11,8 @@ from datetime import datetime, timedelta, date, time
 import math
 import random
 import logging
-from bisect import bisect_left
-from beem.utils import formatTimeString, formatTimedelta, remove_from_dict, reputation_to_score, addTzInfo, parse_time
+from bisect import bisect_left, bisect_right
+from beem.utils import formatTimeString, formatTimedelta, remove_from_dict, reputation_to_score, addTzInfo, parse_time, formatToTimeStamp
 from beem.amount import Amount
 from beem.account import Account
 from beem.vote import Vote
@@ -21,6 +21,14 @@ from beem.constants import STEEM_VOTE_REGENERATION_SECONDS, STEEM_1_PERCENT, STE
 
 log = logging.getLogger(__name__)
 
+NUMPY_MODULE = None
+if not NUMPY_MODULE:
+    try:
+        import numpy as np
+        NUMPY_MODULE = "numpy"
+    except ImportError:
+        NUMPY_MODULE = None
+
 
 class AccountSnapshot(list):
     """ This class allows to easily access Account history
@@ -43,6 +51,8 @@ class AccountSnapshot(list):
         self.own_sbd = [Amount(0, self.steem.sbd_symbol, steem_instance=self.steem)]
         self.delegated_vests_in = [{}]
         self.delegated_vests_out = [{}]
+        self.delegated_vests_in_sum = [0]
+        self.delegated_vests_out_sum = [0]
         self.timestamps = [addTzInfo(datetime(1970, 1, 1, 0, 0, 0, 0))]
         import beembase.operationids
         self.ops_statistics = beembase.operationids.operations.copy()
@@ -125,16 +135,31 @@ class AccountSnapshot(list):
             if not only_ops or op["type"] in only_ops:
                 yield op
 
+    def get_index(self, timestamp, index=0):
+        """ Returns the index of the last snapshot step before timestamp,
+            -1 when there is none
+
+            :param datetime timestamp: datetime
+            :param int index: the search starts at index when the step at
+                index is before timestamp (*optional*)
+        """
+        timestamp = addTzInfo(timestamp)
+        if index >= len(self.timestamps) or self.timestamps[index] >= timestamp:
+            index = 0
+        # Find rightmost value less than x
+        return bisect_left(self.timestamps, timestamp, lo=index) - 1
+
     def get_data(self, timestamp=None, index=0):
-        """ Returns snapshot for given timestamp"""
+        """ Returns snapshot for given timestamp
+
+            :param datetime timestamp: datetime, now when not set
+            :param int index: index of an earlier step, which speeds up
+                lookups for ascending timestamps (*optional*)
+        """
         if timestamp is None:
             timestamp = datetime.utcnow()
-        timestamp = addTzInfo(timestamp)
-        # Find rightmost value less than x
-        i = bisect_left(self.timestamps, timestamp)
-        if i:
-            index = i - 1
-        else:
+        index = self.get_index(timestamp, index=index)
+        if index < 0:
             return {}
         ts = self.timestamps[index]
         own = self.own_vests[index]
@@ -142,8 +167,8 @@ class AccountSnapshot(list):
         dout = self.delegated_vests_out[index]
         steem = self.own_steem[index]
         sbd = self.own_sbd[index]
-        sum_in = sum([din[key].amount for key in din])
-        sum_out = sum([dout[key].amount for key in dout])
+        sum_in = self.delegated_vests_in_sum[index]
+        sum_out = self.delegated_vests_out_sum[index]
         sp_in = self.steem.vests_to_sp(sum_in, timestamp=ts)
         sp_out = self.steem.vests_to_sp(sum_out, timestamp=ts)
         sp_own = self.steem.vests_to_sp(own, timestamp=ts)
@@ -151,6 +176,94 @@ class AccountSnapshot(list):
         return {"timestamp": ts, "vests": own, "delegated_vests_in": din, "delegated_vests_out": dout,
                 "sp_own": sp_own, "sp_eff": sp_eff, "steem": steem, "sbd": sbd, "index": index}
 
+    def _steem_per_mvest(self, timestamps):
+        """ Returns the STEEM per MVEST ratio for many timestamps"""
+        ratio = {}
+        for ts in timestamps:
+            if ts not in ratio:
+                ratio[ts] = self.steem.get_steem_per_mvest(ts)
+        return [ratio[ts] for ts in timestamps]
+
+    def get_sp(self, timestamps):
+        """ Returns own and effective SP for many timestamps at once
+
+            The timestamps are looked up in one pass in ascending order,
+            SP is 0 before the first snapshot step.
+
+            :param list timestamps: datetime objects
+            :returns: list of own SP and list of effective SP
+        """
+        sp_own = [0.] * len(timestamps)
+        sp_eff = [0.] * len(timestamps)
+        steps = {}
+        index = 0
+        for i in sorted(range(len(timestamps)), key=lambda i: addTzInfo(timestamps[i])):
+            index = self.get_index(timestamps[i], index=index)
+            if index < 0:
+                index = 0
+                continue
+            steps[i] = index
+        indices = list(steps.values())
+        ratio = self._steem_per_mvest([self.timestamps[index] for index in indices])
+        for (i, index, steem_per_mvest) in zip(steps, indices, ratio):
+            own = float(self.own_vests[index])
+            sp_own[i] = own / 1e6 * steem_per_mvest
+            sp_eff[i] = (own + self.delegated_vests_in_sum[index] - self.delegated_vests_out_sum[index]) / 1e6 * steem_per_mvest
+        return sp_own, sp_eff
+
+    _series_timestamps = {
+        "own_vests": "timestamps", "own_steem": "timestamps", "own_sbd": "timestamps",
+        "own_sp": "timestamps", "eff_sp": "timestamps",
+        "delegated_vests_in_sum": "timestamps", "delegated_vests_out_sum": "timestamps",
+        "curation_rewards": "reward_timestamps", "out_vote_weight": "out_vote_timestamp",
+        "in_vote_weight": "in_vote_timestamp", "in_vote_rep": "in_vote_timestamp",
+        "in_vote_rshares": "in_vote_timestamp", "vp": "vp_timestamp", "rep": "rep_timestamp",
+        "curation_per_1000_SP": "curation_per_1000_SP_timestamp",
+    }
+
+    def _get_window(self, name, start=None, stop=None):
+        if name not in self._series_timestamps:
+            raise ValueError("%s is not a time series" % name)
+        timestamps = getattr(self, self._series_timestamps[name])
+        first = 0
+        last = len(timestamps)
+        if start is not None:
+            first = bisect_left(timestamps, addTzInfo(start))
+        if stop is not None:
+            last = bisect_right(timestamps, addTzInfo(stop))
+        return [float(value) for value in getattr(self, name)[first:last]]
+
+    def _aggregate(self, values, func):
+        if func == "mean":
+            return sum(values) / len(values)
+        return {"sum": sum, "max": max, "min": min}[func](values)
+
+    def aggregate(self, name, start=None, stop=None, func="sum"):
+        """ Aggregates a time series of the snapshot over a time window
+
+            :param str name: name of the series, e.g. own_sp, eff_sp,
+                curation_rewards, vp, rep or curation_per_1000_SP
+            :param datetime start: start of the window (*optional*)
+            :param datetime stop: end of the window, inclusive (*optional*)
+            :param str func: sum, mean, max or min
+
+            The mean is taken over the entries in the window. Returns 0 for
+            sum and None otherwise when the window is empty.
+
+            .. code-block:: python
+
+                acc_snapshot.build(enable_rewards=True)
+                acc_snapshot.aggregate("curation_rewards", start=datetime(2018, 1, 1),
+                                       stop=datetime(2018, 1, 31))
+
+        """
+        if func not in ["sum", "mean", "max", "min"]:
+            raise ValueError("func must be sum, mean, max or min")
+        values = self._get_window(name, start=start, stop=stop)
+        if len(values) == 0:
+            return 0 if func == "sum" else None
+        return self._aggregate(values, func)
+
     def get_account_history(self, start=None, stop=None, use_block_num=True):
         """ Uses account history to fetch all related ops
 
@@ -212,6 +325,8 @@ class AccountSnapshot(list):
         self.own_sbd.append(self.own_sbd[-1])
         self.delegated_vests_in.append(self.delegated_vests_in[-1])
         self.delegated_vests_out.append(self.delegated_vests_out[-1])
+        self.delegated_vests_in_sum.append(self.delegated_vests_in_sum[-1])
+        self.delegated_vests_out_sum.append(self.delegated_vests_out_sum[-1])
 
         self.timestamps.append(timestamp)
         self.own_vests.append(self.own_vests[-1] + own)
@@ -224,6 +339,9 @@ class AccountSnapshot(list):
                 del new_deleg[delegated_in['account']]
             else:
                 new_deleg[delegated_in['account']] = delegated_in['amount']
+            self.delegated_vests_in_sum.append(sum([new_deleg[key].amount for key in new_deleg]))
+        else:
+            self.delegated_vests_in_sum.append(self.delegated_vests_in_sum[-1])
         self.delegated_vests_in.append(new_deleg)
 
         new_deleg = dict(self.delegated_vests_out[-1])
@@ -242,6 +360,9 @@ class AccountSnapshot(list):
                 # skip undelegations here, wait for 'return_vesting_delegation'
                 # del new_deleg[delegated_out['account']]
 
+            self.delegated_vests_out_sum.append(sum([new_deleg[key].amount for key in new_deleg]))
+        else:
+            self.delegated_vests_out_sum.append(self.delegated_vests_out_sum[-1])
         self.delegated_vests_out.append(new_deleg)
 
     def build(self, only_ops=[], exclude_ops=[], enable_rewards=False, enable_out_votes=False, enable_in_votes=False):
@@ -456,11 +577,9 @@ class AccountSnapshot(list):
         """ Builds the own_sp and eff_sp array"""
         self.own_sp = []
         self.eff_sp = []
-        for (ts, own, din, dout) in zip(self.timestamps, self.own_vests,
-                                        self.delegated_vests_in,
-                                        self.delegated_vests_out):
-            sum_in = sum([din[key].amount for key in din])
-            sum_out = sum([dout[key].amount for key in dout])
+        for (ts, own, sum_in, sum_out) in zip(self.timestamps, self.own_vests,
+                                              self.delegated_vests_in_sum,
+                                              self.delegated_vests_out_sum):
             sp_in = self.steem.vests_to_sp(sum_in, timestamp=ts)
             sp_out = self.steem.vests_to_sp(sum_out, timestamp=ts)
             sp_own = self.steem.vests_to_sp(own, timestamp=ts)
@@ -505,19 +624,18 @@ class AccountSnapshot(list):
         self.curation_per_1000_SP = []
         if sum_days <= 0:
             raise ValueError("sum_days must be greater than 0")
-        index = 0
         curation_sum = 0
         days = (self.reward_timestamps[-1] - self.reward_timestamps[0]).days // sum_days * sum_days
         if end_date is None:
             end_date = self.reward_timestamps[-1] - timedelta(days=days)
-        for (ts, vests) in zip(self.reward_timestamps, self.curation_rewards):
-            if vests == 0:
-                continue
-            sp = self.steem.vests_to_sp(vests, timestamp=ts)
-            data = self.get_data(timestamp=ts, index=index)
-            index = data["index"]
-            if "sp_eff" in data and data["sp_eff"] > 0:
-                curation_1k_sp = sp / data["sp_eff"] * 1000 / sum_days * 7
+        rewards = [(ts, float(vests)) for (ts, vests) in zip(self.reward_timestamps, self.curation_rewards) if vests != 0]
+        timestamps = [ts for (ts, vests) in rewards]
+        ratio = self._steem_per_mvest(timestamps)
+        sp_eff = self.get_sp(timestamps)[1]
+        for ((ts, vests), steem_per_mvest, eff) in zip(rewards, ratio, sp_eff):
+            sp = vests / 1e6 * steem_per_mvest
+            if eff > 0:
+                curation_1k_sp = sp / eff * 1000 / sum_days * 7
             else:
                 curation_1k_sp = 0
             if ts < end_date:
@@ -534,3 +652,581 @@ class AccountSnapshot(list):
     def __repr__(self):
         return "<%s %s>" % (
             self.__class__.__name__, str(self.account["name"]))
+
+
+class ColumnarAccountSnapshot(AccountSnapshot):
+    """ AccountSnapshot which keeps its state in NumPy arrays
+
+        The account history is parsed once into typed columns. Vests, STEEM
+        and SBD balances are cumulative sums over the per operation deltas
+        and delegations are stored as sparse event arrays, so that neither
+        Amount objects nor copies of the delegation dicts are created per
+        operation. SP, VP and reputation series are computed in bulk.
+
+        ``timestamps``, ``own_vests``, ``own_steem``, ``own_sbd``, ``own_sp``
+        and ``eff_sp`` have the same layout as in :class:`AccountSnapshot`,
+        the balances are float arrays. ``get_data`` returns the same dict.
+        The summed delegations are stored in ``delegated_vests_in_sum`` and
+        ``delegated_vests_out_sum``, ``delegated_vests_in`` and
+        ``delegated_vests_out`` are only materialized when accessed.
+
+        numpy is required for this class.
+
+        :param str account_name: Name of the account
+        :param Steem steem_instance: Steem
+               instance
+
+        .. code-block:: python
+
+            from beem.snapshot import ColumnarAccountSnapshot
+            acc_snapshot = ColumnarAccountSnapshot("beem")
+            acc_snapshot.get_account_history()
+            acc_snapshot.build()
+            acc_snapshot.build_sp_arrays()
+
+    """
+    def __init__(self, account, account_history=[], steem_instance=None):
+        if NUMPY_MODULE is None:
+            raise ImportError("numpy is required for ColumnarAccountSnapshot!")
+        super(ColumnarAccountSnapshot, self).__init__(account, account_history=account_history,
+                                                      steem_instance=steem_instance)
+
+    def reset(self):
+        """ Resets the arrays not the stored account history
+        """
+        self._ts = np.zeros(1, dtype=np.int64)
+        self.own_vests = np.zeros(1)
+        self.own_steem = np.zeros(1)
+        self.own_sbd = np.zeros(1)
+        self.delegated_vests_in_sum = np.zeros(1)
+        self.delegated_vests_out_sum = np.zeros(1)
+        # Delegation events: step index, account and new amount (0 = removed)
+        self._din_events = (np.zeros(0, dtype=np.int64), [], np.zeros(0))
+        self._dout_events = (np.zeros(0, dtype=np.int64), [], np.zeros(0))
+        self._din_state = {}
+        self._dout_state = {}
+        self._reward_ts = np.zeros(0, dtype=np.int64)
+        self._out_vote_ts = np.zeros(0, dtype=np.int64)
+        self._cache = {}
+        self._clear_pending()
+        import beembase.operationids
+        self.ops_statistics = beembase.operationids.operations.copy()
+        for key in self.ops_statistics:
+            self.ops_statistics[key] = 0
+        self.author_rewards = []
+        self.curation_rewards = np.zeros(0)
+        self.curation_per_1000_SP_timestamp = []
+        self.curation_per_1000_SP = []
+        self.out_vote_weight = np.zeros(0, dtype=np.int64)
+        self.in_vote_timestamp = []
+        self.in_vote_weight = []
+        self.in_vote_rep = []
+        self.in_vote_rshares = []
+        self.vp = []
+        self.vp_timestamp = []
+        self.rep = []
+        self.rep_timestamp = []
+
+    def _clear_pending(self):
+        self._pending = {"ts": [], "vests": [], "sp": [], "steem": [], "sbd": [],
+                         "din": [], "dout": [], "reward": [], "out_vote": []}
+
+    @staticmethod
+    def _to_datetime(timestamp):
+        return addTzInfo(datetime(1970, 1, 1)) + timedelta(seconds=int(timestamp))
+
+    @staticmethod
+    def _to_seconds(timestamp):
+        timestamp = addTzInfo(timestamp)
+        return (timestamp - addTzInfo(datetime(1970, 1, 1))).total_seconds()
+
+    def _to_datetimes(self, key, timestamps):
+        if key not in self._cache:
+            self._cache[key] = [self._to_datetime(t) for t in timestamps.tolist()]
+        return self._cache[key]
+
+    @property
+    def timestamps(self):
+        """ Timestamps of all snapshot steps as list of datetime objects"""
+        return self._to_datetimes("timestamps", self._ts)
+
+    @property
+    def reward_timestamps(self):
+        return self._to_datetimes("reward_timestamps", self._reward_ts)
+
+    @property
+    def out_vote_timestamp(self):
+        return self._to_datetimes("out_vote_timestamp", self._out_vote_ts)
+
+    @property
+    def delegated_vests_in(self):
+        """ Incoming delegations of all snapshot steps as list of dicts
+
+            The list is built on access, prefer ``delegated_vests_in_sum``.
+        """
+        return self._delegation_maps(self._din_events)
+
+    @property
+    def delegated_vests_out(self):
+        """ Outgoing delegations of all snapshot steps as list of dicts
+
+            The list is built on access, prefer ``delegated_vests_out_sum``.
+        """
+        return self._delegation_maps(self._dout_events)
+
+    def _vests(self, amount):
+        return Amount(float(amount), self.steem.vests_symbol, steem_instance=self.steem)
+
+    def _apply_delegation(self, deleg, account, amount):
+        if amount == 0:
+            deleg.pop(account, None)
+        else:
+            deleg[account] = self._vests(amount)
+
+    def _delegation_map(self, events, index):
+        steps, accounts, amounts = events
+        n = int(np.searchsorted(steps, index, side="right"))
+        deleg = {}
+        for account, amount in zip(accounts[:n], amounts[:n].tolist()):
+            self._apply_delegation(deleg, account, amount)
+        return deleg
+
+    def _delegation_maps(self, events):
+        steps, accounts, amounts = events
+        steps = steps.tolist()
+        amounts = amounts.tolist()
+        maps = []
+        deleg = {}
+        e = 0
+        for index in range(len(self._ts)):
+            if e < len(steps) and steps[e] == index:
+                deleg = dict(deleg)
+                while e < len(steps) and steps[e] == index:
+                    self._apply_delegation(deleg, accounts[e], amounts[e])
+                    e += 1
+            maps.append(deleg)
+        return maps
+
+    def _steem_per_mvest(self, timestamps):
+        """ Returns the STEEM per MVEST ratio for an array of unix timestamps"""
+        unique, inverse = np.unique(timestamps, return_inverse=True)
+        ratio = np.array([self.steem.get_steem_per_mvest(t) for t in unique.tolist()], dtype=np.float64)
+        return ratio[inverse.reshape(-1)]
+
+    def _parse_timestamps(self, timestamps):
+        try:
+            return np.array(timestamps, dtype="datetime64[s]").astype(np.int64)
+        except (ValueError, TypeError):
+            return np.array([formatToTimeStamp(t) for t in timestamps], dtype=np.int64)
+
+    def _parse_amount(self, amount):
+        if isinstance(amount, str):
+            value, symbol = amount.split(" ")
+            return float(value), symbol
+        amount = Amount(amount, steem_instance=self.steem)
+        return amount.amount, amount.symbol
+
+    def _add_row(self, timestamp, vests=0, sp=0, steem=0, sbd=0, delegated_in=None, delegated_out=None):
+        """ Adds one balance change, sp is converted to vests in bulk"""
+        pending = self._pending
+        row = len(pending["ts"])
+        pending["ts"].append(timestamp)
+        pending["vests"].append(vests)
+        pending["sp"].append(sp)
+        pending["steem"].append(steem)
+        pending["sbd"].append(sbd)
+        if delegated_in is not None:
+            account, amount = delegated_in
+            old = self._din_state.pop(account, 0)
+            if amount != 0:
+                self._din_state[account] = amount
+            pending["din"].append((row, account, amount, amount - old))
+        if delegated_out is not None:
+            account, amount = delegated_out
+            if account is None:
+                # return_vesting_delegation
+                for delegatee in self._dout_state:
+                    if self._dout_state[delegatee] == amount:
+                        del self._dout_state[delegatee]
+                        pending["dout"].append((row, delegatee, 0, -amount))
+                        break
+            elif amount != 0:
+                # new or updated non-zero delegation, undelegations wait for
+                # 'return_vesting_delegation'
+                old = self._dout_state.get(account, 0)
+                self._dout_state[account] = amount
+                pending["dout"].append((row, account, amount, amount - old))
+
+    def _append_events(self, events, pending, offset):
+        steps, accounts, amounts = events
+        if not pending:
+            return events
+        rows, new_accounts, new_amounts, _ = zip(*pending)
+        return (np.concatenate([steps, offset + 2 * np.array(rows, dtype=np.int64) + 1]),
+                accounts + list(new_accounts),
+                np.concatenate([amounts, np.array(new_amounts, dtype=np.float64)]))
+
+    def _delegation_sums(self, pending, n):
+        delta = np.zeros(n)
+        if pending:
+            rows, _, _, deltas = zip(*pending)
+            np.add.at(delta, np.array(rows, dtype=np.int64), np.array(deltas, dtype=np.float64))
+        return delta
+
+    @staticmethod
+    def _append_steps(values, before, after):
+        steps = np.empty(2 * len(after), dtype=values.dtype)
+        steps[0::2] = before
+        steps[1::2] = after
+        return np.concatenate([values, steps])
+
+    def _append_balance(self, values, delta):
+        after = values[-1] + np.cumsum(delta)
+        before = np.concatenate([values[-1:], after[:-1]])
+        return self._append_steps(values, before, after)
+
+    def _flush(self):
+        """ Converts the pending rows into the state arrays"""
+        pending = self._pending
+        self._cache = {}
+        if pending["reward"]:
+            ts, curation, vests, steem, sbd = zip(*pending["reward"])
+            self._reward_ts = np.concatenate([self._reward_ts, np.array(ts, dtype=np.int64)])
+            self.curation_rewards = np.concatenate([self.curation_rewards, np.array(curation, dtype=np.float64)])
+            self.author_rewards.extend([{"vests": v, "steem": s, "sbd": d} for (v, s, d) in zip(vests, steem, sbd)])
+        if pending["out_vote"]:
+            ts, weight = zip(*pending["out_vote"])
+            self._out_vote_ts = np.concatenate([self._out_vote_ts, np.array(ts, dtype=np.int64)])
+            self.out_vote_weight = np.concatenate([self.out_vote_weight, np.array(weight, dtype=np.int64)])
+        n = len(pending["ts"])
+        if n > 0:
+            ts = np.array(pending["ts"], dtype=np.int64)
+            vests = np.array(pending["vests"], dtype=np.float64)
+            sp = np.array(pending["sp"], dtype=np.float64)
+            if sp.any():
+                vests += sp * 1e6 / self._steem_per_mvest(ts)
+            offset = len(self._ts)
+            self._ts = self._append_steps(self._ts, ts - 1, ts)
+            self.own_vests = self._append_balance(self.own_vests, vests)
+            self.own_steem = self._append_balance(self.own_steem, np.array(pending["steem"], dtype=np.float64))
+            self.own_sbd = self._append_balance(self.own_sbd, np.array(pending["sbd"], dtype=np.float64))
+            self.delegated_vests_in_sum = self._append_balance(self.delegated_vests_in_sum,
+                                                               self._delegation_sums(pending["din"], n))
+            self.delegated_vests_out_sum = self._append_balance(self.delegated_vests_out_sum,
+                                                                self._delegation_sums(pending["dout"], n))
+            self._din_events = self._append_events(self._din_events, pending["din"], offset)
+            self._dout_events = self._append_events(self._dout_events, pending["dout"], offset)
+        self._clear_pending()
+
+    def get_index(self, timestamp, index=0):
+        """ Returns the index of the last snapshot step before timestamp,
+            -1 when there is none
+        """
+        # Find rightmost value less than x
+        return int(np.searchsorted(self._ts, self._to_seconds(timestamp), side="left")) - 1
+
+    def get_data(self, timestamp=None, index=0):
+        """ Returns snapshot for given timestamp"""
+        if timestamp is None:
+            timestamp = datetime.utcnow()
+        index = self.get_index(timestamp)
+        if index < 0:
+            return {}
+        ts = self._to_datetime(self._ts[index])
+        steem_per_mvest = self.steem.get_steem_per_mvest(int(self._ts[index]))
+        own = self._vests(self.own_vests[index])
+        sp_own = float(self.own_vests[index]) / 1e6 * steem_per_mvest
+        sp_in = float(self.delegated_vests_in_sum[index]) / 1e6 * steem_per_mvest
+        sp_out = float(self.delegated_vests_out_sum[index]) / 1e6 * steem_per_mvest
+        sp_eff = sp_own + sp_in - sp_out
+        steem = Amount(float(self.own_steem[index]), self.steem.steem_symbol, steem_instance=self.steem)
+        sbd = Amount(float(self.own_sbd[index]), self.steem.sbd_symbol, steem_instance=self.steem)
+        return {"timestamp": ts, "vests": own,
+                "delegated_vests_in": self._delegation_map(self._din_events, index),
+                "delegated_vests_out": self._delegation_map(self._dout_events, index),
+                "sp_own": sp_own, "sp_eff": sp_eff, "steem": steem, "sbd": sbd, "index": index}
+
+    def get_sp(self, timestamps):
+        """ Returns own and effective SP for many timestamps at once
+
+            :param timestamps: datetime objects or an array of unix timestamps
+            :returns: array of own SP and array of effective SP
+        """
+        if not isinstance(timestamps, np.ndarray):
+            timestamps = np.array([self._to_seconds(ts) for ts in timestamps], dtype=np.float64)
+        index = np.searchsorted(self._ts, timestamps, side="left") - 1
+        valid = index >= 0
+        index = np.maximum(index, 0)
+        steem_per_mvest = np.where(valid, self._steem_per_mvest(self._ts[index]), 0)
+        own = self.own_vests[index]
+        sp_own = own / 1e6 * steem_per_mvest
+        sp_eff = (own + self.delegated_vests_in_sum[index] - self.delegated_vests_out_sum[index]) / 1e6 * steem_per_mvest
+        return sp_own, sp_eff
+
+    _series_seconds = {"timestamps": "_ts", "reward_timestamps": "_reward_ts",
+                       "out_vote_timestamp": "_out_vote_ts"}
+
+    def _get_window(self, name, start=None, stop=None):
+        timestamps = self._series_timestamps.get(name)
+        if timestamps not in self._series_seconds:
+            return super(ColumnarAccountSnapshot, self)._get_window(name, start=start, stop=stop)
+        timestamps = getattr(self, self._series_seconds[timestamps])
+        first = 0
+        last = len(timestamps)
+        if start is not None:
+            first = int(np.searchsorted(timestamps, self._to_seconds(start), side="left"))
+        if stop is not None:
+            last = int(np.searchsorted(timestamps, self._to_seconds(stop), side="right"))
+        return np.asarray(getattr(self, name)[first:last], dtype=np.float64)
+
+    def _aggregate(self, values, func):
+        return float(getattr(np.asarray(values, dtype=np.float64), func)())
+
+    def update_rewards(self, timestamp, curation_reward, author_vests, author_steem, author_sbd):
+        self._pending["reward"].append((formatToTimeStamp(timestamp), float(curation_reward), float(author_vests),
+                                        float(author_steem), float(author_sbd)))
+        self._flush()
+
+    def update_out_vote(self, timestamp, weight):
+        self._pending["out_vote"].append((formatToTimeStamp(timestamp), weight))
+        self._flush()
+
+    def update(self, timestamp, own, delegated_in=None, delegated_out=None, steem=0, sbd=0):
+        """ Updates the internal state arrays
+
+            :param datetime timestamp: datetime of the update
+            :param own: vests
+            :type own: amount.Amount, float
+            :param dict delegated_in: Incoming delegation
+            :param dict delegated_out: Outgoing delegation
+            :param steem: steem
+            :type steem: amount.Amount, float
+            :param sbd: sbd
+            :type sbd: amount.Amount, float
+
+        """
+        if delegated_in:
+            delegated_in = (delegated_in['account'], float(delegated_in['amount']))
+        else:
+            delegated_in = None
+        if delegated_out:
+            delegated_out = (delegated_out['account'], float(delegated_out['amount']))
+        else:
+            delegated_out = None
+        self._add_row(formatToTimeStamp(timestamp), vests=float(own), steem=float(steem), sbd=float(sbd),
+                      delegated_in=delegated_in, delegated_out=delegated_out)
+        self._flush()
+
+    def build(self, only_ops=[], exclude_ops=[], enable_rewards=False, enable_out_votes=False, enable_in_votes=False):
+        """ Builds the account history based on all account operations
+
+            :param array only_ops: Limit generator by these
+                operations (*optional*)
+            :param array exclude_ops: Exclude thse operations from
+                generator (*optional*)
+
+        """
+        timestamps = self._parse_timestamps([op['timestamp'] for op in self])
+        order = np.argsort(timestamps, kind="mergesort")
+        order = order[timestamps[order] >= self._ts[-1]]
+        for i in order.tolist():
+            op = self[i]
+            if op['type'] in exclude_ops:
+                continue
+            if len(only_ops) > 0 and op['type'] not in only_ops:
+                continue
+            self.ops_statistics[op['type']] += 1
+            self._parse_op(op, int(timestamps[i]), only_ops=only_ops, enable_rewards=enable_rewards,
+                           enable_out_votes=enable_out_votes, enable_in_votes=enable_in_votes)
+        self._flush()
+
+    def parse_op(self, op, only_ops=[], enable_rewards=False, enable_out_votes=False, enable_in_votes=False):
+        """ Parse account history operation"""
+        self._parse_op(op, formatToTimeStamp(parse_time(op['timestamp'])), only_ops=only_ops,
+                       enable_rewards=enable_rewards, enable_out_votes=enable_out_votes,
+                       enable_in_votes=enable_in_votes)
+        self._flush()
+
+    def _parse_op(self, op, ts, only_ops=[], enable_rewards=False, enable_out_votes=False, enable_in_votes=False):
+        name = self.account["name"]
+        steem_symbol = self.steem.steem_symbol
+        sbd_symbol = self.steem.sbd_symbol
+
+        if op['type'] == "account_create":
+            fee = self._parse_amount(op['fee'])[0]
+            if op['new_account_name'] == name:
+                self._add_row(ts, sp=fee)
+            elif op['creator'] == name:
+                self._add_row(ts, steem=-fee)
+
+        elif op['type'] == "account_create_with_delegation":
+            fee = self._parse_amount(op['fee'])[0]
+            delegation = self._parse_amount(op['delegation'])[0]
+            if op['new_account_name'] == name:
+                self._add_row(ts, sp=fee, delegated_in=(op['creator'], delegation) if delegation > 0 else None)
+            elif op['creator'] == name:
+                self._add_row(ts, steem=-fee, delegated_out=(op['new_account_name'], delegation))
+
+        elif op['type'] == "delegate_vesting_shares":
+            vests = self._parse_amount(op['vesting_shares'])[0]
+            if op['delegator'] == name:
+                self._add_row(ts, delegated_out=(op['delegatee'], vests))
+            elif op['delegatee'] == name:
+                self._add_row(ts, delegated_in=(op['delegator'], vests))
+
+        elif op['type'] == "transfer":
+            amount, symbol = self._parse_amount(op['amount'])
+            for sign, account in ((-1, op['from']), (1, op['to'])):
+                if account != name:
+                    continue
+                if symbol == steem_symbol:
+                    self._add_row(ts, steem=sign * amount)
+                elif symbol == sbd_symbol:
+                    self._add_row(ts, sbd=sign * amount)
+
+        elif op['type'] == "fill_order":
+            current_pays, symbol = self._parse_amount(op["current_pays"])
+            open_pays = self._parse_amount(op["open_pays"])[0]
+            for sign, account in ((-1, op["current_owner"]), (1, op["open_owner"])):
+                if account != name:
+                    continue
+                if symbol == steem_symbol:
+                    self._add_row(ts, steem=sign * current_pays, sbd=-sign * open_pays)
+                elif symbol == sbd_symbol:
+                    self._add_row(ts, steem=-sign * open_pays, sbd=sign * current_pays)
+
+        elif op['type'] == "transfer_to_vesting":
+            steem = self._parse_amount(op['amount'])[0]
+            if op['from'] == name:
+                self._add_row(ts, sp=steem, steem=-steem)
+            else:
+                self._add_row(ts, sp=steem)
+
+        elif op['type'] == "fill_vesting_withdraw":
+            self._add_row(ts, vests=-self._parse_amount(op['withdrawn'])[0])
+
+        elif op['type'] == "return_vesting_delegation":
+            self._add_row(ts, delegated_out=(None, self._parse_amount(op['vesting_shares'])[0]))
+
+        elif op['type'] == "claim_reward_balance":
+            self._add_row(ts, vests=self._parse_amount(op['reward_vests'])[0],
+                          steem=self._parse_amount(op['reward_steem'])[0],
+                          sbd=self._parse_amount(op['reward_sbd'])[0])
+
+        elif op['type'] == "curation_reward":
+            if "curation_reward" in only_ops or enable_rewards:
+                vests = self._parse_amount(op['reward'])[0]
+            if "curation_reward" in only_ops:
+                self._add_row(ts, vests=vests)
+            if enable_rewards:
+                self._pending["reward"].append((ts, vests, 0., 0., 0.))
+
+        elif op['type'] == "author_reward":
+            if "author_reward" in only_ops or enable_rewards:
+                vests = self._parse_amount(op['vesting_payout'])[0]
+                steem = self._parse_amount(op['steem_payout'])[0]
+                sbd = self._parse_amount(op['sbd_payout'])[0]
+            if "author_reward" in only_ops:
+                self._add_row(ts, vests=vests, steem=steem, sbd=sbd)
+            if enable_rewards:
+                self._pending["reward"].append((ts, 0., vests, steem, sbd))
+
+        elif op['type'] == "producer_reward":
+            self._add_row(ts, vests=self._parse_amount(op['vesting_shares'])[0])
+
+        elif op['type'] == "comment_benefactor_reward":
+            if op['benefactor'] == name:
+                if "reward" in op:
+                    self._add_row(ts, vests=self._parse_amount(op['reward'])[0])
+                else:
+                    self._add_row(ts, vests=self._parse_amount(op['vesting_payout'])[0],
+                                  steem=self._parse_amount(op['steem_payout'])[0],
+                                  sbd=self._parse_amount(op['sbd_payout'])[0])
+
+        elif op['type'] == "fill_convert_request":
+            if op["owner"] == name:
+                self._add_row(ts, steem=self._parse_amount(op["amount_out"])[0],
+                              sbd=-self._parse_amount(op["amount_in"])[0])
+
+        elif op['type'] == "interest":
+            self._add_row(ts, sbd=self._parse_amount(op["interest"])[0])
+
+        elif op['type'] == "vote":
+            if "vote" in only_ops or enable_out_votes:
+                if op["voter"] == name:
+                    self._pending["out_vote"].append((ts, int(op['weight'])))
+            if "vote" in only_ops or enable_in_votes and op["author"] == name:
+                self.update_in_vote(self._to_datetime(ts), int(op['weight']), op)
+
+    def build_sp_arrays(self):
+        """ Builds the own_sp and eff_sp array"""
+        steem_per_mvest = self._steem_per_mvest(self._ts)
+        self.own_sp = self.own_vests / 1e6 * steem_per_mvest
+        self.eff_sp = (self.own_vests + self.delegated_vests_in_sum -
+                       self.delegated_vests_out_sum) / 1e6 * steem_per_mvest
+
+    def build_rep_arrays(self):
+        """ Build reputation arrays """
+        rshares = np.array(self.in_vote_rshares, dtype=np.int64)
+        rep = np.array(self.in_vote_rep, dtype=np.int64)
+        # Negative votes only count when the voter has a higher reputation
+        # than the account at that time, all others are a cumsum
+        delta = np.where((rep > 0) & (rshares > 0), rshares >> 6, 0)
+        conditional = np.flatnonzero((rep > 0) & (rshares < 0))
+        if len(conditional):
+            delta = delta.tolist()
+            current_reputation = 0
+            start = 0
+            for i in conditional.tolist():
+                current_reputation += sum(delta[start:i])
+                if rep[i] > current_reputation:
+                    delta[i] = int(rshares[i]) >> 6
+                current_reputation += delta[i]
+                start = i + 1
+            delta = np.array(delta, dtype=np.int64)
+        reputation = np.concatenate([[0], np.cumsum(delta)]).astype(np.float64)
+        score = np.maximum(np.log10(np.maximum(np.abs(reputation), 1)) - 9, 0) * np.sign(reputation)
+        self.rep = score * 9.0 + 25.0
+        self.rep_timestamp = [self._to_datetime(self._ts[1])] + list(self.in_vote_timestamp)
+
+    def build_vp_arrays(self):
+        """ Build vote power arrays"""
+        timestamps = np.concatenate([self._ts[1:2], self._out_vote_ts])
+        regenerated = (np.diff(timestamps) * STEEM_100_PERCENT / STEEM_VOTE_REGENERATION_SECONDS).astype(np.int64)
+        vp = [STEEM_100_PERCENT]
+        for (regenerated_vp, weight) in zip(regenerated.tolist(), self.out_vote_weight.tolist()):
+            current_vp = vp[-1]
+            if current_vp < STEEM_100_PERCENT:
+                current_vp = min(current_vp + regenerated_vp, STEEM_100_PERCENT)
+            current_vp -= self.steem._calc_resulting_vote(current_vp, weight)
+            vp.append(max(current_vp, 0))
+        self.vp = np.array(vp, dtype=np.int64)
+        self.vp_timestamp = self._to_datetimes("vp_timestamp", timestamps)
+
+    def build_curation_arrays(self, end_date=None, sum_days=7):
+        """ Build curation arrays"""
+        self.curation_per_1000_SP_timestamp = []
+        self.curation_per_1000_SP = []
+        if sum_days <= 0:
+            raise ValueError("sum_days must be greater than 0")
+        days = (int(self._reward_ts[-1] - self._reward_ts[0]) // 86400) // sum_days * sum_days
+        if end_date is None:
+            end_date = int(self._reward_ts[-1]) - days * 86400
+        else:
+            end_date = self._to_seconds(end_date)
+        mask = self.curation_rewards != 0
+        reward_ts = self._reward_ts[mask]
+        sp = self.curation_rewards[mask] / 1e6 * self._steem_per_mvest(reward_ts)
+        sp_eff = self.get_sp(reward_ts)[1]
+        valid = sp_eff > 0
+        curation_1k_sp = np.zeros(len(sp))
+        curation_1k_sp[valid] = sp[valid] / sp_eff[valid] * 1000 / sum_days * 7
+        curation_sum = 0
+        for (ts, value) in zip(reward_ts.tolist(), curation_1k_sp.tolist()):
+            if ts < end_date:
+                curation_sum += value
+            else:
+                self.curation_per_1000_SP_timestamp.append(self._to_datetime(end_date))
+                self.curation_per_1000_SP.append(curation_sum)
+                end_date = end_date + sum_days * 86400
+                curation_sum = 0
@@ -73,6 +73,18 @@ class Steem(object):
             broadcast posting op or creating hot_links (default is False)
         :param SteemConnect steemconnect: A SteemConnect object can be set manually, set use_sc2 to True
         :param dict custom_chains: custom chain which should be added to the known chains
+        :param BlockStore block_store: irreversible blocks are read from and written to this
+            :class:`beem.blockstore.BlockStore` *(optional)*
+        :param HistoryStore history_store: account history is synced into and read from this
+            :class:`beem.historystore.HistoryStore` *(optional)*
+        :param int pool_maxsize: Number of keep-alive connections per https node. When set,
+            a pooled session is used instead of the shared session *(optional)*
+        :param bool pool_per_node: When True, every https node gets its own pooled session *(optional)*
+        :param bool use_http2: Use HTTP/2 for https nodes, needs httpx with h2 *(optional)*
+        :param bool hedge_requests: Send slow https calls a second time to the next best node
+            and use the first answer *(optional)*
+        :param int route_interval: Number of calls after which the rpc switches to a node which
+            answers at least twice as fast, 0 disables it (default is 100)
 
         Three wallet operation modes are possible:
 
@@ -183,6 +195,8 @@ class Steem(object):
         self.use_sc2 = bool(kwargs.get("use_sc2", False))
         self.blocking = kwargs.get("blocking", False)
         self.custom_chains = kwargs.get("custom_chains", {})
+        self.block_store = kwargs.get("block_store", None)
+        self.history_store = kwargs.get("history_store", None)
 
         # Store config for access through other Classes
         self.config = config
@@ -297,7 +311,12 @@ class Steem(object):
         if self.rpc is None:
             return None
         self.rpc.set_next_node_on_empty_reply(True)
-        return self.rpc.get_dynamic_global_properties(api="database")
+        props = self.rpc.get_dynamic_global_properties(api="database")
+        if self.block_store is not None and props is not None:
+            self.block_store.set_last_irreversible_block_num(props.get("last_irreversible_block_num"))
+        if self.history_store is not None and props is not None:
+            self.history_store.set_last_irreversible_block_num(props.get("last_irreversible_block_num"))
+        return props
 
     def get_reserve_ratio(self):
         """ This call returns the *reserve ratio*
@@ -215,6 +215,18 @@ class Key(DataDir):
         else:
             return None
 
+    def getKeyPairs(self):
+        """ Returns all public keys with their (possibly encrypted) private keys
+        """
+        query = ("SELECT pub, wif from {0} ".format(self.__tablename__))
+        connection = sqlite3.connect(self.sqlDataBaseFile)
+        cursor = connection.cursor()
+        try:
+            cursor.execute(query)
+            return [(x[0], x[1]) for x in cursor.fetchall()]
+        except sqlite3.OperationalError:
+            return []
+
     def updateWif(self, pub, wif):
         """ Change the wif to a pubkey
 
@@ -6,12 +6,16 @@ from __future__ import unicode_literals
 from builtins import str
 from future.utils import python_2_unicode_compatible
 import logging
+import time
 from beemgraphenebase.py23 import bytes_types, integer_types, string_types, text_type
 from .account import Account
+from .blockchainobject import ObjectCache
 from .utils import formatTimeFromNow
 from .steemconnect import SteemConnect
 from beembase.objects import Operation
-from beemgraphenebase.account import PrivateKey, PublicKey
+from beemgraphenebase.account import PublicKey
+from beemgraphenebase.ecdsasig import get_signer, sign_digests
+from beemgraphenebase.types import Array, Signature
 from beembase.signedtransactions import Signed_Transaction
 from beembase import transactions, operations
 from .exceptions import (
@@ -21,9 +25,26 @@ from .exceptions import (
     WalletLocked,
     OfflineHasNoRPCException
 )
-from beem.instance import shared_steem_instance
+from beem.instance import shared_steem_instance, steem_instance_queue
 log = logging.getLogger(__name__)
 
+FUTURES_MODULE = None
+if not FUTURES_MODULE:
+    try:
+        from concurrent.futures import ThreadPoolExecutor
+        FUTURES_MODULE = "futures"
+    except ImportError:
+        FUTURES_MODULE = None
+
+
+#: Operations which change authorities and the field with the changed account
+authority_ops = {
+    "account_update": "account",
+    "account_update2": "account",
+    "recover_account": "account_to_recover",
+    "reset_account": "account_to_reset",
+}
+
 
 @python_2_unicode_compatible
 class TransactionBuilder(dict):
@@ -51,6 +72,8 @@ class TransactionBuilder(dict):
            broadcast_tx = tx.broadcast()
 
     """
+    _authority_cache = ObjectCache(default_expiration=300, max_entries=1000)
+
     def __init__(
         self,
         tx={},
@@ -100,6 +123,8 @@ class TransactionBuilder(dict):
 
     def _set_require_reconstruction(self):
         self._require_reconstruction = True
+        if self.tx is not None:
+            self.tx.clear_cache()
 
     def _unset_require_reconstruction(self):
         self._require_reconstruction = False
@@ -145,38 +170,38 @@ class TransactionBuilder(dict):
         """ Try to obtain the wif key from the wallet by telling which account
             and permission is supposed to sign the transaction
             It is possible to add more than one signer.
+
+            The authorities of the accounts are cached for
+            ``_authority_cache.default_expiration`` seconds (see
+            :func:`set_authority_cache_policy`) and are removed from the cache
+            when an operation which changes them is broadcast.
         """
         if not self.steem.is_connected():
             return
         if permission not in ["active", "owner", "posting"]:
             raise AssertionError("Invalid permission")
-        account = Account(account, steem_instance=self.steem)
-        if permission not in account:
-            account = Account(account, steem_instance=self.steem, lazy=False, full=True)
-            account.clear_cache()
-            account.refresh()
-        if permission not in account:
-            account = Account(account, steem_instance=self.steem)
-        if permission not in account:
-            raise AssertionError("Could not access permission")
+        if isinstance(account, dict):
+            account = account["name"]
+        authority = self._get_authority(account, permission)
 
-        required_treshold = account[permission]["weight_threshold"]
+        required_treshold = authority["weight_threshold"]
         if self.steem.wallet.locked():
             raise WalletLocked()
         if self.steem.use_sc2 and self.steem.steemconnect is not None:
-            self.steem.steemconnect.set_username(account["name"], permission)
+            self.steem.steemconnect.set_username(account, permission)
             return
 
         def fetchkeys(account, perm, level=0):
             if level > 2:
                 return []
             r = []
-            for authority in account[perm]["key_auths"]:
+            authority = self._get_authority(account, perm)
+            for key_auth in authority["key_auths"]:
                 try:
                     wif = self.steem.wallet.getPrivateKeyForPublicKey(
-                        authority[0])
+                        key_auth[0])
                     if wif:
-                        r.append([wif, authority[1]])
+                        r.append([wif, key_auth[1]])
                 except ValueError:
                     pass
                 except MissingKeyError:
@@ -184,38 +209,99 @@ class TransactionBuilder(dict):
 
             if sum([x[1] for x in r]) < required_treshold:
                 # go one level deeper
-                for authority in account[perm]["account_auths"]:
-                    auth_account = Account(
-                        authority[0], steem_instance=self.steem)
-                    r.extend(fetchkeys(auth_account, perm, level + 1))
+                for account_auth in authority["account_auths"]:
+                    r.extend(fetchkeys(account_auth[0], perm, level + 1))
 
             return r
 
-        if account["name"] not in self.signing_accounts:
-            # is the account an instance of public key?
-            if isinstance(account, PublicKey):
-                self.wifs.add(
-                    self.steem.wallet.getPrivateKeyForPublicKey(
-                        str(account)
-                    )
-                )
+        if account not in self.signing_accounts:
+            keys = fetchkeys(account, permission)
+            # If keys are empty, try again with active key
+            if not keys and permission == "posting":
+                _keys = fetchkeys(account, "active")
+                keys.extend(_keys)
+            # If keys are empty, try again with owner key
+            if not keys and permission != "owner":
+                _keys = fetchkeys(account, "owner")
+                keys.extend(_keys)
+            for x in keys:
+                self.wifs.add(x[0])
+
+            self.signing_accounts.append(account)
+
+    def _get_authority(self, account, permission):
+        """ Returns the authority of an account for a permission from the
+            authority cache or from the account
+        """
+        key = (self.steem.chain_params["chain_id"], account, permission)
+        authority = self._authority_cache.get(key, None)
+        if authority is not None:
+            return authority
+        account = Account(account, steem_instance=self.steem)
+        if permission not in account:
+            account = Account(account, steem_instance=self.steem, lazy=False, full=True)
+            account.clear_cache()
+            account.refresh()
+        if permission not in account:
+            account = Account(account, steem_instance=self.steem)
+        if permission not in account:
+            raise AssertionError("Could not access permission")
+        authority = account[permission]
+        self._authority_cache[(key[0], account["name"], permission)] = authority
+        return authority
+
+    @classmethod
+    def set_authority_cache_policy(cls, **kwargs):
+        """ Changes the policy of the authority cache, which is used by
+            :func:`appendSigner`, e.g.
+            ``TransactionBuilder.set_authority_cache_policy(default_expiration=60)``
+
+            :param int default_expiration: seconds until a cached authority expires
+            :param int max_entries: maximum number of cached authorities
+        """
+        for key in kwargs:
+            if key not in ["default_expiration", "auto_clean", "max_entries", "max_bytes"]:
+                raise ValueError("%s is not a cache policy parameter" % key)
+            setattr(cls._authority_cache, key, kwargs[key])
+        cls._authority_cache.evict()
+
+    @classmethod
+    def clear_authority_cache(cls, account=None):
+        """ Removes the cached authorities of an account on all chains, or
+            all cached authorities when account is None
+        """
+        if account is None:
+            cls._authority_cache.clear()
+            return
+        with cls._authority_cache.lock:
+            for key in [k for k in dict.keys(cls._authority_cache) if k[1] == account]:
+                del cls._authority_cache[key]
+
+    @classmethod
+    def clear_authority_cache_for_ops(cls, ops):
+        """ Removes the cached authorities of all accounts which are changed
+            by ops, e.g. by ``account_update``. Operations can be given as
+            operation objects, ``[type, value]`` lists or ``{"type": ..., "value": ...}``
+            dicts, so that the ops of a block stream can be passed directly.
+        """
+        for op in ops:
+            if isinstance(op, Operation):
+                op = op.op
+            if isinstance(op, list) and len(op) == 2:
+                op_type, value = op
+            elif isinstance(op, dict) and "type" in op and "value" in op:
+                op_type, value = op["type"], op["value"]
+            elif isinstance(op, dict) and "op" in op:
+                cls.clear_authority_cache_for_ops([op["op"]])
+                continue
+            elif hasattr(op, "json"):
+                op_type, value = type(op).__name__.lower(), op.json()
             else:
-                if permission not in account:
-                    raise AssertionError("Could not access permission")
-                required_treshold = account[permission]["weight_threshold"]
-                keys = fetchkeys(account, permission)
-                # If keys are empty, try again with active key
-                if not keys and permission == "posting":
-                    _keys = fetchkeys(account, "active")
-                    keys.extend(_keys)
-                # If keys are empty, try again with owner key
-                if not keys and permission != "owner":
-                    _keys = fetchkeys(account, "owner")
-                    keys.extend(_keys)
-                for x in keys:
-                    self.wifs.add(x[0])
-
-            self.signing_accounts.append(account["name"])
+                continue
+            if isinstance(op_type, string_types) and op_type.endswith("_operation"):
+                op_type = op_type[:-10]
+            if op_type in authority_ops:
+                cls.clear_authority_cache(value[authority_ops[op_type]])
 
     def appendWif(self, wif):
         """ Add a wif that should be used for signing of the transaction.
@@ -225,7 +311,8 @@ class TransactionBuilder(dict):
         """
         if wif:
             try:
-                PrivateKey(wif, prefix=self.steem.prefix)
+                # the parsed key is kept by the signer and reused by sign()
+                get_signer(wif)
                 self.wifs.add(wif)
             except:
                 raise InvalidWifError
@@ -297,7 +384,11 @@ class TransactionBuilder(dict):
             operations.default_prefix = self["blockchain"]["prefix"]
 
         try:
-            signedtx = Signed_Transaction(**self.json(with_prefix=True))
+            if self.tx is not None and not self._is_require_reconstruction():
+                # The constructed transaction keeps its serialized body and digest
+                signedtx = self.tx.copy()
+            else:
+                signedtx = Signed_Transaction(**self.json(with_prefix=True))
             signedtx.add_custom_chains(self.steem.custom_chains)
         except:
             raise ValueError("Invalid TransactionBuilder Format")
@@ -305,7 +396,7 @@ class TransactionBuilder(dict):
         if not any(self.wifs):
             raise MissingKeyError
 
-        signedtx.sign(self.wifs, chain=self.steem.chain_params)
+        signedtx.sign([get_signer(wif) for wif in self.wifs], chain=self.steem.chain_params)
         self["signatures"].extend(signedtx.json().get("signatures"))
         return signedtx
 
@@ -422,6 +513,7 @@ class TransactionBuilder(dict):
             self.clear()
             raise e
 
+        self.clear_authority_cache_for_ops(self["operations"])
         self.clear()
         return ret
 
@@ -431,6 +523,7 @@ class TransactionBuilder(dict):
         self.ops = []
         self.wifs = set()
         self.signing_accounts = []
+        self.tx = None
         # This makes sure that _is_constructed will return False afterwards
         self["expiration"] = None
         super(TransactionBuilder, self).__init__({})
@@ -496,3 +589,198 @@ class TransactionBuilder(dict):
                     self.appendWif(wif)
             except MissingKeyError:
                 wif = None
+
+
+class TransactionPipeline(object):
+    """ Constructs, signs and broadcasts many transactions, e.g. for mass
+        transfers. The transactions are processed in windows: the reference
+        block is fetched once per ``ref_block_interval`` seconds, the signing
+        keys of every account are resolved once, all digests of a window are
+        signed together in a process pool and the transactions are broadcast
+        by ``broadcast_threads`` threads at the same time.
+
+        :param int processes: Number of processes which sign (default is the number of cpus)
+        :param int broadcast_threads: Number of transactions which are broadcast at
+            the same time (default is 4)
+        :param int window_size: Number of transactions which are signed and
+            broadcast together (default is 500)
+        :param int ref_block_interval: Seconds for which the reference block is reused (default is 60)
+        :param int expiration: Delay in seconds until transactions are supposed
+            to expire *(optional)*
+        :param Steem steem_instance: If not set, shared_steem_instance() is used
+
+        Every transaction gets a result dict with the keys ``ops``, ``trx``
+        (the signed transaction), ``status`` (``signed``, ``broadcasted`` or
+        ``failed``), ``error`` and ``result`` (the broadcast reply). Failed
+        transactions can be processed again with :func:`retry`.
+
+        .. code-block:: python
+
+            from beem.transactionbuilder import TransactionPipeline
+            from beembase.operations import Transfer
+            pipeline = TransactionPipeline(steem_instance=stm)
+            ops = [Transfer({"from": "payer", "to": name, "amount": "1.000 STEEM", "memo": ""}) for name in receivers]
+            results = pipeline.run(ops, account="payer")
+            results = pipeline.retry(results)
+            print([r["status"] for r in results])
+
+    """
+    def __init__(
+        self,
+        processes=None,
+        broadcast_threads=4,
+        window_size=500,
+        ref_block_interval=60,
+        expiration=None,
+        steem_instance=None
+    ):
+        self.steem = steem_instance or shared_steem_instance()
+        self.processes = processes
+        self.broadcast_threads = broadcast_threads
+        self.window_size = window_size
+        self.ref_block_interval = ref_block_interval
+        self.expiration = expiration
+        self._block_params = None
+        self._block_params_time = 0
+        self._wifs = {}
+        self._steem_instances = None
+
+    def get_block_params(self):
+        """ Returns ref_block_num and ref_block_prefix, which are fetched again
+            after ref_block_interval seconds
+        """
+        if self._block_params is None or time.time() - self._block_params_time > self.ref_block_interval:
+            if not self.steem.is_connected():
+                raise OfflineHasNoRPCException("No RPC available in offline mode!")
+            self._block_params = transactions.getBlockParams(self.steem.rpc)
+            self._block_params_time = time.time()
+        return self._block_params
+
+    def set_block_params(self, ref_block_num, ref_block_prefix):
+        """ Sets the reference block, e.g. for signing offline"""
+        self._block_params = (ref_block_num, ref_block_prefix)
+        self._block_params_time = time.time()
+
+    def get_wifs(self, account, permission="active"):
+        """ Returns the wif keys from the wallet which sign for account and
+            permission. The keys are resolved once per account and permission.
+        """
+        key = (account, permission)
+        if key not in self._wifs:
+            tx = TransactionBuilder(steem_instance=self.steem)
+            tx.appendSigner(account, permission)
+            self._wifs[key] = list(tx.wifs)
+        return self._wifs[key]
+
+    def clear_wifs(self):
+        """ Removes the resolved keys, e.g. after an account update"""
+        self._wifs = {}
+
+    def run(self, op_batches, account=None, permission="active", wifs=None, broadcast=True):
+        """ Signs and broadcasts one transaction for every entry of op_batches
+
+            :param list op_batches: List of operations or lists of operations
+            :param str account: Account which signs the transactions with the keys
+                of permission from the wallet
+            :param str permission: active, owner or posting (default is active)
+            :param list wifs: wif keys which sign the transactions instead of
+                the keys of account
+            :param bool broadcast: When False, the transactions are only signed
+
+            Returns a list with one result dict per transaction.
+        """
+        results = []
+        for ops in op_batches:
+            if not isinstance(ops, list):
+                ops = [ops]
+            results.append({"ops": ops, "account": account, "permission": permission, "wifs": wifs,
+                            "trx": None, "status": None, "error": None, "result": None})
+        self._process(results, broadcast)
+        return results
+
+    def retry(self, results, broadcast=True):
+        """ Signs and broadcasts the failed transactions of results again with
+            a new reference block and expiration
+
+            :param list results: results returned by :func:`run`
+            :param bool broadcast: When False, the transactions are only signed
+        """
+        failed = [r for r in results if r["status"] == "failed"]
+        self._process(failed, broadcast)
+        return results
+
+    def _process(self, results, broadcast):
+        for i in range(0, len(results), self.window_size):
+            window = results[i:i + self.window_size]
+            self._sign(window)
+            if broadcast:
+                self._broadcast(window)
+
+    def _sign(self, results):
+        """ Constructs the transactions of results and signs them together"""
+        ref_block_num, ref_block_prefix = self.get_block_params()
+        expiration = formatTimeFromNow(self.expiration or self.steem.expiration)
+        chain = self.steem.chain_params
+        digests_wifs = []
+        signed = []
+        for r in results:
+            r.update({"trx": None, "status": None, "error": None, "result": None})
+            try:
+                wifs = r["wifs"] or self.get_wifs(r["account"], r["permission"])
+                if not wifs:
+                    raise MissingKeyError
+                tx = Signed_Transaction(
+                    ref_block_prefix=ref_block_prefix,
+                    expiration=expiration,
+                    operations=[Operation(op, appbase=False, prefix=self.steem.prefix) for op in r["ops"]],
+                    ref_block_num=ref_block_num,
+                    custom_chains=self.steem.custom_chains,
+                    prefix=self.steem.prefix
+                )
+                tx.deriveDigest(chain)
+            except Exception as e:
+                r.update({"status": "failed", "error": e})
+                continue
+            signed.append((r, tx, len(wifs)))
+            digests_wifs.extend([(tx.digest, wif) for wif in wifs])
+        signatures = sign_digests(digests_wifs, processes=self.processes)
+        start = 0
+        for r, tx, n in signed:
+            tx.data["signatures"] = Array([Signature(s) for s in signatures[start:start + n]])
+            start += n
+            r.update({"trx": tx.json(), "status": "signed"})
+
+    def _get_steem_instances(self):
+        """ Returns a queue with one Steem instance per broadcast thread"""
+        if self._steem_instances is None:
+            self._steem_instances = steem_instance_queue(self.steem, self.broadcast_threads)
+        return self._steem_instances
+
+    def _broadcast_one(self, r, steem_instances=None):
+        stm = self.steem if steem_instances is None else steem_instances.get()
+        try:
+            r["result"] = TransactionBuilder(r["trx"], steem_instance=stm).broadcast()
+            r["status"] = "broadcasted"
+        except Exception as e:
+            r.update({"status": "failed", "error": e})
+        finally:
+            if steem_instances is not None:
+                steem_instances.put(stm)
+
+    def _broadcast(self, results):
+        """ Broadcasts the signed transactions of results"""
+        results = [r for r in results if r["status"] == "signed"]
+        if self.steem.nobroadcast or not self.steem.is_connected():
+            log.info("Not broadcasting anything!")
+            return
+        if self.broadcast_threads > 1 and len(results) > 1 and FUTURES_MODULE is not None:
+            steem_instances = self._get_steem_instances()
+            pool = ThreadPoolExecutor(max_workers=self.broadcast_threads)
+            try:
+                for r in results:
+                    pool.submit(self._broadcast_one, r, steem_instances)
+            finally:
+                pool.shutdown(wait=True)
+        else:
+            for r in results:
+                self._broadcast_one(r)
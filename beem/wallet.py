@@ -7,8 +7,11 @@ from builtins import object
 import logging
 import os
 import hashlib
+import time
+import multiprocessing
 from beemgraphenebase import bip38
 from beemgraphenebase.account import PrivateKey
+from beemgraphenebase.ecdsasig import clear_signer_cache
 from beem.instance import shared_steem_instance
 from .account import Account
 from .aes import AESCipher
@@ -36,6 +39,28 @@ except ImportError:
 
 log = logging.getLogger(__name__)
 
+FUTURES_MODULE = None
+if not FUTURES_MODULE:
+    try:
+        from concurrent.futures import ProcessPoolExecutor
+        FUTURES_MODULE = "futures"
+    except ImportError:
+        FUTURES_MODULE = None
+
+
+def _decrypt_wif(args):
+    """ Decrypts a wif key with the master password, process pool worker for
+        :func:`Wallet.unlock_all`
+    """
+    encwif, masterpassword, prefix = args
+    try:
+        # Try to decode as wif
+        PrivateKey(encwif, prefix=prefix)
+        return encwif
+    except (ValueError, AssertionError):
+        pass
+    return format(bip38.decrypt(encwif, masterpassword), "wif")
+
 
 class Wallet(object):
     """ The wallet is meant to maintain access to private keys for
@@ -84,6 +109,15 @@ class Wallet(object):
            steem = Steem()
            steem.wallet.unlock("supersecret-passphrase")
 
+        Decrypted keys are kept in memory until :func:`lock` overwrites them,
+        or for ``key_cache_expiration`` seconds when this parameter is given to
+        Wallet or Steem. :func:`unlock_all` decrypts all keys at once.
+        :func:`lock` also clears the cached signers of
+        :func:`beemgraphenebase.ecdsasig.get_signer`. Keys which were returned
+        as str, e.g. by :func:`getPrivateKeyForPublicKey` or added to a
+        TransactionBuilder, are immutable copies which cannot be overwritten
+        and stay in memory until they are garbage collected.
+
         A private key can be added by using the
         :func:`addPrivateKey` method that is available
         **after** unlocking the wallet with the correct passphrase:
@@ -114,6 +148,10 @@ class Wallet(object):
 
     def __init__(self, steem_instance=None, *args, **kwargs):
         self.steem = steem_instance or shared_steem_instance()
+        # Decrypted keys of the wallet database by public key, they are
+        # kept as bytearray and overwritten when the wallet is locked
+        self._decrypted_keys = {}
+        self.key_cache_expiration = kwargs.get("key_cache_expiration", None)
 
         # Compatibility after name change from wif->keys
         if "wif" in kwargs and "keys" not in kwargs:
@@ -226,6 +264,70 @@ class Wallet(object):
         """ Lock the wallet database
         """
         self.masterpassword = None
+        self.clear_decrypted_keys()
+        clear_signer_cache()
+
+    def unlock_all(self, pwd=None, processes=None):
+        """ Unlocks the wallet database and decrypts all stored keys at once,
+            so that signing needs no further key derivation. The keys are
+            decrypted in parallel by worker processes.
+
+            :param str pwd: wallet password, when not set the password from
+                the environment or the keyring is used
+            :param int processes: number of worker processes, when None the
+                number of cpus is used. With 1, the keys are decrypted in this process.
+
+            Returns the number of decrypted keys.
+
+            .. note:: The master password is sent to the worker processes.
+        """
+        if Wallet.keys or not self.keyStorage:
+            return 0
+        if pwd is not None or not self.masterpassword:
+            self.unlock(pwd)
+        if self.locked():
+            raise WalletLocked
+        todo = [(pub, encwif) for pub, encwif in self.keyStorage.getKeyPairs()
+                if self._get_decrypted_key(pub) is None]
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        args = [(encwif, self.masterpassword, self.prefix) for pub, encwif in todo]
+        if len(todo) > 1 and processes > 1 and FUTURES_MODULE is not None:
+            with ProcessPoolExecutor(max_workers=min(processes, len(todo))) as pool:
+                wifs = list(pool.map(_decrypt_wif, args))
+        else:
+            wifs = [_decrypt_wif(a) for a in args]
+        for (pub, encwif), wif in zip(todo, wifs):
+            self._set_decrypted_key(pub, wif)
+        return len(todo)
+
+    def _get_decrypted_key(self, pub):
+        """ Returns the decrypted key of pub, when it is cached and not expired"""
+        entry = self._decrypted_keys.get(pub)
+        if entry is None:
+            return None
+        key, expires = entry
+        if expires is not None and expires < time.time():
+            self._remove_decrypted_key(pub)
+            return None
+        return key.decode("ascii")
+
+    def _set_decrypted_key(self, pub, wif):
+        expires = None
+        if self.key_cache_expiration is not None:
+            expires = time.time() + self.key_cache_expiration
+        self._decrypted_keys[pub] = (bytearray(py23_bytes(wif, "ascii")), expires)
+
+    def _remove_decrypted_key(self, pub):
+        entry = self._decrypted_keys.pop(pub, None)
+        if entry is not None:
+            key = entry[0]
+            key[:] = bytearray(len(key))
+
+    def clear_decrypted_keys(self):
+        """ Overwrites and removes all decrypted keys of the wallet database"""
+        for pub in list(self._decrypted_keys):
+            self._remove_decrypted_key(pub)
 
     def unlocked(self):
         """ Is the wallet database unlocked?
@@ -237,6 +339,8 @@ class Wallet(object):
         """
         if Wallet.keys:  # Keys have been manually provided!
             return False
+        if self.masterpassword:
+            return False
         try:
             self.tryUnlockFromEnv()
         except WrongMasterPasswordException:
@@ -300,6 +404,8 @@ class Wallet(object):
             keyStorage.wipe(sure)
             tokenStorage.wipe(sure)
             self.clear_local_keys()
+            self.clear_decrypted_keys()
+            clear_signer_cache()
 
     def clear_local_keys(self):
         """Clear all manually provided keys"""
@@ -445,10 +551,15 @@ class Wallet(object):
             if not self.unlocked():
                 raise WalletLocked
 
+            wif = self._get_decrypted_key(pub)
+            if wif is not None:
+                return wif
             encwif = self.keyStorage.getPrivateKeyForPublicKey(pub)
             if not encwif:
                 raise MissingKeyError("No private key for {} found".format(pub))
-            return self.decrypt_wif(encwif)
+            wif = self.decrypt_wif(encwif)
+            self._set_decrypted_key(pub, wif)
+            return wif
 
     def removePrivateKeyFromPublicKey(self, pub):
         """ Remove a key from the wallet database
@@ -460,6 +571,8 @@ class Wallet(object):
             if not self.created():
                 raise NoWalletException
             self.keyStorage.delete(pub)
+            self._remove_decrypted_key(pub)
+            clear_signer_cache()
 
     def removeAccount(self, account):
         """ Remove all keys associated with a given account
@@ -10,7 +10,7 @@ from beemgraphenebase.py23 import bytes_types, integer_types, string_types, text
 from .account import Account
 from .amount import Amount
 from .exceptions import WitnessDoesNotExistsException
-from .blockchainobject import BlockchainObject
+from .blockchainobject import BlockchainObject, ObjectCache
 from .utils import formatTimeString
 from datetime import datetime, timedelta, date
 from beembase import transactions, operations
@@ -34,6 +34,7 @@ class Witness(BlockchainObject):
 
     """
     type_id = 3
+    _cache = ObjectCache(max_entries=500)
 
     def __init__(
         self,
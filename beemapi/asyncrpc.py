@@ -0,0 +1,449 @@
+# This Python file uses the following encoding: utf-8
+"""Non-blocking asyncio variants of GrapheneRPC and SteemNodeRPC.
+
+The module needs Python 3.5 or newer and aiohttp. It is not imported by
+``from beemapi import *``.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import asyncio
+import json
+import logging
+import re
+import time
+from .exceptions import (
+    UnauthorizedError, RPCConnection, RPCError, CallRetriesReached, WorkingNodeMissing
+)
+from .rpcutils import (
+    is_network_appbase_ready,
+    get_api_name, get_query, json_loads
+)
+from .graphenerpc import GrapheneRPC
+from .steemnoderpc import SteemNodeRPC
+from . import exceptions
+from beemgraphenebase.version import version as beem_version
+AIOHTTP_MODULE = None
+if not AIOHTTP_MODULE:
+    try:
+        import aiohttp
+        AIOHTTP_MODULE = "aiohttp"
+    except ImportError:
+        AIOHTTP_MODULE = None
+
+log = logging.getLogger(__name__)
+
+
+class AsyncGrapheneRPC(GrapheneRPC):
+    """
+    This class allows to call API methods as coroutines. All calls share
+    one non-blocking aiohttp session (or one websocket connection), so that
+    many requests can be in flight at the same time from a single thread.
+
+    It uses the same node failover (:class:`beemapi.node.Nodes`) and
+    appbase/condenser detection as :class:`beemapi.graphenerpc.GrapheneRPC`.
+
+    :param str urls: Either a single Websocket/Http URL, or a list of URLs
+    :param str user: Username for Authentication
+    :param str password: Password for Authentication
+    :param int num_retries: Try x times to num_retries to a node on disconnect, -1 for indefinitely (default is 100)
+    :param int num_retries_call: Repeat num_retries_call times a rpc call on node error (default is 5)
+    :param int timeout: Timeout setting for https nodes (default is 60)
+    :param int max_connections: Maximum number of simultaneous http connections (default is 100)
+    :param bool use_condenser: Use the old condenser_api rpc protocol on nodes with version
+        0.19.4 or higher. The settings has no effect on nodes with version of 0.19.3 or lower.
+    :param dict custom_chains: custom chain which should be added to the known chains
+
+    Usage:
+
+        .. code-block:: python
+
+            import asyncio
+            from beemapi.asyncrpc import AsyncGrapheneRPC
+
+            async def main():
+                rpc = AsyncGrapheneRPC("https://api.steemit.com")
+                await rpc.rpcconnect()
+                blocks = await asyncio.gather(*[rpc.get_block(i) for i in range(1, 101)])
+                await rpc.rpcclose()
+
+            asyncio.get_event_loop().run_until_complete(main())
+
+    .. note:: ``rpcconnect()`` has to be awaited (or the object has to be used
+              as ``async with``) before the first call.
+
+    """
+
+    def __init__(self, urls, user=None, password=None, **kwargs):
+        """Init."""
+        if AIOHTTP_MODULE is None:
+            raise ImportError("aiohttp is required for AsyncGrapheneRPC!")
+        self.max_connections = kwargs.get("max_connections", 100)
+        self._reconnect_lock = None
+        self._ws_pending = {}
+        self._ws_reader = None
+        self._next_node_requested = False
+        self.headers = {'User-Agent': 'beem v%s' % (beem_version),
+                        'content-type': 'application/json'}
+        kwargs["autoconnect"] = False
+        super(AsyncGrapheneRPC, self).__init__(urls, user=user, password=password, **kwargs)
+
+    async def __aenter__(self):
+        await self.rpcconnect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.rpcclose()
+
+    def get_request_id(self, num_ids=1):
+        """Get request id. Reserves num_ids consecutive ids for batched calls."""
+        self._request_id += num_ids
+        return self._request_id - num_ids + 1
+
+    def _get_session(self):
+        """Returns the aiohttp session, which is created on first use"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections)
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    def _get_reconnect_lock(self):
+        if self._reconnect_lock is None:
+            self._reconnect_lock = asyncio.Lock()
+        return self._reconnect_lock
+
+    def _get_query(self, name, args, kwargs):
+        """Builds the json query for the rpc call name"""
+        api_name = get_api_name(self.is_appbase_ready(), *args, **kwargs)
+        if self.is_appbase_ready() and self.use_condenser:
+            api_name = "condenser_api"
+        num_ids = 1
+        if len(args) > 0 and isinstance(args[0], list) and len(args[0]) > 0 and isinstance(args[0][0], dict):
+            num_ids = len(args[0])
+        return get_query(self.is_appbase_ready() and not self.use_condenser,
+                         self.get_request_id(num_ids), api_name, name, args)
+
+    async def next(self):
+        """Switches to the next node url"""
+        await self.rpcconnect()
+
+    async def _switch_node(self, failed_url):
+        """Switches to the next node, unless another task has already done it"""
+        async with self._get_reconnect_lock():
+            if self.url != failed_url:
+                return
+            await self.rpcconnect()
+
+    async def rpcconnect(self, next_url=True):
+        """Connect to next url in a loop."""
+        if self.nodes.working_nodes_count == 0:
+            return
+        while True:
+            if next_url:
+                await self._close_ws()
+                self.url = next(self.nodes)
+                self.nodes.reset_error_cnt_call()
+                log.debug("Trying to connect to node %s" % self.url)
+                if self.url[:2] == "ws":
+                    self.current_rpc = self.rpc_methods["ws"]
+                else:
+                    self.current_rpc = self.rpc_methods["jsonrpc"]
+            try:
+                if self.current_rpc in [self.rpc_methods['ws'], self.rpc_methods['wsappbase']]:
+                    await self._open_ws()
+                    await self.rpclogin(self.user, self.password)
+                if self.disable_chain_detection:
+                    # Set to appbase rpc format
+                    if self.current_rpc == self.rpc_methods['ws']:
+                        self.current_rpc = self.rpc_methods['wsappbase']
+                    else:
+                        self.current_rpc = self.rpc_methods['appbase']
+                    break
+                try:
+                    props = None
+                    if not self.use_condenser:
+                        props = await self._call_once("get_config", api="database")
+                    else:
+                        props = await self._call_once("get_config")
+                except Exception as e:
+                    if re.search("Bad Cast:Invalid cast from type", str(e)):
+                        # retry with appbase
+                        if self.current_rpc == self.rpc_methods['ws']:
+                            self.current_rpc = self.rpc_methods['wsappbase']
+                        else:
+                            self.current_rpc = self.rpc_methods['appbase']
+                        props = await self._call_once("get_config", api="database")
+                if props is None:
+                    raise RPCError("Could not receive answer for get_config")
+                if is_network_appbase_ready(props):
+                    if self.ws:
+                        self.current_rpc = self.rpc_methods["wsappbase"]
+                    else:
+                        self.current_rpc = self.rpc_methods["appbase"]
+                break
+            except (KeyboardInterrupt, asyncio.CancelledError):
+                raise
+            except Exception as e:
+                self.nodes.increase_error_cnt()
+                do_sleep = not next_url or (next_url and self.nodes.working_nodes_count == 1)
+                self.nodes.sleep_and_check_retries(str(e), sleep=False)
+                if do_sleep:
+                    await asyncio.sleep(self.nodes.retry_sleep_time())
+                next_url = True
+
+    async def rpclogin(self, user, password):
+        """Login into Websocket"""
+        if self.ws and self.current_rpc == self.rpc_methods['ws'] and user and password:
+            await self._call_once("login", user, password, api="login_api")
+
+    async def rpcclose(self):
+        """Close Websocket and http session"""
+        await self._close_ws()
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def _open_ws(self):
+        await self._close_ws()
+        self.ws = await self._get_session().ws_connect(self.url, max_msg_size=0)
+        # Every connection gets its own table of waiting calls, so that closing an
+        # old connection cannot fail calls which were sent over the new one
+        self._ws_pending = {}
+        self._ws_reader = asyncio.ensure_future(self._ws_receive(self.ws, self._ws_pending))
+
+    async def _close_ws(self):
+        if self.ws is None:
+            return
+        ws = self.ws
+        self.ws = None
+        try:
+            await ws.close()
+        except Exception as e:
+            log.warning(str(e))
+        if self._ws_reader is not None:
+            self._ws_reader.cancel()
+            self._ws_reader = None
+
+    async def _ws_receive(self, ws, pending):
+        """Dispatches websocket replies to the waiting calls by request id"""
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                try:
+                    data = json_loads(msg.data)
+                except ValueError:
+                    log.warning("Websocket node returned invalid format. Expected JSON!")
+                    continue
+                first = data[0] if isinstance(data, list) and len(data) > 0 else data
+                if not isinstance(first, dict):
+                    continue
+                future = pending.get(first.get("id"))
+                if future is not None and not future.done():
+                    future.set_result(data)
+        finally:
+            for future in list(pending.values()):
+                if not future.done():
+                    future.set_exception(RPCConnection("Websocket connection closed!"))
+
+    async def request_send(self, payload):
+        if self.user is not None and self.password is not None:
+            auth = aiohttp.BasicAuth(self.user, self.password)
+        else:
+            auth = None
+        async with self._get_session().post(self.url,
+                                            data=payload,
+                                            headers=self.headers,
+                                            timeout=aiohttp.ClientTimeout(total=self.timeout),
+                                            auth=auth) as response:
+            if response.status == 401:
+                raise UnauthorizedError
+            return await response.text()
+
+    async def ws_send(self, payload, request_id):
+        if self.ws is None:
+            raise RPCConnection("No websocket available!")
+        pending = self._ws_pending
+        future = asyncio.get_event_loop().create_future()
+        pending[request_id] = future
+        try:
+            await self.ws.send_str(payload)
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            pending.pop(request_id, None)
+
+    async def _send(self, payload):
+        """Sends the payload once over the current transport. Websocket replies
+            are returned decoded, http replies as text.
+        """
+        if isinstance(payload, list):
+            request_id = payload[0]["id"]
+        else:
+            request_id = payload["id"]
+        data = json.dumps(payload, ensure_ascii=False)
+        if self.current_rpc == self.rpc_methods['ws'] or \
+           self.current_rpc == self.rpc_methods['wsappbase']:
+            return await self.ws_send(data, request_id)
+        return await self.request_send(data.encode('utf8'))
+
+    async def _call_once(self, name, *args, **kwargs):
+        """Calls name without retrying or switching the node on errors"""
+        reply = await self._send(self._get_query(name, args, kwargs))
+        if not bool(reply):
+            raise RPCError("Empty Reply")
+        if not isinstance(reply, (dict, list)):
+            reply = self._decode_reply(reply)
+        return self._handle_reply(reply)
+
+    async def rpcexec(self, payload):
+        """
+        Execute a call by sending the payload.
+
+        :param json payload: Payload data
+        :raises ValueError: if the server does not respond in proper JSON format
+        :raises RPCError: if the server returns an error
+        """
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(json.dumps(payload))
+        if self.nodes.working_nodes_count == 0:
+            raise WorkingNodeMissing
+        if self.url is None:
+            raise RPCConnection("RPC is not connected!")
+        reply = {}
+        while True:
+            self.nodes.increase_error_cnt_call()
+            url = self.url
+            try:
+                start = time.time()
+                reply = await self._send(payload)
+                if bool(reply):
+                    self.nodes.record_latency(time.time() - start)
+                if not bool(reply):
+                    try:
+                        self.nodes.sleep_and_check_retries("Empty Reply", sleep=False, call_retry=True)
+                        await asyncio.sleep(self.nodes.retry_sleep_time(call_retry=True))
+                    except CallRetriesReached:
+                        self.nodes.increase_error_cnt()
+                        self.nodes.sleep_and_check_retries("Empty Reply", sleep=False, call_retry=False)
+                        await self._switch_node(url)
+                else:
+                    break
+            except (KeyboardInterrupt, asyncio.CancelledError):
+                raise
+            except Exception as e:
+                self.nodes.increase_error_cnt()
+                self.nodes.sleep_and_check_retries(str(e), sleep=False, call_retry=False)
+                await self._switch_node(url)
+
+        if not isinstance(reply, (dict, list)):
+            reply = self._decode_reply(reply)
+        result = self._handle_reply(reply)
+        if isinstance(result, dict) and "head_block_number" in result and "last_irreversible_block_num" in result:
+            self.nodes.record_head_block(result["head_block_number"])
+        return result
+
+    def __getattr__(self, name):
+        """Map all methods to RPC coroutines and pass through the arguments."""
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        async def method(*args, **kwargs):
+            query = self._get_query(name, args, kwargs)
+            return await self.rpcexec(query)
+        return method
+
+
+class AsyncSteemNodeRPC(AsyncGrapheneRPC, SteemNodeRPC):
+    """ This class allows to call API methods exposed by the witness node as
+        coroutines. Error handling is the same as in
+        :class:`beemapi.steemnoderpc.SteemNodeRPC`, retries wait with
+        ``asyncio.sleep`` instead of blocking the event loop.
+
+        :param str urls: Either a single Websocket/Http URL, or a list of URLs
+        :param str user: Username for Authentication
+        :param str password: Password for Authentication
+        :param int num_retries: Try x times to num_retries to a node on disconnect, -1 for indefinitely
+        :param int num_retries_call: Repeat num_retries_call times a rpc call on node error (default is 5)
+        :param int timeout: Timeout setting for https nodes (default is 60)
+        :param int max_connections: Maximum number of simultaneous http connections (default is 100)
+        :param bool use_condenser: Use the old condenser_api rpc protocol on nodes with version
+            0.19.4 or higher. The settings has no effect on nodes with version of 0.19.3 or lower.
+
+    """
+
+    async def rpcexec(self, payload):
+        """ Execute a call by sending the payload.
+            In here, we mostly deal with Steem specific error handling
+
+            :param json payload: Payload data
+            :raises ValueError: if the server does not respond in proper JSON format
+            :raises RPCError: if the server returns an error
+        """
+        if self.url is None:
+            raise exceptions.RPCConnection("RPC is not connected!")
+        doRetry = True
+        maxRetryCountReached = False
+        while doRetry and not maxRetryCountReached:
+            doRetry = False
+            url = self.url
+            try:
+                reply = await super(AsyncSteemNodeRPC, self).rpcexec(payload)
+                if self.next_node_on_empty_reply and not bool(reply) and self.nodes.working_nodes_count > 1:
+                    await self._retry_on_next_node("Empty Reply", url)
+                    doRetry = True
+                    self.next_node_on_empty_reply = True
+                else:
+                    self.next_node_on_empty_reply = False
+                    return reply
+            except exceptions.RPCErrorDoRetry as e:
+                msg = exceptions.decodeRPCErrorMsg(e).strip()
+                try:
+                    self.nodes.sleep_and_check_retries(str(msg), sleep=False, call_retry=True)
+                    await asyncio.sleep(self.nodes.retry_sleep_time(call_retry=True))
+                    doRetry = True
+                except exceptions.CallRetriesReached:
+                    if self.nodes.working_nodes_count > 1:
+                        await self._retry_on_next_node(msg, url)
+                        doRetry = True
+                    else:
+                        self.next_node_on_empty_reply = False
+                        raise exceptions.CallRetriesReached
+            except exceptions.RPCError as e:
+                try:
+                    self._next_node_requested = False
+                    doRetry = self._check_error_message(e, self.error_cnt_call, sleep=False)
+                    if self._next_node_requested:
+                        self._next_node_requested = False
+                        await self._switch_node(url)
+                    elif doRetry:
+                        await asyncio.sleep(self.nodes.retry_sleep_time(call_retry=True))
+                except exceptions.CallRetriesReached:
+                    msg = exceptions.decodeRPCErrorMsg(e).strip()
+                    if self.nodes.working_nodes_count > 1:
+                        await self._retry_on_next_node(msg, url)
+                        doRetry = True
+                    else:
+                        self.next_node_on_empty_reply = False
+                        raise exceptions.CallRetriesReached
+            except Exception as e:
+                self.next_node_on_empty_reply = False
+                raise e
+            maxRetryCountReached = self.nodes.num_retries_call_reached
+        self.next_node_on_empty_reply = False
+
+    async def _retry_on_next_node(self, error_msg, failed_url):
+        self.nodes.increase_error_cnt()
+        self.nodes.sleep_and_check_retries(error_msg, sleep=False, call_retry=False)
+        await self._switch_node(failed_url)
+
+    def _switch_to_next_node(self, msg, error_type="UnhandledRPCError"):
+        if self.nodes.working_nodes_count == 1:
+            if error_type == "UnhandledRPCError":
+                raise exceptions.UnhandledRPCError(msg)
+            elif error_type == "ApiNotSupported":
+                raise exceptions.ApiNotSupported(msg)
+        self.nodes.increase_error_cnt()
+        self.nodes.sleep_and_check_retries(str(msg), sleep=False)
+        # The node switch itself is awaited in rpcexec
+        self._next_node_requested = True
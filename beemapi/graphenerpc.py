@@ -8,10 +8,12 @@ from builtins import str
 from builtins import object
 from itertools import cycle
 import threading
+import types
 import sys
 import json
 import signal
 import logging
+import socket
 import ssl
 import re
 import time
@@ -22,7 +24,7 @@ from .exceptions import (
 )
 from .rpcutils import (
     is_network_appbase_ready,
-    get_api_name, get_query
+    get_api_name, get_query, json_loads, is_streamable_json_array, iter_json_array
 )
 from .node import Nodes
 from beemgraphenebase.version import version as beem_version
@@ -49,9 +51,34 @@ if not REQUEST_MODULE:
         REQUEST_MODULE = "requests"
     except ImportError:
         REQUEST_MODULE = None
+FUTURES_MODULE = None
+if not FUTURES_MODULE:
+    try:
+        from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+        FUTURES_MODULE = "futures"
+    except ImportError:
+        FUTURES_MODULE = None
+HTTPX_MODULE = None
+if not HTTPX_MODULE:
+    try:
+        import httpx
+        HTTPX_MODULE = "httpx"
+    except ImportError:
+        HTTPX_MODULE = None
 
 log = logging.getLogger(__name__)
 
+# Disable Nagle's algorithm for the small json requests and let the OS keep idle sockets open
+KEEP_ALIVE_SOCKET_OPTIONS = [(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+                             (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+
+if REQUEST_MODULE is not None:
+    class KeepAliveHTTPAdapter(HTTPAdapter):
+        """HTTPAdapter which sets TCP_NODELAY and SO_KEEPALIVE on all pooled sockets"""
+        def init_poolmanager(self, *args, **kwargs):
+            kwargs["socket_options"] = KEEP_ALIVE_SOCKET_OPTIONS
+            super(KeepAliveHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+
 
 class SessionInstance(object):
     """Singelton for the Session Instance"""
@@ -72,6 +99,46 @@ def shared_session_instance():
     return SessionInstance.instance
 
 
+class SessionPool(object):
+    """Stores the pooled sessions"""
+    sessions = {}
+    lock = threading.Lock()
+
+
+def create_session(pool_maxsize=10, use_http2=False):
+    """Creates a http session which keeps up to pool_maxsize connections
+    per host alive. When use_http2 is True and httpx with HTTP/2 support
+    is installed, a httpx client is returned.
+    """
+    if use_http2:
+        if HTTPX_MODULE is None:
+            log.warning("httpx is not installed, falling back to HTTP/1.1")
+        else:
+            try:
+                return httpx.Client(http2=True, limits=httpx.Limits(max_connections=pool_maxsize,
+                                                                    max_keepalive_connections=pool_maxsize))
+            except ImportError:
+                log.warning("h2 is not installed, falling back to HTTP/1.1")
+    if REQUEST_MODULE is None:
+        raise Exception()
+    session = requests.Session()
+    adapter = KeepAliveHTTPAdapter(pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def pooled_session_instance(url=None, pool_maxsize=10, use_http2=False):
+    """Get a pooled session, which is shared by all rpc instances with the
+    same settings. When url is set, the session is only used for this node.
+    """
+    key = (url, pool_maxsize, use_http2)
+    with SessionPool.lock:
+        if key not in SessionPool.sessions:
+            SessionPool.sessions[key] = create_session(pool_maxsize=pool_maxsize, use_http2=use_http2)
+        return SessionPool.sessions[key]
+
+
 def create_ws_instance(use_ssl=True, enable_multithread=True):
     """Get websocket instance"""
     if WEBSOCKET_MODULE is None:
@@ -100,6 +167,15 @@ class GrapheneRPC(object):
     :param bool use_condenser: Use the old condenser_api rpc protocol on nodes with version
         0.19.4 or higher. The settings has no effect on nodes with version of 0.19.3 or lower.
     :param dict custom_chains: custom chain which should be added to the known chains
+    :param int pool_maxsize: Number of keep-alive connections per https node. When set,
+        a pooled session is used instead of the shared session (default is None)
+    :param bool pool_per_node: When True, every https node gets its own pooled session (default is False)
+    :param bool use_http2: Use HTTP/2 for https nodes, needs httpx with h2 (default is False)
+    :param bool hedge_requests: When True, a https call which takes longer than the 95th
+        latency percentile of the node is sent a second time to the next best node and the
+        first answer is used. Broadcasts are never hedged. (default is False)
+    :param int route_interval: Every route_interval calls, it is checked if another node
+        answers at least twice as fast and the rpc switches to it, 0 disables it (default is 100)
 
     Available APIs:
 
@@ -150,6 +226,13 @@ class GrapheneRPC(object):
         self.ws = None
         self.url = None
         self.session = None
+        self.pool_maxsize = kwargs.get("pool_maxsize", None)
+        self.pool_per_node = kwargs.get("pool_per_node", False)
+        self.use_http2 = kwargs.get("use_http2", False)
+        self.hedge_requests = kwargs.get("hedge_requests", False) and FUTURES_MODULE is not None
+        self.route_interval = kwargs.get("route_interval", 100)
+        self._calls_since_routing = 0
+        self._hedge_executor = None
         self.rpc_queue = []
         if kwargs.get("autoconnect", True):
             self.rpcconnect()
@@ -211,10 +294,11 @@ class GrapheneRPC(object):
                     self.current_rpc = self.rpc_methods["ws"]
                 else:
                     self.ws = None
-                    self.session = shared_session_instance()
+                    self.session = self.get_session()
                     self.current_rpc = self.rpc_methods["jsonrpc"]
                     self.headers = {'User-Agent': 'beem v%s' % (beem_version),
-                                    'content-type': 'application/json'}
+                                    'content-type': 'application/json',
+                                    'Accept-Encoding': 'gzip, deflate'}
             try:
                 if self.ws:
                     self.ws.connect(self.url)
@@ -256,6 +340,14 @@ class GrapheneRPC(object):
                 self.nodes.sleep_and_check_retries(str(e), sleep=do_sleep)
                 next_url = True
 
+    def get_session(self, url=None):
+        """Returns the http session for the current node or for url"""
+        if self.pool_per_node or self.pool_maxsize is not None or self.use_http2:
+            url = (url or self.url) if self.pool_per_node else None
+            return pooled_session_instance(url, pool_maxsize=self.pool_maxsize or 10,
+                                           use_http2=self.use_http2)
+        return shared_session_instance()
+
     def rpclogin(self, user, password):
         """Login into Websocket"""
         if self.ws and self.current_rpc == self.rpc_methods['ws'] and user and password:
@@ -268,22 +360,87 @@ class GrapheneRPC(object):
         # if self.ws.connected:
         self.ws.close()
 
-    def request_send(self, payload):
+    def request_send(self, payload, url=None):
+        if url is None or url == self.url:
+            url = self.url
+            session = self.session
+        else:
+            session = self.get_session(url)
+        kwargs = {"headers": self.headers, "timeout": self.timeout}
         if self.user is not None and self.password is not None:
-            response = self.session.post(self.url,
-                                         data=payload,
-                                         headers=self.headers,
-                                         timeout=self.timeout,
-                                         auth=(self.user, self.password))
+            kwargs["auth"] = (self.user, self.password)
+        if HTTPX_MODULE is not None and isinstance(session, httpx.Client):
+            kwargs["content"] = payload
         else:
-            response = self.session.post(self.url,
-                                         data=payload,
-                                         headers=self.headers,
-                                         timeout=self.timeout)
+            kwargs["data"] = payload
+        response = session.post(url, **kwargs)
         if response.status_code == 401:
             raise UnauthorizedError
         return response.text
 
+    def _timed_request_send(self, payload, node):
+        start = time.time()
+        reply = self.request_send(payload, url=node.url)
+        if bool(reply):
+            self.nodes.record_latency(time.time() - start, node=node)
+        return reply
+
+    def _is_hedgeable(self, payload):
+        """Only http calls which do not broadcast are hedged"""
+        if not self.hedge_requests or self.current_rpc not in [self.rpc_methods['jsonrpc'], self.rpc_methods['appbase']]:
+            return False
+        queries = payload if isinstance(payload, list) else [payload]
+        for query in queries:
+            if "broadcast" in query.get("method", ""):
+                return False
+            if query.get("method") == "call" and "broadcast" in str(query.get("params", [])[:2]):
+                return False
+        return True
+
+    def hedged_request_send(self, payload):
+        """Sends the payload to the current node. When the node has not answered
+        after its 95th latency percentile, the payload is sent to the next best
+        node as well and the first valid answer is returned.
+        """
+        delay = self.nodes.hedge_delay()
+        hedge_node = self.nodes.hedge_node()
+        node = self.nodes.node
+        if delay is None or hedge_node is None:
+            return self._timed_request_send(payload, node)
+        if self._hedge_executor is None:
+            self._hedge_executor = ThreadPoolExecutor(max_workers=8)
+        first = self._hedge_executor.submit(self._timed_request_send, payload, node)
+        done, not_done = wait([first], timeout=delay)
+        if first in done:
+            return first.result()
+        log.debug("Hedging request to %s after %.3f s" % (hedge_node.url, delay))
+        second = self._hedge_executor.submit(self._timed_request_send, payload, hedge_node)
+        pending = [first, second]
+        while len(pending) > 0:
+            done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None and bool(future.result()):
+                    return future.result()
+                if future is second:
+                    hedge_node.record_error()
+            pending = list(not_done)
+        return first.result()
+
+    def _update_node_health(self, result):
+        """Stores the head block of the node and switches to a faster node every route_interval calls"""
+        if isinstance(result, dict) and "head_block_number" in result and "last_irreversible_block_num" in result:
+            self.nodes.record_head_block(result["head_block_number"])
+        self._calls_since_routing += 1
+        if not self.route_interval or self._calls_since_routing < self.route_interval:
+            return
+        self._calls_since_routing = 0
+        if self.nodes.should_switch_node():
+            log.info("Switching from %s to a faster node" % self.url)
+            try:
+                self.next()
+            except Exception as e:
+                log.warning(str(e))
+
     def ws_send(self, payload):
         if self.ws is None:
             raise RPCConnection("No websocket available!")
@@ -358,15 +515,18 @@ class GrapheneRPC(object):
         else:
             raise RPCError("Client returned invalid format. Expected JSON!")
 
-    def rpcexec(self, payload):
+    def rpcexec(self, payload, stream=False):
         """
         Execute a call by sending the payload.
 
         :param json payload: Payload data
+        :param bool stream: When True, a batch reply is returned as generator,
+            which decodes the results one by one
         :raises ValueError: if the server does not respond in proper JSON format
         :raises RPCError: if the server returns an error
         """
-        log.debug(json.dumps(payload))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(json.dumps(payload))
         if self.nodes.working_nodes_count == 0:
             raise WorkingNodeMissing
         if self.url is None:
@@ -375,11 +535,18 @@ class GrapheneRPC(object):
         while True:
             self.nodes.increase_error_cnt_call()
             try:
+                start = time.time()
+                hedged = False
                 if self.current_rpc == self.rpc_methods['ws'] or \
                    self.current_rpc == self.rpc_methods['wsappbase']:
                     reply = self.ws_send(json.dumps(payload, ensure_ascii=False).encode('utf8'))
+                elif self._is_hedgeable(payload):
+                    hedged = True
+                    reply = self.hedged_request_send(json.dumps(payload, ensure_ascii=False).encode('utf8'))
                 else:
                     reply = self.request_send(json.dumps(payload, ensure_ascii=False).encode('utf8'))
+                if bool(reply) and not hedged:
+                    self.nodes.record_latency(time.time() - start)
                 if not bool(reply):
                     try:
                         self.nodes.sleep_and_check_retries("Empty Reply", call_retry=True)
@@ -412,14 +579,45 @@ class GrapheneRPC(object):
                 self.nodes.sleep_and_check_retries(str(e), sleep=False, call_retry=False)
                 self.rpcconnect()
 
+        ret = self._decode_reply(reply, stream=stream)
+        result = self._handle_reply(ret)
+        self._update_node_health(result)
+        return result
+
+    def _decode_reply(self, reply, stream=False):
+        """Decodes a raw json reply from the node. With stream, a json array
+        is returned as generator of its elements.
+        """
+        if stream and is_streamable_json_array(reply):
+            return iter_json_array(reply)
         ret = {}
         try:
-            ret = json.loads(reply, strict=False)
+            ret = json_loads(reply)
         except ValueError:
             self._check_for_server_error(reply)
 
-        log.debug(json.dumps(reply))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(json.dumps(reply))
+        return ret
+
+    def _handle_reply_stream(self, ret):
+        """Checks every decoded batch result for errors and yields the results"""
+        for r in ret:
+            if isinstance(r, dict) and 'error' in r:
+                if 'detail' in r['error']:
+                    raise RPCError(r['error']['detail'])
+                else:
+                    raise RPCError(r['error']['message'])
+            elif isinstance(r, dict) and "result" in r:
+                yield r["result"]
+            else:
+                yield r
 
+    def _handle_reply(self, ret):
+        """Checks a decoded reply for errors and returns the result"""
+        if isinstance(ret, types.GeneratorType):
+            self.nodes.reset_error_cnt_call()
+            return self._handle_reply_stream(ret)
         if isinstance(ret, dict) and 'error' in ret:
             if 'detail' in ret['error']:
                 raise RPCError(ret['error']['detail'])
@@ -464,6 +662,7 @@ class GrapheneRPC(object):
             stored_num_retries_call = self.nodes.num_retries_call
             self.nodes.num_retries_call = kwargs.get("num_retries_call", stored_num_retries_call)
             add_to_queue = kwargs.get("add_to_queue", False)
+            stream_reply = kwargs.get("stream_reply", False)
             query = get_query(self.is_appbase_ready() and not self.use_condenser, self.get_request_id(), api_name, name, args)
             if add_to_queue:
                 self.rpc_queue.append(query)
@@ -473,7 +672,10 @@ class GrapheneRPC(object):
                 self.rpc_queue.append(query)
                 query = self.rpc_queue
                 self.rpc_queue = []
-            r = self.rpcexec(query)
+            if stream_reply:
+                r = self.rpcexec(query, stream=True)
+            else:
+                r = self.rpcexec(query)
             self.nodes.num_retries_call = stored_num_retries_call
             return r
         return method
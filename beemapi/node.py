@@ -4,6 +4,7 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 from builtins import str
+from collections import deque
 import json
 import re
 import time
@@ -15,6 +16,23 @@ log = logging.getLogger(__name__)
 
 
 class Node(object):
+    """Stores the url, the error counts and the health of a node
+
+        :param str url: node url
+
+        The health is measured from the live traffic: an exponentially weighted
+        moving average (EWMA) of the call latency and of the error rate, the
+        last seen head block and the state of a circuit breaker. The breaker
+        opens after ``breaker_threshold`` consecutive errors and lets the node
+        back in for a trial call after ``breaker_timeout`` seconds. The head
+        block is extrapolated with ``block_interval`` seconds per block.
+    """
+    ewma_alpha = 0.2
+    block_interval = 3.
+    breaker_threshold = 3
+    breaker_timeout = 30
+    min_latency_samples = 20
+
     def __init__(
         self,
         url
@@ -22,13 +40,68 @@ class Node(object):
         self.url = url
         self.error_cnt = 0
         self.error_cnt_call = 0
+        self.latency = None
+        self.error_rate = 0.
+        self.consecutive_errors = 0
+        self.breaker_open_until = None
+        self.head_block = None
+        self.head_block_time = None
+        self.latencies = deque(maxlen=100)
+
+    def record_latency(self, latency):
+        """Adds the latency of a successful call in seconds"""
+        self.latencies.append(latency)
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.ewma_alpha * (latency - self.latency)
+        self.error_rate *= 1 - self.ewma_alpha
+        self.consecutive_errors = 0
+        self.breaker_open_until = None
+
+    def record_error(self):
+        """Adds a failed call and opens the circuit breaker after too many consecutive errors"""
+        self.error_rate += self.ewma_alpha * (1 - self.error_rate)
+        self.consecutive_errors += 1
+        if self.consecutive_errors >= self.breaker_threshold:
+            self.breaker_open_until = time.time() + self.breaker_timeout
+
+    def record_head_block(self, head_block):
+        """Stores the head block number seen on this node"""
+        self.head_block = head_block
+        self.head_block_time = time.time()
+
+    def estimated_head_block(self, now=None):
+        """Returns the head block, extrapolated by block_interval seconds per block"""
+        if self.head_block is None:
+            return None
+        now = now or time.time()
+        return self.head_block + (now - self.head_block_time) / self.block_interval
+
+    @property
+    def breaker_open(self):
+        """True, when the node is skipped because of too many consecutive errors"""
+        return self.breaker_open_until is not None and time.time() < self.breaker_open_until
+
+    def latency_percentile(self, percentile=95):
+        """Returns the latency percentile of the last calls or None, when not enough calls were measured"""
+        if len(self.latencies) < self.min_latency_samples:
+            return None
+        latencies = sorted(self.latencies)
+        return latencies[int(round((len(latencies) - 1) * percentile / 100.))]
 
     def __repr__(self):
         return self.url
 
 
 class Nodes(list):
-    """Stores Node URLs and error counts"""
+    """Stores Node URLs and error counts
+
+        Hedged requests are sent after the 95th latency percentile of the
+        current node, but not before ``min_hedge_delay`` seconds.
+    """
+    min_hedge_delay = 0.
+
     def __init__(self, urls, num_retries, num_retries_call):
         if isinstance(urls, str):
             url_list = re.split(r",|;", urls)
@@ -55,6 +128,11 @@ class Nodes(list):
         next_node_count = 0
         if self.freeze_current_node:
             return self.url
+        if self.has_health_data:
+            index = self.best_node_index(exclude_current=self.current_node_index >= 0)
+            if index is not None:
+                self.current_node_index = index
+                return self.url
         while next_node_count == 0 and (self.num_retries < 0 or self.node.error_cnt < self.num_retries):
             self.current_node_index += 1
             if self.current_node_index >= self.working_nodes_count:
@@ -66,6 +144,99 @@ class Nodes(list):
 
     next = __next__  # Python 2
 
+    def is_working(self, index):
+        return self.num_retries < 0 or self[index].error_cnt < self.num_retries
+
+    @property
+    def has_health_data(self):
+        """True, when calls were measured on at least one node"""
+        for i in range(len(self)):
+            if self[i].latency is not None or self[i].consecutive_errors > 0:
+                return True
+        return False
+
+    def head_block_lag(self, node):
+        """Returns the number of blocks the node is behind the most recent node"""
+        now = time.time()
+        head_blocks = [self[i].estimated_head_block(now) for i in range(len(self)) if self[i].head_block is not None]
+        if node.head_block is None or len(head_blocks) == 0:
+            return 0
+        return max(0, max(head_blocks) - node.estimated_head_block(now))
+
+    def score(self, node):
+        """Returns the expected call time in seconds of a node, lower is better.
+        The head block lag is added as the seconds the node is behind, i.e.
+        the lag in blocks times the block interval. Unmeasured nodes get a
+        score of 0, so that they are tried.
+        """
+        if node.latency is None:
+            return 0.
+        return node.latency * (1 + 10 * node.error_rate) + self.head_block_lag(node) * node.block_interval
+
+    def best_node_index(self, exclude_current=False):
+        """Returns the index of the working node with the lowest score.
+        Nodes with an open circuit breaker are skipped, as long as another
+        node is available. On equal scores, the nodes are taken in order
+        after the current node.
+        """
+        n = len(self)
+        start = max(self.current_node_index, 0)
+        candidates = []
+        for offset in range(1, n + 1):
+            index = (start + offset) % n
+            if exclude_current and index == self.current_node_index and n > 1:
+                continue
+            if not self.is_working(index):
+                continue
+            candidates.append(index)
+        if len(candidates) == 0:
+            return None
+        closed = [i for i in candidates if not self[i].breaker_open]
+        if len(closed) == 0:
+            return min(candidates, key=lambda i: self[i].breaker_open_until)
+        return min(closed, key=lambda i: self.score(self[i]))
+
+    def should_switch_node(self, factor=0.5):
+        """Returns True, when another measured node is expected to answer faster
+        than factor times the current node
+        """
+        if self.freeze_current_node or len(self) < 2 or self.node.latency is None:
+            return False
+        index = self.best_node_index(exclude_current=True)
+        if index is None or self[index].latency is None:
+            return False
+        return self.score(self[index]) < factor * self.score(self.node)
+
+    def hedge_node(self):
+        """Returns the best other http node for a hedged request or None"""
+        index = self.best_node_index(exclude_current=True)
+        if index is None or index == self.current_node_index or self[index].breaker_open:
+            return None
+        if self[index].url[:4] != "http":
+            return None
+        return self[index]
+
+    def hedge_delay(self, percentile=95):
+        """Returns the time after which a hedged request is sent, or None when
+        the current node has not enough measured calls
+        """
+        delay = self.node.latency_percentile(percentile)
+        if delay is None:
+            return None
+        return max(delay, self.min_hedge_delay)
+
+    def record_latency(self, latency, node=None):
+        """Adds the latency of a successful call to the current node or to node"""
+        node = node or self.node
+        if node is not None:
+            node.record_latency(latency)
+
+    def record_head_block(self, head_block, node=None):
+        """Stores the head block number seen on the current node or on node"""
+        node = node or self.node
+        if node is not None:
+            node.record_head_block(head_block)
+
     def export_working_nodes(self):
         nodes_list = []
         for i in range(len(self)):
@@ -124,6 +295,7 @@ class Nodes(list):
         """Increase node error count for current node"""
         if self.node is not None:
             self.node.error_cnt += 1
+            self.node.record_error()
 
     def increase_error_cnt_call(self):
         """Increase call error count for current node"""
@@ -160,12 +332,20 @@ class Nodes(list):
                 log.warning("Lost connection or internal error on node: %s (%d/%d) \n" % (self.url, cnt, self.num_retries))
         if not sleep:
             return
-        if cnt < 1:
-            sleeptime = 0
-        elif cnt < 10:
-            sleeptime = (cnt - 1) * 1.5 + 0.5
-        else:
-            sleeptime = 10
+        sleeptime = self.retry_sleep_time(call_retry=call_retry)
         if sleeptime:
             log.warning("Retrying in %d seconds\n" % sleeptime)
             time.sleep(sleeptime)
+
+    def retry_sleep_time(self, call_retry=False):
+        """Returns the back-off time in seconds for the current error count"""
+        if call_retry:
+            cnt = self.error_cnt_call
+        else:
+            cnt = self.error_cnt
+        if cnt < 1:
+            return 0
+        elif cnt < 10:
+            return (cnt - 1) * 1.5 + 0.5
+        else:
+            return 10
@@ -6,13 +6,100 @@ from __future__ import unicode_literals
 import time
 import json
 import logging
+import re
 from .exceptions import (
     UnauthorizedError, RPCConnection, RPCError, NumRetriesReached, CallRetriesReached
 )
 from .node import Nodes
+JSON_MODULE = None
+if not JSON_MODULE:
+    try:
+        import orjson as json_backend
+        JSON_MODULE = "orjson"
+    except ImportError:
+        try:
+            import ujson as json_backend
+            JSON_MODULE = "ujson"
+        except ImportError:
+            json_backend = None
+            JSON_MODULE = None
 
 log = logging.getLogger(__name__)
 
+_whitespace = re.compile(r"[ \t\n\r]*")
+_json_decoder = json.JSONDecoder(strict=False)
+
+
+def set_json_backend(module):
+    """Sets the module which decodes rpc replies. It needs a ``loads``
+    function, e.g. orjson or ujson. When set to None, the json module is used.
+    """
+    global json_backend, JSON_MODULE
+    json_backend = module
+    JSON_MODULE = None if module is None else module.__name__
+
+
+def json_loads(data):
+    """Decodes data with the json backend. When the backend rejects the
+    data, e.g. due to control characters in strings, the json module is used.
+    """
+    if json_backend is not None:
+        try:
+            return json_backend.loads(data)
+        except ValueError:
+            pass
+    return json.loads(data, strict=False)
+
+
+def is_json_array(data):
+    """Returns True, when data is the text of a json array"""
+    idx = _whitespace.match(data).end()
+    return data[idx:idx + 1] == "["
+
+
+_error_key = re.compile(r'"error"\s*:')
+
+
+def is_streamable_json_array(data):
+    """Returns True, when data is the text of a complete json array without
+    error objects. Errors of other replies are raised when they are decoded
+    at once, so that they can be handled before the reply is returned.
+    """
+    if not is_json_array(data) or data.rstrip()[-1:] != "]":
+        return False
+    return _error_key.search(data) is None
+
+
+def iter_json_array(data):
+    """Decodes the elements of a json array one by one, so that a large batch
+    reply does not need to be decoded into a list at once
+    """
+    idx = _whitespace.match(data).end()
+    if data[idx:idx + 1] != "[":
+        raise ValueError("Expected a json array")
+    idx = _whitespace.match(data, idx + 1).end()
+    if data[idx:idx + 1] == "]":
+        return
+    while True:
+        obj, idx = _json_decoder.raw_decode(data, idx)
+        yield obj
+        idx = _whitespace.match(data, idx).end()
+        if data[idx:idx + 1] == ",":
+            idx = _whitespace.match(data, idx + 1).end()
+        elif data[idx:idx + 1] == "]":
+            return
+        else:
+            raise ValueError("Expected ',' or ']' at position %d" % idx)
+
+
+def _copy_args(args):
+    """Returns a copy of args with lists instead of tuples and plain dicts, like a json round trip"""
+    if isinstance(args, dict):
+        return {key: _copy_args(value) for key, value in args.items()}
+    elif isinstance(args, (list, tuple)):
+        return [_copy_args(value) for value in args]
+    return args
+
 
 def is_network_appbase_ready(props):
     """Checks if the network is appbase ready"""
@@ -30,8 +117,7 @@ def get_query(appbase, request_id, api_name, name, args):
                  "jsonrpc": "2.0",
                  "id": request_id}
     else:
-        args = json.loads(json.dumps(args))
-        # print(args)
+        args = _copy_args(args)
         if len(args) > 0 and isinstance(args, list) and isinstance(args[0], dict):
             query = {"method": api_name + "." + name,
                      "params": args[0],
@@ -44,12 +44,14 @@ class SteemNodeRPC(GrapheneRPC):
         """Switch to next node on empty reply for the next rpc call"""
         self.next_node_on_empty_reply = next_node_on_empty_reply
 
-    def rpcexec(self, payload):
+    def rpcexec(self, payload, stream=False):
         """ Execute a call by sending the payload.
             It makes use of the GrapheneRPC library.
             In here, we mostly deal with Steem specific error handling
 
             :param json payload: Payload data
+            :param bool stream: When True, a batch reply is returned as generator,
+                which decodes the results one by one
             :raises ValueError: if the server does not respond in proper JSON format
             :raises RPCError: if the server returns an error
         """
@@ -61,7 +63,7 @@ class SteemNodeRPC(GrapheneRPC):
             doRetry = False
             try:
                 # Forward call to GrapheneWebsocketRPC and catch+evaluate errors
-                reply = super(SteemNodeRPC, self).rpcexec(payload)
+                reply = super(SteemNodeRPC, self).rpcexec(payload, stream=stream)
                 if self.next_node_on_empty_reply and not bool(reply) and self.nodes.working_nodes_count > 1:
                     self._retry_on_next_node("Empty Reply")
                     doRetry = True
@@ -103,7 +105,7 @@ class SteemNodeRPC(GrapheneRPC):
         self.nodes.sleep_and_check_retries(error_msg, sleep=False, call_retry=False)
         self.next()
 
-    def _check_error_message(self, e, cnt):
+    def _check_error_message(self, e, cnt, sleep=True):
         """Check error message and decide what to do"""
         doRetry = False
         msg = exceptions.decodeRPCErrorMsg(e).strip()
@@ -126,16 +128,16 @@ class SteemNodeRPC(GrapheneRPC):
         elif re.search("WinError", msg):
             raise exceptions.RPCError(msg)
         elif re.search("Unable to acquire database lock", msg):
-            self.nodes.sleep_and_check_retries(str(msg), call_retry=True)
+            self.nodes.sleep_and_check_retries(str(msg), sleep=sleep, call_retry=True)
             doRetry = True
         elif re.search("Request Timeout", msg):
-            self.nodes.sleep_and_check_retries(str(msg), call_retry=True)
+            self.nodes.sleep_and_check_retries(str(msg), sleep=sleep, call_retry=True)
             doRetry = True
         elif re.search("Bad or missing upstream response", msg):
-            self.nodes.sleep_and_check_retries(str(msg), call_retry=True)
+            self.nodes.sleep_and_check_retries(str(msg), sleep=sleep, call_retry=True)
             doRetry = True
         elif re.search("Internal Error", msg) or re.search("Unknown exception", msg):
-            self.nodes.sleep_and_check_retries(str(msg), call_retry=True)
+            self.nodes.sleep_and_check_retries(str(msg), sleep=sleep, call_retry=True)
             doRetry = True
         elif re.search("!check_max_block_age", str(e)):
             self._switch_to_next_node(str(e))
@@ -278,7 +278,8 @@ class SteemWebsocket(Events):
         :raises ValueError: if the server does not respond in proper JSON format
         :raises RPCError: if the server returns an error
         """
-        log.debug(json.dumps(payload))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(json.dumps(payload))
         self.ws.send(json.dumps(payload, ensure_ascii=False).encode('utf8'))
 
     def __getattr__(self, name):
@@ -0,0 +1,365 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from collections import namedtuple
+from binascii import hexlify, unhexlify
+import hashlib
+import struct
+import time
+from beemgraphenebase.types import unpack_varint_from, unpack_string_from
+from beemgraphenebase.account import get_public_key
+from beemgraphenebase.py23 import string_types
+from .operationids import ops
+
+default_prefix = "STM"
+timeformat = '%Y-%m-%dT%H:%M:%S'
+
+_uint8 = struct.Struct("<B")
+_int16 = struct.Struct("<h")
+_uint16 = struct.Struct("<H")
+_uint32 = struct.Struct("<I")
+_uint64 = struct.Struct("<Q")
+_amount = struct.Struct("<qB7s")
+_tx_header = struct.Struct("<HII")
+
+
+class OperationRecord(namedtuple("OperationRecord", ["id", "type", "value"])):
+    """ Decoded operation with its id, its name and its fields as dict"""
+    __slots__ = ()
+
+    def json(self):
+        """ Returns the operation in the ``[type, value]`` format, which
+            :class:`beembase.objects.Operation` accepts
+        """
+        return [self.type, self.value]
+
+
+class TransactionRecord(namedtuple("TransactionRecord", [
+        "ref_block_num", "ref_block_prefix", "expiration", "operations",
+        "extensions", "signatures", "body"])):
+    """ Decoded transaction. body is a memoryview of the serialized
+        transaction without signatures, from which the transaction id and the
+        signing digest are derived without serializing again.
+    """
+    __slots__ = ()
+
+    @property
+    def id(self):
+        """ The transaction id"""
+        return hexlify(hashlib.sha256(self.body).digest()[:20]).decode("ascii")
+
+    def digest(self, chain_id):
+        """ Returns the digest which is signed for the chain with chain_id"""
+        return hashlib.sha256(unhexlify(chain_id) + bytes(self.body)).digest()
+
+    def json(self):
+        """ Returns the transaction as dict, which :class:`beembase.signedtransactions.Signed_Transaction` accepts"""
+        return {"ref_block_num": self.ref_block_num, "ref_block_prefix": self.ref_block_prefix,
+                "expiration": self.expiration, "operations": [op.json() for op in self.operations],
+                "extensions": self.extensions, "signatures": self.signatures}
+
+
+# Readers return the decoded value and the offset of the following byte
+
+
+def _string(data, offset, prefix):
+    return unpack_string_from(data, offset)
+
+
+def _fixed(packer):
+    size = packer.size
+    unpack_from = packer.unpack_from
+
+    def reader(data, offset, prefix):
+        return unpack_from(data, offset)[0], offset + size
+    return reader
+
+
+def _bool(data, offset, prefix):
+    return bool(_uint8.unpack_from(data, offset)[0]), offset + 1
+
+
+def _time(data, offset, prefix):
+    t = _uint32.unpack_from(data, offset)[0]
+    return time.strftime(timeformat, time.gmtime(t)), offset + 4
+
+
+def _asset(data, offset, prefix):
+    amount, precision, symbol = _amount.unpack_from(data, offset)
+    symbol = symbol.rstrip(b"\x00").decode("ascii")
+    if precision > 0:
+        sign = "-" if amount < 0 else ""
+        amount = abs(amount)
+        value = "%s%d.%0*d" % (sign, amount // 10 ** precision, precision, amount % 10 ** precision)
+    else:
+        value = "%d" % amount
+    return "%s %s" % (value, symbol), offset + _amount.size
+
+
+def _public_key(data, offset, prefix):
+    if offset + 33 > len(data):
+        raise ValueError("Public key exceeds the buffer")
+    key = hexlify(data[offset:offset + 33]).decode("ascii")
+    return format(get_public_key(key, prefix=prefix), prefix), offset + 33
+
+
+def _hex_string(data, offset, prefix):
+    length, offset = unpack_varint_from(data, offset)
+    if offset + length > len(data):
+        raise ValueError("Hex string exceeds the buffer")
+    return hexlify(data[offset:offset + length]).decode("ascii"), offset + length
+
+
+def _array(reader):
+    def array_reader(data, offset, prefix):
+        length, offset = unpack_varint_from(data, offset)
+        ret = []
+        for i in range(length):
+            value, offset = reader(data, offset, prefix)
+            ret.append(value)
+        return ret, offset
+    return array_reader
+
+
+def _map(key_reader, value_reader):
+    def map_reader(data, offset, prefix):
+        length, offset = unpack_varint_from(data, offset)
+        ret = []
+        for i in range(length):
+            key, offset = key_reader(data, offset, prefix)
+            value, offset = value_reader(data, offset, prefix)
+            ret.append([key, value])
+        return ret, offset
+    return map_reader
+
+
+def _optional(reader):
+    def optional_reader(data, offset, prefix):
+        if not _uint8.unpack_from(data, offset)[0]:
+            return None, offset + 1
+        return reader(data, offset + 1, prefix)
+    return optional_reader
+
+
+def _empty_extensions(data, offset, prefix):
+    length, offset = unpack_varint_from(data, offset)
+    if length:
+        raise NotImplementedError("Decoding of extensions is not supported")
+    return [], offset
+
+
+def _object(fields):
+    def object_reader(data, offset, prefix):
+        ret = {}
+        for name, reader in fields:
+            value, offset = reader(data, offset, prefix)
+            if value is not None:
+                ret[name] = value
+        return ret, offset
+    return object_reader
+
+
+_uint16_reader = _fixed(_uint16)
+_uint32_reader = _fixed(_uint32)
+_int16_reader = _fixed(_int16)
+
+_permission = _object([
+    ("weight_threshold", _uint32_reader),
+    ("account_auths", _map(_string, _uint16_reader)),
+    ("key_auths", _map(_public_key, _uint16_reader)),
+])
+_price = _object([("base", _asset), ("quote", _asset)])
+_beneficiary = _object([("account", _string), ("weight", _int16_reader)])
+
+
+def _comment_options_extension(data, offset, prefix):
+    type_id, offset = unpack_varint_from(data, offset)
+    if type_id != 0:
+        raise NotImplementedError("Unknown CommentOptionExtension %d" % type_id)
+    beneficiaries, offset = _array(_beneficiary)(data, offset, prefix)
+    return [type_id, {"beneficiaries": beneficiaries}], offset
+
+
+#: Field readers of the operations, which mirror the encoders in beembase.operations
+operation_readers = {
+    "vote": _object([("voter", _string), ("author", _string), ("permlink", _string), ("weight", _int16_reader)]),
+    "comment": _object([("parent_author", _string), ("parent_permlink", _string), ("author", _string),
+                        ("permlink", _string), ("title", _string), ("body", _string), ("json_metadata", _string)]),
+    "transfer": _object([("from", _string), ("to", _string), ("amount", _asset), ("memo", _string)]),
+    "transfer_to_vesting": _object([("from", _string), ("to", _string), ("amount", _asset)]),
+    "withdraw_vesting": _object([("account", _string), ("vesting_shares", _asset)]),
+    "limit_order_create": _object([("owner", _string), ("orderid", _uint32_reader), ("amount_to_sell", _asset),
+                                   ("min_to_receive", _asset), ("fill_or_kill", _bool), ("expiration", _time)]),
+    "limit_order_cancel": _object([("owner", _string), ("orderid", _uint32_reader)]),
+    "feed_publish": _object([("publisher", _string), ("exchange_rate", _price)]),
+    "convert": _object([("owner", _string), ("requestid", _uint32_reader), ("amount", _asset)]),
+    "account_create": _object([("fee", _asset), ("creator", _string), ("new_account_name", _string),
+                               ("owner", _permission), ("active", _permission), ("posting", _permission),
+                               ("memo_key", _public_key), ("json_metadata", _string)]),
+    "account_update": _object([("account", _string), ("owner", _optional(_permission)),
+                               ("active", _optional(_permission)), ("posting", _optional(_permission)),
+                               ("memo_key", _public_key), ("json_metadata", _string)]),
+    "witness_update": _object([("owner", _string), ("url", _string), ("block_signing_key", _public_key),
+                               ("props", _object([("account_creation_fee", _asset),
+                                                  ("maximum_block_size", _uint32_reader),
+                                                  ("sbd_interest_rate", _uint16_reader)])),
+                               ("fee", _asset)]),
+    "account_witness_vote": _object([("account", _string), ("witness", _string), ("approve", _bool)]),
+    "account_witness_proxy": _object([("account", _string), ("proxy", _string)]),
+    "custom": _object([("required_auths", _array(_string)), ("id", _uint16_reader), ("data", _string)]),
+    "delete_comment": _object([("author", _string), ("permlink", _string)]),
+    "custom_json": _object([("required_auths", _array(_string)), ("required_posting_auths", _array(_string)),
+                            ("id", _string), ("json", _string)]),
+    "comment_options": _object([("author", _string), ("permlink", _string), ("max_accepted_payout", _asset),
+                                ("percent_steem_dollars", _uint16_reader), ("allow_votes", _bool),
+                                ("allow_curation_rewards", _bool),
+                                ("extensions", _array(_comment_options_extension))]),
+    "set_withdraw_vesting_route": _object([("from_account", _string), ("to_account", _string),
+                                           ("percent", _uint16_reader), ("auto_vest", _bool)]),
+    "limit_order_create2": _object([("owner", _string), ("orderid", _uint32_reader), ("amount_to_sell", _asset),
+                                    ("fill_or_kill", _bool), ("exchange_rate", _price), ("expiration", _time)]),
+    "claim_account": _object([("creator", _string), ("fee", _asset), ("extensions", _empty_extensions)]),
+    "create_claimed_account": _object([("creator", _string), ("new_account_name", _string),
+                                       ("owner", _permission), ("active", _permission), ("posting", _permission),
+                                       ("memo_key", _public_key), ("json_metadata", _string),
+                                       ("extensions", _empty_extensions)]),
+    "request_account_recovery": _object([("recovery_account", _string), ("account_to_recover", _string),
+                                         ("new_owner_authority", _permission), ("extensions", _empty_extensions)]),
+    "recover_account": _object([("account_to_recover", _string), ("new_owner_authority", _permission),
+                                ("recent_owner_authority", _permission), ("extensions", _empty_extensions)]),
+    "change_recovery_account": _object([("account_to_recover", _string), ("new_recovery_account", _string),
+                                        ("extensions", _empty_extensions)]),
+    "escrow_transfer": _object([("from", _string), ("to", _string), ("agent", _string),
+                                ("escrow_id", _uint32_reader), ("sbd_amount", _asset), ("steem_amount", _asset),
+                                ("fee", _asset), ("ratification_deadline", _time), ("escrow_expiration", _time),
+                                ("json_meta", _string)]),
+    "escrow_dispute": _object([("from", _string), ("to", _string), ("who", _string),
+                               ("escrow_id", _uint32_reader)]),
+    "escrow_release": _object([("from", _string), ("to", _string), ("who", _string),
+                               ("escrow_id", _uint32_reader), ("sbd_amount", _asset), ("steem_amount", _asset)]),
+    "escrow_approve": _object([("from", _string), ("to", _string), ("agent", _string), ("who", _string),
+                               ("escrow_id", _uint32_reader), ("approve", _bool)]),
+    "transfer_to_savings": _object([("from", _string), ("to", _string), ("amount", _asset), ("memo", _string)]),
+    "transfer_from_savings": _object([("from", _string), ("request_id", _uint32_reader), ("to", _string),
+                                      ("amount", _asset), ("memo", _string)]),
+    "cancel_transfer_from_savings": _object([("from", _string), ("request_id", _uint32_reader)]),
+    "custom_binary": _object([("id", _uint16_reader), ("data", _string)]),
+    "decline_voting_rights": _object([("account", _string), ("decline", _bool)]),
+    "claim_reward_balance": _object([("account", _string), ("reward_steem", _asset), ("reward_sbd", _asset),
+                                     ("reward_vests", _asset)]),
+    "delegate_vesting_shares": _object([("delegator", _string), ("delegatee", _string),
+                                        ("vesting_shares", _asset)]),
+    "account_create_with_delegation": _object([("fee", _asset), ("delegation", _asset), ("creator", _string),
+                                               ("new_account_name", _string), ("owner", _permission),
+                                               ("active", _permission), ("posting", _permission),
+                                               ("memo_key", _public_key), ("json_metadata", _string),
+                                               ("extensions", _empty_extensions)]),
+    "witness_set_properties": _object([("owner", _string), ("props", _map(_string, _hex_string)),
+                                       ("extensions", _empty_extensions)]),
+}
+
+# Readers by operation id
+_readers_by_id = [(name, operation_readers.get(name)) for name in ops]
+
+
+def _decode_operation(data, offset, prefix):
+    op_id, offset = unpack_varint_from(data, offset)
+    if op_id >= len(_readers_by_id) or _readers_by_id[op_id][1] is None:
+        # operations are not length prefixed, the rest of the buffer cannot be decoded
+        raise NotImplementedError("Decoding of operation id %d is not supported" % op_id)
+    name, reader = _readers_by_id[op_id]
+    value, offset = reader(data, offset, prefix)
+    return OperationRecord(op_id, name, value), offset
+
+
+def _decode_transaction(data, offset, prefix):
+    start = offset
+    ref_block_num, ref_block_prefix, expiration = _tx_header.unpack_from(data, offset)
+    offset += _tx_header.size
+    n_ops, offset = unpack_varint_from(data, offset)
+    operations = []
+    for i in range(n_ops):
+        op, offset = _decode_operation(data, offset, prefix)
+        operations.append(op)
+    extensions, offset = _empty_extensions(data, offset, prefix)
+    body = data[start:offset]
+    n_sigs, offset = unpack_varint_from(data, offset)
+    signatures = []
+    for i in range(n_sigs):
+        signatures.append(hexlify(data[offset:offset + 65]).decode("ascii"))
+        offset += 65
+    if offset > len(data):
+        raise ValueError("Transaction exceeds the buffer")
+    tx = TransactionRecord(ref_block_num, ref_block_prefix,
+                           time.strftime(timeformat, time.gmtime(expiration)),
+                           operations, extensions, signatures, body)
+    return tx, offset
+
+
+def _as_buffer(data):
+    if isinstance(data, string_types):
+        data = unhexlify(data)
+    return memoryview(data)
+
+
+def _read(decoder, data, offset, prefix):
+    """ Calls decoder and raises ValueError, when data ends before the
+        decoded value, like unpack_string_from
+    """
+    try:
+        return decoder(data, offset, prefix)
+    except (IndexError, struct.error):
+        raise ValueError("Data ends before the end of the decoded value")
+
+
+def decode_operation(data, offset=0, prefix=default_prefix):
+    """ Decodes one serialized operation (varint id and fields)
+
+        :param data: bytes, bytearray, memoryview or hex string
+        :param int offset: position of the operation in data
+        :param str prefix: prefix of the public keys (default is STM)
+
+        Returns an :class:`OperationRecord` and the offset of the next byte.
+    """
+    return _read(_decode_operation, _as_buffer(data), offset, prefix)
+
+
+def decode_transaction(data, prefix=default_prefix):
+    """ Decodes a serialized signed transaction, e.g. from ``get_transaction_hex``
+
+        :param data: bytes, bytearray, memoryview or hex string
+        :param str prefix: prefix of the public keys (default is STM)
+
+        Returns a :class:`TransactionRecord`.
+
+        .. code-block:: python
+
+            from beembase.deserializer import decode_transaction
+            tx = decode_transaction(hex_string)
+            print(tx.id, [op.type for op in tx.operations])
+
+    """
+    tx, offset = _read(_decode_transaction, _as_buffer(data), 0, prefix)
+    return tx
+
+
+def decode_transactions(data, offset=0, count=None, prefix=default_prefix):
+    """ Decodes consecutive serialized transactions from one buffer (bulk mode)
+
+        :param data: bytes, bytearray, memoryview or hex string, e.g. a
+            memory mapped dump of many transactions
+        :param int offset: position of the first transaction
+        :param int count: number of transactions which are decoded, when None
+            the buffer is decoded until its end
+        :param str prefix: prefix of the public keys (default is STM)
+
+        Yields :class:`TransactionRecord` objects. The buffer is not copied,
+        the body of every record is a view into it.
+    """
+    data = _as_buffer(data)
+    n = 0
+    while offset < len(data) and (count is None or n < count):
+        tx, offset = _read(_decode_transaction, data, offset, prefix)
+        n += 1
+        yield tx
@@ -13,11 +13,11 @@ from beemgraphenebase.types import (
     Varint32, Int64, String, Bytes, Void,
     Array, PointInTime, Signature, Bool,
     Set, Fixed_array, Optional, Static_variant,
-    Map, Id
+    Map
 )
 from beemgraphenebase.objects import GrapheneObject, isArgsThisClass
 from .objecttypes import object_type
-from beemgraphenebase.account import PublicKey
+from beemgraphenebase.account import PublicKey, get_public_key
 from beemgraphenebase.objects import Operation as GPHOperation
 from beemgraphenebase.chains import known_chains
 from .operationids import operations, operations_wls
@@ -107,9 +107,14 @@ class Operation(GPHOperation):
         self.prefix = kwargs.pop("prefix", default_prefix)
         super(Operation, self).__init__(*args, **kwargs)
 
+    _klass_cache = {}
+
     def _getklass(self, name):
-        module = __import__("beembase.operations", fromlist=["operations"])
-        class_ = getattr(module, name)
+        class_ = self._klass_cache.get(name)
+        if class_ is None:
+            module = __import__("beembase.operations", fromlist=["operations"])
+            class_ = getattr(module, name)
+            self._klass_cache[name] = class_
         return class_
 
     def operations(self):
@@ -117,21 +122,10 @@ class Operation(GPHOperation):
             return operations_wls
         return operations
 
-    def getOperationNameForId(self, i):
-        """ Convert an operation id into the corresponding string
-        """
-        for key in self.operations():
-            if int(self.operations()[key]) is int(i):
-                return key
-        return "Unknown Operation ID %d" % i
-
     def json(self):
         return json.loads(str(self))
         # return json.loads(str(json.dumps([self.name, self.op.toJson()])))
 
-    def __bytes__(self):
-        return py23_bytes(Id(self.opId)) + py23_bytes(self.op)
-
     def __str__(self):
         if self.appbase:
             return json.dumps({'type': self.name.lower() + '_operation', 'value': self.op.toJson()})
@@ -209,7 +203,7 @@ class Permission(GrapheneObject):
             # Key and not located here)
             kwargs["key_auths"] = sorted(
                 kwargs["key_auths"],
-                key=lambda x: repr(PublicKey(x[0], prefix=prefix)),
+                key=lambda x: repr(get_public_key(x[0], prefix=prefix)),
                 reverse=False,
             )
             kwargs["account_auths"] = sorted(
@@ -222,7 +216,7 @@ class Permission(GrapheneObject):
                 for e in kwargs["account_auths"]
             ])
             keyAuths = Map([
-                [PublicKey(e[0], prefix=prefix), Uint16(e[1])]
+                [get_public_key(e[0], prefix=prefix), Uint16(e[1])]
                 for e in kwargs["key_auths"]
             ])
             super(Permission, self).__init__(OrderedDict([
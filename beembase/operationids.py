@@ -65,6 +65,25 @@ ops = [
 ]
 operations = {o: ops.index(o) for o in ops}
 
+#: Virtual operations, they are created by the chain and are not part of a transaction
+virtual_ops = [
+    'fill_convert_request',
+    'author_reward',
+    'curation_reward',
+    'comment_reward',
+    'liquidity_reward',
+    'producer_reward',
+    'interest',
+    'fill_vesting_withdraw',
+    'fill_order',
+    'shutdown_witness',
+    'fill_transfer_from_savings',
+    'hardfork',
+    'comment_payout_update',
+    'return_vesting_delegation',
+    'comment_benefactor_reward',
+]
+
 ops_wls = [
     'vote',
     'comment',
@@ -94,12 +113,14 @@ ops_wls = [
     'comment_benefactor_reward',
 ]
 operations_wls = {o: ops_wls.index(o) for o in ops_wls}
+#: Operation names by id
+operations_by_id = {v: k for k, v in operations.items()}
 
 
 def getOperationNameForId(i):
     """ Convert an operation id into the corresponding string
     """
-    for key in operations:
-        if int(operations[key]) is int(i):
-            return key
-    return "Unknown Operation ID %d" % i
+    name = operations_by_id.get(int(i))
+    if name is None:
+        return "Unknown Operation ID %d" % i
+    return name
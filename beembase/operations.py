@@ -16,7 +16,7 @@ from beemgraphenebase.types import (
     Map, Id, HexString
 )
 from .objects import GrapheneObject, isArgsThisClass
-from beemgraphenebase.account import PublicKey
+from beemgraphenebase.account import PublicKey, get_public_key
 from beemgraphenebase.py23 import PY2, PY3
 from .operationids import operations
 from .objects import (
@@ -200,7 +200,7 @@ class Account_create(GrapheneObject):
             ('owner', Permission(kwargs["owner"], prefix=prefix)),
             ('active', Permission(kwargs["active"], prefix=prefix)),
             ('posting', Permission(kwargs["posting"], prefix=prefix)),
-            ('memo_key', PublicKey(kwargs["memo_key"], prefix=prefix)),
+            ('memo_key', get_public_key(kwargs["memo_key"], prefix=prefix)),
             ('json_metadata', String(meta)),
         ]))
 
@@ -232,7 +232,7 @@ class Account_create_with_delegation(GrapheneObject):
             ('owner', Permission(kwargs["owner"], prefix=prefix)),
             ('active', Permission(kwargs["active"], prefix=prefix)),
             ('posting', Permission(kwargs["posting"], prefix=prefix)),
-            ('memo_key', PublicKey(kwargs["memo_key"], prefix=prefix)),
+            ('memo_key', get_public_key(kwargs["memo_key"], prefix=prefix)),
             ('json_metadata', String(meta)),
             ('extensions', Array([])),
         ]))
@@ -273,7 +273,7 @@ class Account_update(GrapheneObject):
             ('owner', owner),
             ('active', active),
             ('posting', posting),
-            ('memo_key', PublicKey(kwargs["memo_key"], prefix=prefix)),
+            ('memo_key', get_public_key(kwargs["memo_key"], prefix=prefix)),
             ('json_metadata', String(meta)),
         ]))
 
@@ -557,7 +557,7 @@ class Create_claimed_account(GrapheneObject):
                 ('owner', Permission(kwargs["owner"], prefix=prefix)),
                 ('active', Permission(kwargs["active"], prefix=prefix)),
                 ('posting', Permission(kwargs["posting"], prefix=prefix)),
-                ('memo_key', PublicKey(kwargs["memo_key"], prefix=prefix)),
+                ('memo_key', get_public_key(kwargs["memo_key"], prefix=prefix)),
                 ('json_metadata', String(meta)),
                 ('extensions', Array([])),
             ]))
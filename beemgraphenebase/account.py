@@ -14,7 +14,9 @@ import os
 import codecs
 import ecdsa
 import ctypes
+import threading
 from binascii import hexlify, unhexlify
+from collections import OrderedDict
 
 from .base58 import ripemd160, Base58
 from .dictionary import words as BrainKeyDictionary
@@ -270,8 +272,20 @@ class PublicKey(Address):
         """
         self.prefix = prefix
         self._pk = Base58(pk, prefix=prefix)
-        self.address = Address(pubkey=pk, prefix=prefix)
         self.pubkey = self._pk
+        self._key_address = None
+        self._uncompressed = None
+
+    @property
+    def address(self):
+        """ :class:`Address` of the public key, which is created on first use"""
+        if getattr(self, "_key_address", None) is None:
+            self._key_address = Address(pubkey=repr(self._pk), prefix=self.prefix)
+        return self._key_address
+
+    @address.setter
+    def address(self, address):
+        self._key_address = address
 
     def get_public_key(self):
         """Returns the pubkey"""
@@ -284,7 +298,10 @@ class PublicKey(Address):
         #   y^2 = x^3 + ax + b
         a, b, p = curve.a(), curve.b(), curve.p()
         alpha = (pow(x, 3, p) + a * x + b) % p
-        beta = ecdsa.numbertheory.square_root_mod_prime(alpha, p)
+        # p = 3 mod 4, so that the square root is alpha^((p + 1) / 4)
+        beta = pow(alpha, (p + 1) // 4, p)
+        if beta * beta % p != alpha:
+            raise ValueError("x is not the coordinate of a point on the curve")
         if (beta % 2) == is_even:
             beta = p - beta
         return beta
@@ -300,6 +317,8 @@ class PublicKey(Address):
 
     def unCompressed(self):
         """ Derive uncompressed key """
+        if getattr(self, "_uncompressed", None) is not None:
+            return self._uncompressed
         public_key = repr(self._pk)
         prefix = public_key[0:2]
         if prefix == "04":
@@ -309,6 +328,7 @@ class PublicKey(Address):
         x = int(public_key[2:], 16)
         y = self._derive_y_from_x(x, (prefix == "02"))
         key = '04' + '%064x' % x + '%064x' % y
+        self._uncompressed = key
         return key
 
     def point(self):
@@ -335,6 +355,39 @@ class PublicKey(Address):
         return py23_bytes(self._pk)
 
 
+_public_key_cache = OrderedDict()
+_public_key_cache_lock = threading.Lock()
+PUBLIC_KEY_CACHE_SIZE = 10000
+
+
+def get_public_key(pk, prefix="STM"):
+    """ Returns a cached :class:`PublicKey` for a public key string, so that
+        keys which appear again (e.g. in account authorities) are not parsed
+        again. At most PUBLIC_KEY_CACHE_SIZE keys are kept, the least recently
+        used key is removed first. The returned object is shared and must not
+        be changed.
+
+        :param str pk: Base58 encoded public key or its hex representation
+        :param str prefix: Network prefix (defaults to ``STM``)
+    """
+    key = (pk, prefix)
+    with _public_key_cache_lock:
+        public_key = _public_key_cache.pop(key, None)
+    if public_key is None:
+        public_key = PublicKey(pk, prefix=prefix)
+    with _public_key_cache_lock:
+        _public_key_cache[key] = public_key
+        while len(_public_key_cache) > PUBLIC_KEY_CACHE_SIZE:
+            _public_key_cache.popitem(last=False)
+    return public_key
+
+
+def clear_public_key_cache():
+    """ Removes all cached public keys"""
+    with _public_key_cache_lock:
+        _public_key_cache.clear()
+
+
 @python_2_unicode_compatible
 class PrivateKey(PublicKey):
     """ Derives the compressed and uncompressed public keys and
@@ -382,8 +435,9 @@ class PrivateKey(PublicKey):
         secret = unhexlify(repr(self._wif))
         if not len(secret) == ecdsa.SECP256k1.baselen:
             raise ValueError("{} != {}".format(len(secret), ecdsa.SECP256k1.baselen))
-        order = ecdsa.SigningKey.from_string(secret, curve=ecdsa.SECP256k1).curve.generator.order()
-        p = ecdsa.SigningKey.from_string(secret, curve=ecdsa.SECP256k1).verifying_key.pubkey.point
+        sk = ecdsa.SigningKey.from_string(secret, curve=ecdsa.SECP256k1)
+        order = sk.curve.generator.order()
+        p = sk.verifying_key.pubkey.point
         x_str = ecdsa.util.number_to_string(p.x(), order)
         y_str = ecdsa.util.number_to_string(p.y(), order)
         compressed = hexlify(py23_bytes(chr(2 + (p.y() & 1)), 'ascii') + x_str).decode('ascii')
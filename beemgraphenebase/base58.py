@@ -7,12 +7,14 @@ from builtins import object
 from builtins import chr
 from future.utils import python_2_unicode_compatible
 from binascii import hexlify, unhexlify
-from .py23 import py23_bytes, py23_chr, bytes_types, integer_types, string_types, text_type
+from .py23 import py23_bytes, bytes_types, string_types, text_type
 import hashlib
-import string
+import re
 import logging
 log = logging.getLogger(__name__)
 
+_hex_re = re.compile("^[0-9a-fA-F]*$")
+
 """ Default Prefix """
 PREFIX = "GPH"
 
@@ -64,14 +66,17 @@ class Base58(object):
         self._prefix = prefix
         if isinstance(data, Base58):
             data = repr(data)
-        if all(c in string.hexdigits for c in data):
+        # graphene base58 string, it is kept for __str__
+        self._str = None
+        if _hex_re.match(data):
             self._hex = data
         elif data[0] == "5" or data[0] == "6":
             self._hex = base58CheckDecode(data)
         elif data[0] == "K" or data[0] == "L":
             self._hex = base58CheckDecode(data)[:-2]
         elif data[:len(self._prefix)] == self._prefix:
-            self._hex = gphBase58CheckDecode(data[len(self._prefix):])
+            self._str = data[len(self._prefix):]
+            self._hex = gphBase58CheckDecode(self._str)
         else:
             raise ValueError("Error loading Base58 object")
 
@@ -109,7 +114,9 @@ class Base58(object):
             :return: Base58 encoded data
             :rtype: str
         """
-        return gphBase58CheckEncode(self._hex)
+        if self._str is None:
+            self._str = gphBase58CheckEncode(self._hex)
+        return self._str
 
     def __bytes__(self):
         """ Return raw bytes
@@ -123,45 +130,46 @@ class Base58(object):
 
 # https://github.com/tochev/python3-cryptocoins/raw/master/cryptocoins/base58.py
 BASE58_ALPHABET = b"123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_base58_chars = BASE58_ALPHABET.decode("ascii")
+_base58_values = dict((c, i) for i, c in enumerate(_base58_chars))
 
 
-def base58decode(base58_str):
-    base58_text = py23_bytes(base58_str, "ascii")
+def base58decode_bytes(base58_str):
+    """ Decodes a base58 string into raw bytes"""
+    if isinstance(base58_str, bytes_types):
+        base58_str = base58_str.decode("ascii")
     n = 0
-    leading_zeroes_count = 0
-    for b in base58_text:
-        if isinstance(b, integer_types):
-            n = n * 58 + BASE58_ALPHABET.find(py23_chr(b))
-        else:
-            n = n * 58 + BASE58_ALPHABET.find(b)
-        if n == 0:
-            leading_zeroes_count += 1
-    res = bytearray()
-    while n >= 256:
-        div, mod = divmod(n, 256)
-        res.insert(0, mod)
-        n = div
-    else:
-        res.insert(0, n)
-    return hexlify(bytearray(1) * leading_zeroes_count + res).decode('ascii')
+    try:
+        for c in base58_str:
+            n = n * 58 + _base58_values[c]
+    except KeyError:
+        raise ValueError("Invalid base58 character")
+    leading_zeroes_count = len(base58_str) - len(base58_str.lstrip("1"))
+    h = "%x" % n
+    if len(h) % 2:
+        h = "0" + h
+    return b"\x00" * leading_zeroes_count + unhexlify(h)
+
+
+def base58encode_bytes(data):
+    """ Encodes raw bytes into a base58 string"""
+    data = py23_bytes(data)
+    n = int(hexlify(data), 16) if data else 0
+    leading_zeroes_count = len(data) - len(data.lstrip(b"\x00"))
+    res = []
+    while n >= 58:
+        n, mod = divmod(n, 58)
+        res.append(_base58_chars[mod])
+    res.append(_base58_chars[n])
+    return "1" * leading_zeroes_count + "".join(reversed(res))
+
+
+def base58decode(base58_str):
+    return hexlify(base58decode_bytes(base58_str)).decode('ascii')
 
 
 def base58encode(hexstring):
-    byteseq = py23_bytes(unhexlify(py23_bytes(hexstring, 'ascii')))
-    n = 0
-    leading_zeroes_count = 0
-    for c in byteseq:
-        n = n * 256 + c
-        if n == 0:
-            leading_zeroes_count += 1
-    res = bytearray()
-    while n >= 58:
-        div, mod = divmod(n, 58)
-        res.insert(0, BASE58_ALPHABET[mod])
-        n = div
-    else:
-        res.insert(0, BASE58_ALPHABET[n])
-    return (BASE58_ALPHABET[0:1] * leading_zeroes_count + res).decode('ascii')
+    return base58encode_bytes(unhexlify(py23_bytes(hexstring, 'ascii')))
 
 
 def ripemd160(s):
@@ -183,31 +191,28 @@ def b58decode(v):
 
 
 def base58CheckEncode(version, payload):
-    s = ('%.2x' % version) + payload
-    checksum = doublesha256(s)[:4]
-    result = s + hexlify(checksum).decode('ascii')
-    return base58encode(result)
+    s = py23_bytes(bytearray([version])) + unhexlify(py23_bytes(payload, 'ascii'))
+    checksum = hashlib.sha256(hashlib.sha256(s).digest()).digest()[:4]
+    return base58encode_bytes(s + checksum)
 
 
 def base58CheckDecode(s):
-    s = unhexlify(base58decode(s))
-    dec = hexlify(s[:-4]).decode('ascii')
-    checksum = doublesha256(dec)[:4]
+    s = base58decode_bytes(s)
+    checksum = hashlib.sha256(hashlib.sha256(s[:-4]).digest()).digest()[:4]
     if not (s[-4:] == checksum):
         raise AssertionError()
-    return dec[2:]
+    return hexlify(s[1:-4]).decode('ascii')
 
 
 def gphBase58CheckEncode(s):
-    checksum = ripemd160(s)[:4]
-    result = s + hexlify(checksum).decode('ascii')
-    return base58encode(result)
+    s = unhexlify(py23_bytes(s, 'ascii'))
+    checksum = hashlib.new('ripemd160', s).digest()[:4]
+    return base58encode_bytes(s + checksum)
 
 
 def gphBase58CheckDecode(s):
-    s = unhexlify(base58decode(s))
-    dec = hexlify(s[:-4]).decode('ascii')
-    checksum = ripemd160(dec)[:4]
+    s = base58decode_bytes(s)
+    checksum = hashlib.new('ripemd160', s[:-4]).digest()[:4]
     if not (s[-4:] == checksum):
         raise AssertionError()
-    return dec
+    return hexlify(s[:-4]).decode('ascii')
@@ -12,10 +12,21 @@ import hashlib
 from binascii import hexlify, unhexlify
 import struct
 import logging
+import threading
+import multiprocessing
+from collections import OrderedDict
 from .account import PrivateKey, PublicKey
 from .py23 import py23_bytes, bytes_types
 log = logging.getLogger(__name__)
 
+FUTURES_MODULE = None
+if not FUTURES_MODULE:
+    try:
+        from concurrent.futures import ProcessPoolExecutor
+        FUTURES_MODULE = "futures"
+    except ImportError:
+        FUTURES_MODULE = None
+
 SECP256K1_MODULE = None
 SECP256K1_AVAILABLE = False
 CRYPTOGRAPHY_AVAILABLE = False
@@ -43,7 +54,7 @@ if not SECP256K1_MODULE:
         from cryptography.hazmat.primitives import hashes
         from cryptography.hazmat.primitives.asymmetric import ec
         from cryptography.hazmat.primitives.asymmetric.utils \
-            import decode_dss_signature, encode_dss_signature
+            import decode_dss_signature, encode_dss_signature, Prehashed
         from cryptography.exceptions import InvalidSignature
         CRYPTOGRAPHY_AVAILABLE = True
     except ImportError:
@@ -75,10 +86,9 @@ def compressedPubkey(pk):
     return py23_bytes(chr(2 + (y & 1)), 'ascii') + x_str
 
 
-def recover_public_key(digest, signature, i, message=None):
-    """ Recover the public key from the the signature
+def _recover_public_point(digest, signature, i):
+    """ Recover the public key point from the signature, without verifying it
     """
-
     # See http: //www.secg.org/download/aid-780/sec1-v2.pdf section 4.1.6 primarily
     curve = ecdsa.SECP256k1.curve
     G = ecdsa.SECP256k1.generator
@@ -97,13 +107,21 @@ def recover_public_key(digest, signature, i, message=None):
     # 1.5 Compute e
     e = ecdsa.util.string_to_number(digest)
     # 1.6 Compute Q = r^-1(sR - eG)
-    Q = ecdsa.numbertheory.inverse_mod(r, order) * (s * R + (-e % order) * G)
+    return ecdsa.numbertheory.inverse_mod(r, order) * (s * R + (-e % order) * G)
+
+
+def recover_public_key(digest, signature, i, message=None):
+    """ Recover the public key from the the signature
+    """
+    order = ecdsa.SECP256k1.order
+    r, s = ecdsa.util.sigdecode_string(signature, order)
+    Q = _recover_public_point(digest, signature, i)
 
     if SECP256K1_MODULE == "cryptography" and message is not None:
         if not isinstance(message, bytes_types):
             message = py23_bytes(message, "utf-8")
         sigder = encode_dss_signature(r, s)
-        public_key = ec.EllipticCurvePublicNumbers(Q._Point__x, Q._Point__y, ec.SECP256K1()).public_key(default_backend())
+        public_key = ec.EllipticCurvePublicNumbers(Q.x(), Q.y(), ec.SECP256K1()).public_key(default_backend())
         public_key.verify(sigder, message, ec.ECDSA(hashes.SHA256()))
         return public_key
     else:
@@ -145,136 +163,205 @@ def recoverPubkeyParameter(message, digest, signature, pubkey):
     return None
 
 
-def sign_message(message, wif, hashfn=hashlib.sha256):
-    """ Sign a digest with a wif key
+class Signer(object):
+    """ Signs digests with one private key. The key is parsed and the
+        signing context of the secp256k1 or cryptography backend is created
+        once, so that a signer can be reused for many signatures.
+
+        :param wif: Private key as wif string or :class:`PrivateKey`
+        :param hashfn: hash function which is used by :func:`sign` (default is sha256)
+
+        .. code-block:: python
+
+            signer = Signer(wif)
+            signature = signer.sign(message)
+            signatures = signer.sign_many([digest1, digest2])
 
-        :param str wif: Private key in
     """
+    def __init__(self, wif, hashfn=hashlib.sha256):
+        if isinstance(wif, PrivateKey):
+            self.priv_key = wif
+        else:
+            self.priv_key = PrivateKey(wif)
+        self.hashfn = hashfn
+        self.secret = py23_bytes(self.priv_key)
+        # x and y of the public key, the recovery parameter is found by comparing
+        # the recovered point with them
+        pubkey = self.priv_key._pubkeyuncompressedhex
+        self.pubkey_x = int(pubkey[2:66], 16)
+        self.pubkey_y = int(pubkey[66:], 16)
+        self.lock = threading.Lock()
+        self._module = None
+        self._key = None
+        self._pubkey_point = None
 
-    if not isinstance(message, bytes_types):
-        message = py23_bytes(message, "utf-8")
+    def _get_key(self):
+        """ Returns the signing key of the current SECP256K1_MODULE and creates it only when the module has changed"""
+        if self._module != SECP256K1_MODULE:
+            if SECP256K1_MODULE == "secp256k1":
+                self._key = secp256k1.PrivateKey(self.secret, raw=True)
+            elif SECP256K1_MODULE == "cryptography":
+                self._key = ec.derive_private_key(int(repr(self.priv_key), 16), ec.SECP256K1(), default_backend())
+            else:
+                self._key = ecdsa.SigningKey.from_string(self.secret, curve=ecdsa.SECP256k1)
+            self._module = SECP256K1_MODULE
+        return self._key
 
-    digest = hashfn(message).digest()
-    priv_key = PrivateKey(wif)
-    if SECP256K1_MODULE == "secp256k1":
-        p = py23_bytes(priv_key)
-        ndata = secp256k1.ffi.new("const int *ndata")
-        ndata[0] = 0
-        while True:
-            ndata[0] += 1
-            privkey = secp256k1.PrivateKey(p, raw=True)
-            sig = secp256k1.ffi.new('secp256k1_ecdsa_recoverable_signature *')
-            signed = secp256k1.lib.secp256k1_ecdsa_sign_recoverable(
-                privkey.ctx,
-                sig,
-                digest,
-                privkey.private_key,
-                secp256k1.ffi.NULL,
-                ndata
-            )
-            if not signed == 1:
-                raise AssertionError()
-            signature, i = privkey.ecdsa_recoverable_serialize(sig)
-            if _is_canonical(signature):
-                i += 4   # compressed
-                i += 27  # compact
-                break
-    elif SECP256K1_MODULE == "cryptography":
-        cnt = 0
-        private_key = ec.derive_private_key(int(repr(priv_key), 16), ec.SECP256K1(), default_backend())
-        public_key = private_key.public_key()
-        while True:
-            cnt += 1
-            if not cnt % 20:
-                log.info("Still searching for a canonical signature. Tried %d times already!" % cnt)
+    def _recover_parameter(self, digest, signature):
+        G = ecdsa.SECP256k1.generator
+        if hasattr(G, "mul_add"):
+            # R = (e / s) * G + (r / s) * Q, the recovery parameter is the parity of its y
             order = ecdsa.SECP256k1.order
-            sigder = private_key.sign(message, ec.ECDSA(hashes.SHA256()))
-            r, s = decode_dss_signature(sigder)
-            signature = ecdsa.util.sigencode_string(r, s, order)
-            # Make sure signature is canonical!
-            #
-            sigder = bytearray(sigder)
-            lenR = sigder[3]
-            lenS = sigder[5 + lenR]
-            if lenR is 32 and lenS is 32:
-                # Derive the recovery parameter
-                #
-                i = recoverPubkeyParameter(
-                    message, digest, signature, public_key)
-                i += 4   # compressed
-                i += 27  # compact
-                break
-    else:
-        cnt = 0
-        p = py23_bytes(priv_key)
-        sk = ecdsa.SigningKey.from_string(p, curve=ecdsa.SECP256k1)
-        while 1:
-            cnt += 1
-            if not cnt % 20:
-                log.info("Still searching for a canonical signature. Tried %d times already!" % cnt)
-
-            # Deterministic k
-            #
-            k = ecdsa.rfc6979.generate_k(
-                sk.curve.generator.order(),
-                sk.privkey.secret_multiplier,
-                hashlib.sha256,
-                hashlib.sha256(
-                    digest +
-                    struct.pack("d", time.time())  # use the local time to randomize the signature
-                ).digest())
-
-            # Sign message
-            #
-            sigder = sk.sign_digest(
-                digest,
-                sigencode=ecdsa.util.sigencode_der,
-                k=k)
-
-            # Reformating of signature
-            #
-            r, s = ecdsa.util.sigdecode_der(sigder, sk.curve.generator.order())
-            signature = ecdsa.util.sigencode_string(r, s, sk.curve.generator.order())
-
-            # Make sure signature is canonical!
-            #
-            sigder = bytearray(sigder)
-            lenR = sigder[3]
-            lenS = sigder[5 + lenR]
-            if lenR is 32 and lenS is 32:
-                # Derive the recovery parameter
+            if self._pubkey_point is None:
+                self._pubkey_point = ecdsa.ellipticcurve.PointJacobi.from_affine(
+                    ecdsa.ellipticcurve.Point(ecdsa.SECP256k1.curve, self.pubkey_x, self.pubkey_y, order),
+                    generator=True)
+            r, s = ecdsa.util.sigdecode_string(signature, order)
+            s_inv = ecdsa.numbertheory.inverse_mod(s, order)
+            R = G.mul_add(ecdsa.util.string_to_number(digest) * s_inv % order, self._pubkey_point, r * s_inv % order)
+            x = R.x()
+            if x % order == r:
+                return (R.y() & 1) + (2 if x >= order else 0)
+        for i in range(0, 4):
+            Q = _recover_public_point(digest, signature, i)
+            if Q.x() == self.pubkey_x and Q.y() == self.pubkey_y:
+                return i
+        raise AssertionError("Could not derive the recovery parameter")
+
+    def sign_digest(self, digest):
+        """ Returns the canonical compact signature of a 32 byte digest
+
+            :param bytes digest: digest which is signed
+        """
+        with self.lock:
+            key = self._get_key()
+        if SECP256K1_MODULE == "secp256k1":
+            ndata = secp256k1.ffi.new("const int *ndata")
+            ndata[0] = 0
+            while True:
+                ndata[0] += 1
+                sig = secp256k1.ffi.new('secp256k1_ecdsa_recoverable_signature *')
+                signed = secp256k1.lib.secp256k1_ecdsa_sign_recoverable(
+                    key.ctx,
+                    sig,
+                    digest,
+                    key.private_key,
+                    secp256k1.ffi.NULL,
+                    ndata
+                )
+                if not signed == 1:
+                    raise AssertionError()
+                signature, i = key.ecdsa_recoverable_serialize(sig)
+                if _is_canonical(signature):
+                    break
+        elif SECP256K1_MODULE == "cryptography":
+            cnt = 0
+            order = ecdsa.SECP256k1.order
+            while True:
+                cnt += 1
+                if not cnt % 20:
+                    log.info("Still searching for a canonical signature. Tried %d times already!" % cnt)
+                sigder = key.sign(digest, ec.ECDSA(Prehashed(hashes.SHA256())))
+                r, s = decode_dss_signature(sigder)
+                signature = ecdsa.util.sigencode_string(r, s, order)
+                # Make sure signature is canonical!
+                if _is_canonical(signature):
+                    i = self._recover_parameter(digest, signature)
+                    break
+        else:
+            cnt = 0
+            order = key.curve.generator.order()
+            while True:
+                cnt += 1
+                if not cnt % 20:
+                    log.info("Still searching for a canonical signature. Tried %d times already!" % cnt)
+                # Deterministic k
                 #
-                i = recoverPubkeyParameter(
-                    message, digest, signature, sk.get_verifying_key())
-                i += 4   # compressed
-                i += 27  # compact
-                break
+                k = ecdsa.rfc6979.generate_k(
+                    order,
+                    key.privkey.secret_multiplier,
+                    hashlib.sha256,
+                    hashlib.sha256(
+                        digest +
+                        struct.pack("d", time.time())  # use the local time to randomize the signature
+                    ).digest())
+                signature = key.sign_digest(
+                    digest,
+                    sigencode=ecdsa.util.sigencode_string,
+                    k=k)
+                # Make sure signature is canonical!
+                if _is_canonical(signature):
+                    i = self._recover_parameter(digest, signature)
+                    break
+        i += 4   # compressed
+        i += 27  # compact
+        return struct.pack("<B", i) + signature
+
+    def sign(self, message):
+        """ Hashes the message with hashfn and returns its signature"""
+        if not isinstance(message, bytes_types):
+            message = py23_bytes(message, "utf-8")
+        return self.sign_digest(self.hashfn(message).digest())
 
-    # pack signature
-    #
-    sigstr = struct.pack("<B", i)
-    sigstr += signature
+    def sign_many(self, digests):
+        """ Returns the signatures of a list of digests"""
+        return [self.sign_digest(digest) for digest in digests]
 
-    return sigstr
 
+_signer_cache = OrderedDict()
+_signer_cache_lock = threading.Lock()
+SIGNER_CACHE_SIZE = 32
+
+
+def get_signer(wif):
+    """ Returns a cached :class:`Signer` for a wif key. At most
+        SIGNER_CACHE_SIZE signers are kept, the least recently used
+        signer is removed first. The cache holds private keys,
+        :class:`beem.wallet.Wallet` clears it with :func:`clear_signer_cache`
+        when it is locked or keys are removed.
+    """
+    if isinstance(wif, Signer):
+        return wif
+    key = str(wif)
+    with _signer_cache_lock:
+        signer = _signer_cache.pop(key, None)
+    if signer is None:
+        signer = Signer(wif)
+    with _signer_cache_lock:
+        _signer_cache[key] = signer
+        while len(_signer_cache) > SIGNER_CACHE_SIZE:
+            _signer_cache.popitem(last=False)
+    return signer
+
+
+def clear_signer_cache():
+    """ Removes all cached signers and their private keys"""
+    with _signer_cache_lock:
+        _signer_cache.clear()
+
+
+def sign_message(message, wif, hashfn=hashlib.sha256):
+    """ Sign a digest with a wif key
+
+        :param str wif: Private key in
+    """
 
-def verify_message(message, signature, hashfn=hashlib.sha256, recover_parameter=None):
     if not isinstance(message, bytes_types):
         message = py23_bytes(message, "utf-8")
-    if not isinstance(signature, bytes_types):
-        signature = py23_bytes(signature, "utf-8")
-    if not isinstance(message, bytes_types):
-        raise AssertionError()
-    if not isinstance(signature, bytes_types):
-        raise AssertionError()
-    digest = hashfn(message).digest()
-    sig = signature[1:]
-    if recover_parameter is None:
-        recover_parameter = bytearray(signature)[0] - 4 - 27  # recover parameter only
-    if recover_parameter < 0:
-        log.info("Could not recover parameter")
-        return None
+    return get_signer(wif).sign_digest(hashfn(message).digest())
+
 
+_verify_cache = OrderedDict()
+_verify_cache_lock = threading.Lock()
+VERIFY_CACHE_SIZE = 10000
+#: Minimum number of signatures per worker process of verify_signatures(),
+#: smaller batches are verified in this process, as starting the processes
+#: takes longer than the verification
+VERIFY_MIN_BATCH_PER_PROCESS = 8
+
+
+def _verify_digest(digest, signature, recover_parameter):
+    sig = signature[1:]
     if SECP256K1_MODULE == "secp256k1":
         ALL_FLAGS = secp256k1.lib.SECP256K1_CONTEXT_VERIFY | secp256k1.lib.SECP256K1_CONTEXT_SIGN
         # Placeholder
@@ -282,18 +369,19 @@ def verify_message(message, signature, hashfn=hashlib.sha256, recover_parameter=
         # Recover raw signature
         sig = pub.ecdsa_recoverable_deserialize(sig, recover_parameter)
         # Recover PublicKey
-        verifyPub = secp256k1.PublicKey(pub.ecdsa_recover(message, sig))
+        verifyPub = secp256k1.PublicKey(pub.ecdsa_recover(digest, sig, raw=True))
         # Convert recoverable sig to normal sig
         normalSig = verifyPub.ecdsa_recoverable_convert(sig)
         # Verify
-        verifyPub.ecdsa_verify(message, normalSig)
+        verifyPub.ecdsa_verify(digest, normalSig, raw=True)
         phex = verifyPub.serialize(compressed=True)
     elif SECP256K1_MODULE == "cryptography":
-        p = recover_public_key(digest, sig, recover_parameter, message)
+        Q = _recover_public_point(digest, sig, recover_parameter)
+        p = ec.EllipticCurvePublicNumbers(Q.x(), Q.y(), ec.SECP256K1()).public_key(default_backend())
         order = ecdsa.SECP256k1.order
         r, s = ecdsa.util.sigdecode_string(sig, order)
         sigder = encode_dss_signature(r, s)
-        p.verify(sigder, message, ec.ECDSA(hashes.SHA256()))
+        p.verify(sigder, digest, ec.ECDSA(Prehashed(hashes.SHA256())))
         phex = compressedPubkey(p)
     else:
         p = recover_public_key(digest, sig, recover_parameter)
@@ -304,5 +392,159 @@ def verify_message(message, signature, hashfn=hashlib.sha256, recover_parameter=
             sigdecode=ecdsa.util.sigdecode_string
         )
         phex = compressedPubkey(p)
+    return phex
 
+
+def verify_digest(digest, signature, recover_parameter=None):
+    """ Returns the compressed public key which signed the digest. The
+        recovery parameter is taken from the first byte of the signature,
+        when not given. Results are memoized by digest and signature.
+
+        :param bytes digest: 32 byte digest of the signed message
+        :param bytes signature: compact signature (65 bytes)
+        :param int recover_parameter: recovery id (0 to 3) *(optional)*
+    """
+    if recover_parameter is None:
+        recover_parameter = bytearray(signature)[0] - 4 - 27  # recover parameter only
+    if recover_parameter < 0:
+        log.info("Could not recover parameter")
+        return None
+    key = (digest, signature, recover_parameter)
+    with _verify_cache_lock:
+        phex = _verify_cache.get(key)
+    if phex is not None:
+        return phex
+    phex = _verify_digest(digest, signature, recover_parameter)
+    with _verify_cache_lock:
+        _verify_cache[key] = phex
+        while len(_verify_cache) > VERIFY_CACHE_SIZE:
+            _verify_cache.popitem(last=False)
     return phex
+
+
+def clear_verify_cache():
+    """ Removes all memoized verification results"""
+    with _verify_cache_lock:
+        _verify_cache.clear()
+
+
+def _verify_digest_or_none(args):
+    """ Process pool worker for verify_signatures()"""
+    global SECP256K1_MODULE
+    digest, signature, module = args
+    SECP256K1_MODULE = module
+    try:
+        return _verify_digest(digest, signature, bytearray(signature)[0] - 4 - 27)
+    except Exception:
+        return None
+
+
+def verify_signatures(digests_signatures, processes=None):
+    """ Verifies a batch of signatures and returns the compressed public key
+        of every (digest, signature) pair, or None when a signature is invalid.
+        Signatures which are not memoized are verified in a process pool.
+
+        :param list digests_signatures: list of (digest, signature) tuples
+        :param int processes: maximum number of worker processes, when None the
+            number of cpus is used. Every process gets at least
+            ``VERIFY_MIN_BATCH_PER_PROCESS`` signatures. When only one process
+            is left, the signatures are verified in this process.
+
+        .. code-block:: python
+
+            pubkeys = verify_signatures([(digest, signature), ...])
+
+    """
+    results = [None] * len(digests_signatures)
+    todo = []
+    for index, (digest, signature) in enumerate(digests_signatures):
+        recover_parameter = bytearray(signature)[0] - 4 - 27
+        if recover_parameter < 0:
+            continue
+        with _verify_cache_lock:
+            phex = _verify_cache.get((digest, signature, recover_parameter))
+        if phex is not None:
+            results[index] = phex
+        else:
+            todo.append(index)
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    processes = min(processes, len(todo) // VERIFY_MIN_BATCH_PER_PROCESS)
+    if processes > 1 and FUTURES_MODULE is not None:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            args = [(digests_signatures[index][0], digests_signatures[index][1], SECP256K1_MODULE) for index in todo]
+            chunksize = max(1, len(todo) // (4 * processes))
+            for index, phex in zip(todo, pool.map(_verify_digest_or_none, args, chunksize=chunksize)):
+                results[index] = phex
+    else:
+        for index in todo:
+            results[index] = _verify_digest_or_none(digests_signatures[index] + (SECP256K1_MODULE, ))
+    with _verify_cache_lock:
+        for index in todo:
+            if results[index] is not None:
+                digest, signature = digests_signatures[index]
+                _verify_cache[(digest, signature, bytearray(signature)[0] - 4 - 27)] = results[index]
+        while len(_verify_cache) > VERIFY_CACHE_SIZE:
+            _verify_cache.popitem(last=False)
+    return results
+
+
+def _sign_digests_worker(args):
+    """ Process pool worker for sign_digests()"""
+    global SECP256K1_MODULE
+    wif, digests, module = args
+    SECP256K1_MODULE = module
+    return get_signer(wif).sign_many(digests)
+
+
+def sign_digests(digests_wifs, processes=None):
+    """ Signs a batch of digests and returns the signature of every
+        (digest, wif) pair. The digests are grouped by key and signed in a
+        process pool, every worker parses a key only once.
+
+        :param list digests_wifs: list of (digest, wif) tuples, wif can also
+            be a :class:`PrivateKey` or :class:`Signer`
+        :param int processes: number of worker processes, when None the number
+            of cpus is used. With 1, the digests are signed in this process.
+
+        .. code-block:: python
+
+            signatures = sign_digests([(digest, wif), ...])
+
+    """
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    indices = OrderedDict()
+    for index, (digest, wif) in enumerate(digests_wifs):
+        if isinstance(wif, Signer):
+            wif = wif.priv_key
+        indices.setdefault(str(wif), []).append(index)
+    chunksize = max(1, len(digests_wifs) // (4 * processes))
+    chunks = []
+    for wif, wif_indices in indices.items():
+        for i in range(0, len(wif_indices), chunksize):
+            chunks.append((wif, wif_indices[i:i + chunksize]))
+    args = [(wif, [digests_wifs[index][0] for index in chunk], SECP256K1_MODULE) for wif, chunk in chunks]
+    if len(chunks) > 1 and processes > 1 and FUTURES_MODULE is not None:
+        with ProcessPoolExecutor(max_workers=min(processes, len(chunks))) as pool:
+            signatures = list(pool.map(_sign_digests_worker, args))
+    else:
+        signatures = [get_signer(a[0]).sign_many(a[1]) for a in args]
+    results = [None] * len(digests_wifs)
+    for (wif, chunk), chunk_signatures in zip(chunks, signatures):
+        for index, signature in zip(chunk, chunk_signatures):
+            results[index] = signature
+    return results
+
+
+def verify_message(message, signature, hashfn=hashlib.sha256, recover_parameter=None):
+    if not isinstance(message, bytes_types):
+        message = py23_bytes(message, "utf-8")
+    if not isinstance(signature, bytes_types):
+        signature = py23_bytes(signature, "utf-8")
+    if not isinstance(message, bytes_types):
+        raise AssertionError()
+    if not isinstance(signature, bytes_types):
+        raise AssertionError()
+    digest = hashfn(message).digest()
+    return verify_digest(digest, signature, recover_parameter=recover_parameter)
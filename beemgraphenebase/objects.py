@@ -7,20 +7,43 @@ from builtins import object
 from future.utils import python_2_unicode_compatible
 from collections import OrderedDict
 import json
+import struct
+import sys
+import time
+from calendar import timegm
+from datetime import datetime
 from beemgraphenebase.types import (
     Uint8, Int16, Uint16, Uint32, Uint64,
     Varint32, Int64, String, Bytes, Void,
     Array, PointInTime, Signature, Bool,
     Set, Fixed_array, Optional, Static_variant,
-    Map, Id, JsonObj
+    Map, JsonObj, varint_into, write_value, timeformat
 )
 from .py23 import py23_bytes, bytes_types, integer_types, string_types
 from .objecttypes import object_type
 from .operationids import operations
 
 
+# Reverse dicts of operation ids by the operations dict they were built from
+_operation_names = {}
+
+
+def get_operation_names(ops):
+    """ Returns a dict of operation name by id for an operations dict"""
+    names = _operation_names.get(id(ops))
+    if names is None or names[0] is not ops or len(names[1]) != len(ops):
+        if len(_operation_names) > 16:
+            _operation_names.clear()
+        # ops is kept, so that its id is not reused
+        names = (ops, dict((int(v), k) for k, v in ops.items()))
+        _operation_names[id(ops)] = names
+    return names[1]
+
+
 @python_2_unicode_compatible
 class Operation(object):
+    _klass_cache = {}
+
     def __init__(self, op):
         if isinstance(op, list) and len(op) == 2:
             if isinstance(op[0], integer_types):
@@ -64,18 +87,26 @@ class Operation(object):
     def getOperationNameForId(self, i):
         """ Convert an operation id into the corresponding string
         """
-        for key in self.operations():
-            if int(self.operations()[key]) is int(i):
-                return key
-        return "Unknown Operation ID %d" % i
+        name = get_operation_names(self.operations()).get(int(i))
+        if name is None:
+            return "Unknown Operation ID %d" % i
+        return name
 
     def _getklass(self, name):
-        module = __import__("graphenebase.operations", fromlist=["operations"])
-        class_ = getattr(module, name)
+        class_ = self._klass_cache.get(name)
+        if class_ is None:
+            module = __import__("graphenebase.operations", fromlist=["operations"])
+            class_ = getattr(module, name)
+            self._klass_cache[name] = class_
         return class_
 
     def __bytes__(self):
-        return py23_bytes(Id(self.opId)) + py23_bytes(self.op)
+        buf = bytearray()
+        serialize_into(self, buf)
+        return py23_bytes(buf)
+
+    def write_into(self, buf):
+        serialize_into(self, buf)
 
     def __str__(self):
         return json.dumps([self.opId, self.op.toJson()])
@@ -98,13 +129,12 @@ class GrapheneObject(object):
     def __bytes__(self):
         if self.data is None:
             return py23_bytes()
-        b = b""
-        for name, value in list(self.data.items()):
-            if isinstance(value, string_types):
-                b += py23_bytes(value, 'utf-8')
-            else:
-                b += py23_bytes(value)
-        return b
+        buf = bytearray()
+        serialize_into(self, buf)
+        return py23_bytes(buf)
+
+    def write_into(self, buf):
+        serialize_into(self, buf)
 
     def __json__(self):
         if self.data is None:
@@ -135,3 +165,130 @@ class GrapheneObject(object):
 
 def isArgsThisClass(self, args):
     return (len(args) == 1 and type(args[0]).__name__ == type(self).__name__)
+
+
+# Struct formats of the fixed size types. Subclasses which do not change
+# __bytes__ (e.g. Bool and Enum8) are packed with the format of their base.
+_fixed_formats = [(Uint8, "B"), (Int16, "h"), (Uint16, "H"), (Uint32, "I"), (Uint64, "Q"), (Int64, "q")]
+_serialize_plans = {}
+_unixtimes = {}
+
+
+def _fixed_format(klass):
+    """ Returns the struct format of a fixed size type or None"""
+    if klass is PointInTime:
+        return "I"
+    for base, fmt in _fixed_formats:
+        if issubclass(klass, base) and getattr(klass, "__bytes__") == getattr(base, "__bytes__"):
+            return fmt
+    return None
+
+
+def _unixtime(d):
+    if isinstance(d, datetime):
+        return timegm(d.timetuple()) & 0xffffffff
+    unixtime = _unixtimes.get(d)
+    if unixtime is None:
+        if sys.version > '3':
+            unixtime = timegm(time.strptime((d + "UTC"), timeformat))
+        else:
+            unixtime = timegm(time.strptime((d + "UTC"), timeformat.encode("utf-8")))
+        # negative times are packed as int32, which gives the same bytes
+        unixtime &= 0xffffffff
+        if len(_unixtimes) > 1000:
+            _unixtimes.clear()
+        _unixtimes[d] = unixtime
+    return unixtime
+
+
+# Kinds of values, which serialize_into() handles without calling __bytes__
+_OBJECT, _OPERATION, _ARRAY, _STATIC_VARIANT, _STRING, _TEXT, _OTHER = range(7)
+_kinds = {}
+
+
+def _get_kind(klass):
+    kind = _kinds.get(klass)
+    if kind is not None:
+        return kind
+    if issubclass(klass, GrapheneObject) and klass.__bytes__ == GrapheneObject.__bytes__:
+        kind = _OBJECT
+    elif issubclass(klass, Operation) and klass.__bytes__ == Operation.__bytes__:
+        kind = _OPERATION
+    elif issubclass(klass, Array) and klass.__bytes__ == Array.__bytes__:
+        kind = _ARRAY
+    elif issubclass(klass, Static_variant) and klass.__bytes__ == Static_variant.__bytes__:
+        kind = _STATIC_VARIANT
+    elif klass is String:
+        kind = _STRING
+    elif issubclass(klass, string_types):
+        kind = _TEXT
+    else:
+        kind = _OTHER
+    _kinds[klass] = kind
+    return kind
+
+
+def _compile_plan(types):
+    """ Builds the serialization plan for the field types of a GrapheneObject.
+        Runs of fixed size fields are packed with one struct, all other fields
+        are serialized one by one.
+    """
+    plan = []
+    fmt = ""
+    fields = []
+    for index, klass in enumerate(types):
+        field_fmt = _fixed_format(klass)
+        if field_fmt is not None:
+            fmt += field_fmt
+            fields.append((index, klass is PointInTime))
+            continue
+        if fields:
+            plan.append((struct.Struct("<" + fmt), tuple(fields)))
+            fmt = ""
+            fields = []
+        plan.append((None, index))
+    if fields:
+        plan.append((struct.Struct("<" + fmt), tuple(fields)))
+    return plan
+
+
+def serialize_into(value, buf):
+    """ Appends the wire format of value to the bytearray buf.
+
+        The field types of every GrapheneObject class are compiled once into a
+        plan, and nested objects, operations and arrays are written into the same
+        buffer instead of being joined from intermediate bytes. All other types
+        are written through their write_into(buf) method, see
+        :func:`beemgraphenebase.types.write_value`.
+    """
+    kind = _get_kind(type(value))
+    if kind == _OBJECT:
+        if value.data is None:
+            return
+        values = list(value.data.values())
+        key = tuple(type(v) for v in values)
+        plan = _serialize_plans.get(key)
+        if plan is None:
+            plan = _compile_plan(key)
+            _serialize_plans[key] = plan
+        for packer, fields in plan:
+            if packer is None:
+                serialize_into(values[fields], buf)
+            else:
+                buf += packer.pack(*[_unixtime(values[i].data) if is_time else values[i].data for i, is_time in fields])
+    elif kind == _STRING:
+        value.write_into(buf)
+    elif kind == _OPERATION:
+        varint_into(value.opId, buf)
+        serialize_into(value.op, buf)
+    elif kind == _ARRAY:
+        value.length.write_into(buf)
+        for a in value.data:
+            serialize_into(a, buf)
+    elif kind == _STATIC_VARIANT:
+        varint_into(value.type_id, buf)
+        serialize_into(value.data, buf)
+    elif kind == _TEXT:
+        buf += py23_bytes(value, 'utf-8')
+    else:
+        write_value(value, buf)
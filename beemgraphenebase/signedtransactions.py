@@ -21,7 +21,7 @@ from .types import (
 from .objects import GrapheneObject, isArgsThisClass
 from .operations import Operation
 from .chains import known_chains
-from .ecdsasig import sign_message, verify_message
+from .ecdsasig import get_signer, verify_digest, verify_signatures
 import logging
 log = logging.getLogger(__name__)
 
@@ -49,8 +49,14 @@ class Signed_Transaction(GrapheneObject):
         :param num refPrefix: parameter ref_block_prefix (see :func:`beembase.transactions.getBlockParams`)
         :param str expiration: expiration date
         :param array operations:  array of operations
+
+        The serialized transaction without signatures, its digests and its id
+        are computed once. They are computed again when a field of ``data``
+        is replaced, and :func:`clear_cache` has to be called after changing
+        a field in place.
     """
     def __init__(self, *args, **kwargs):
+        self.clear_cache()
         if isArgsThisClass(self, args):
             self.data = args[0].data
         else:
@@ -82,23 +88,50 @@ class Signed_Transaction(GrapheneObject):
                 ('signatures', kwargs['signatures']),
             ]))
 
-    @property
-    def id(self):
-        """ The transaction id of this transaction
+    def clear_cache(self):
+        """ Removes the cached serialized transaction, digests and id
         """
-        # Store signatures temporarily since they are not part of
-        # transaction id
-        sigs = self.data["signatures"]
-        self.data.pop("signatures", None)
+        self._body = None
+        self._body_fields = None
+        self._digests = {}
+        self._id = None
 
-        # Generage Hash of the seriliazed version
-        h = hashlib.sha256(py23_bytes(self)).digest()
+    def copy(self):
+        """ Returns a copy with its own fields dict, which shares the
+            field values and the cached serialization
+        """
+        tx = type(self)(self)
+        tx.data = OrderedDict(self.data)
+        tx._body = self._body
+        tx._body_fields = self._body_fields
+        tx._digests = dict(self._digests)
+        tx._id = self._id
+        return tx
 
-        # recover signatures
-        self.data["signatures"] = sigs
+    def get_body(self):
+        """ Returns the serialized transaction without signatures, from
+            which the id and the digest are computed
+        """
+        fields = [v for k, v in self.data.items() if k != "signatures"]
+        cached = self._body_fields
+        if self._body is None or len(fields) != len(cached) or any(a is not b for a, b in zip(fields, cached)):
+            self._body = py23_bytes(GrapheneObject(OrderedDict(
+                [(k, v) for k, v in self.data.items() if k != "signatures"])))
+            self._body_fields = fields
+            self._digests = {}
+            self._id = None
+        return self._body
 
-        # Return properly truncated tx hash
-        return hexlify(h[:20]).decode("ascii")
+    @property
+    def id(self):
+        """ The transaction id of this transaction
+        """
+        body = self.get_body()
+        if self._id is None:
+            # Return properly truncated tx hash, signatures are not part
+            # of the transaction id
+            self._id = hexlify(hashlib.sha256(body).digest()[:20]).decode("ascii")
+        return self._id
 
     def getOperationKlass(self):
         return Operation
@@ -136,18 +169,14 @@ class Signed_Transaction(GrapheneObject):
         # Chain ID
         self.chainid = chain_params["chain_id"]
 
-        # Do not serialize signatures
-        sigs = self.data["signatures"]
-        self.data["signatures"] = []
-
-        # Get message to sign
-        #   bytes(self) will give the wire formated data according to
-        #   GrapheneObject and the data given in __init__()
-        self.message = unhexlify(self.chainid) + py23_bytes(self)
-        self.digest = hashlib.sha256(self.message).digest()
-
-        # restore signatures
-        self.data["signatures"] = sigs
+        # Get message to sign, signatures are not serialized
+        body = self.get_body()
+        self.message = unhexlify(self.chainid) + body
+        digest = self._digests.get(self.chainid)
+        if digest is None:
+            digest = hashlib.sha256(self.message).digest()
+            self._digests[self.chainid] = digest
+        self.digest = digest
 
     def verify(self, pubkeys=[], chain=None, recover_parameter=False):
         """Returned pubkeys have to be checked if they are existing"""
@@ -159,21 +188,20 @@ class Signed_Transaction(GrapheneObject):
         pubKeysFound = []
 
         for signature in signatures:
+            signature = py23_bytes(signature)
             if recover_parameter:
-                p = verify_message(
-                    self.message,
-                    py23_bytes(signature)
-                )
+                p = verify_digest(self.digest, signature)
             else:
-                p = None
+                # The recovery byte of the signature is tried first, all
+                # recovery ids only when it does not give a valid key
+                try:
+                    p = verify_digest(self.digest, signature)
+                except Exception:
+                    p = None
             if p is None:
                 for i in range(4):
                     try:
-                        p = verify_message(
-                            self.message,
-                            py23_bytes(signature),
-                            recover_parameter=i
-                        )
+                        p = verify_digest(self.digest, signature, recover_parameter=i)
                         phex = hexlify(p).decode('ascii')
                         pubKeysFound.append(phex)
                     except Exception:
@@ -196,7 +224,7 @@ class Signed_Transaction(GrapheneObject):
     def sign(self, wifkeys, chain=None):
         """ Sign the transaction with the provided private keys.
 
-            :param array wifkeys: Array of wif keys
+            :param array wifkeys: Array of wif keys or :class:`beemgraphenebase.ecdsasig.Signer`
             :param str chain: identifier for the chain
 
         """
@@ -211,8 +239,38 @@ class Signed_Transaction(GrapheneObject):
         # Sign the message with every private key given!
         sigs = []
         for wif in self.privkeys:
-            signature = sign_message(self.message, wif)
+            signature = get_signer(wif).sign_digest(self.digest)
             sigs.append(Signature(signature))
 
         self.data["signatures"] = Array(sigs)
         return self
+
+
+def verify_transactions(transactions, chain, processes=None):
+    """ Returns the public keys which signed every transaction. The signatures
+        of all transactions are verified together, in a process pool when
+        there are enough signatures to verify (see
+        :func:`beemgraphenebase.ecdsasig.verify_signatures`).
+
+        :param list transactions: list of :class:`Signed_Transaction`
+        :param chain: identifier for the chain
+        :param int processes: maximum number of worker processes (default is the number of cpus)
+
+        Invalid signatures are skipped, so the returned keys have to be
+        compared with the required keys.
+    """
+    digests_signatures = []
+    for tx in transactions:
+        tx.deriveDigest(chain)
+        for signature in tx.data["signatures"].data:
+            digests_signatures.append((tx.digest, py23_bytes(signature)))
+    pubkeys = iter(verify_signatures(digests_signatures, processes=processes))
+    ret = []
+    for tx in transactions:
+        keys = []
+        for signature in tx.data["signatures"].data:
+            p = next(pubkeys)
+            if p is not None:
+                keys.append(hexlify(p).decode('ascii'))
+        ret.append(keys)
+    return ret
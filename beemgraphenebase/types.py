@@ -9,7 +9,9 @@ from builtins import bytes
 from builtins import str
 from builtins import object
 from builtins import int
+import codecs
 import json
+import re
 import struct
 import sys
 import time
@@ -23,6 +25,16 @@ from future.utils import python_2_unicode_compatible
 from .py23 import py23_bytes
 
 timeformat = '%Y-%m-%dT%H:%M:%S%Z'
+# Characters which String.unicodify() replaces
+_escaped_chars = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_uint8 = struct.Struct("<B")
+_int16 = struct.Struct("<h")
+_uint16 = struct.Struct("<H")
+_uint32 = struct.Struct("<I")
+_int32 = struct.Struct("<i")
+_uint64 = struct.Struct("<Q")
+_int64 = struct.Struct("<q")
+_writers = {}
 
 
 def varint(n):
@@ -35,6 +47,14 @@ def varint(n):
     return data
 
 
+def varint_into(n, buf):
+    """Appends the varint encoding of n to the bytearray buf."""
+    while n >= 0x80:
+        buf.append((n & 0x7f) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+
 def varintdecode(data):
     """Varint decoding."""
     shift = 0
@@ -47,6 +67,37 @@ def varintdecode(data):
     return result
 
 
+def unpack_varint_from(data, offset=0):
+    """Decodes a varint from data at offset.
+
+    Returns the value and the offset of the following byte. data can be
+    bytes, bytearray or a memoryview, which is not copied.
+    """
+    shift = 0
+    result = 0
+    unpack_from = _uint8.unpack_from
+    while True:
+        # unpack_from, as indexing a memoryview returns a str on python 2
+        b = unpack_from(data, offset)[0]
+        offset += 1
+        result |= ((b & 0x7f) << shift)
+        if not (b & 0x80):
+            return result, offset
+        shift += 7
+
+
+def unpack_string_from(data, offset=0):
+    """Decodes a varint prefixed utf-8 string from data at offset.
+
+    Returns the string and the offset of the following byte.
+    """
+    length, offset = unpack_varint_from(data, offset)
+    end = offset + length
+    if end > len(data):
+        raise ValueError("String exceeds the buffer")
+    return codecs.decode(data[offset:end], "utf-8"), end
+
+
 def variable_buffer(s):
     """Encodes variable length buffer."""
     return varint(len(s)) + s
@@ -57,6 +108,45 @@ def JsonObj(data):
     return json.loads(str(data))
 
 
+def _get_writer(klass):
+    """Returns the write_into method of klass or None, when klass has no
+    write_into or overrides __bytes__ below its write_into.
+    """
+    try:
+        return _writers[klass]
+    except KeyError:
+        pass
+    writer = None
+    if hasattr(klass, "write_into"):
+        mro = klass.__mro__
+        write_owner = [i for i, c in enumerate(mro) if "write_into" in c.__dict__][0]
+        bytes_owner = [i for i, c in enumerate(mro) if "__bytes__" in c.__dict__]
+        if not bytes_owner or write_owner <= bytes_owner[0]:
+            writer = klass.write_into
+    _writers[klass] = writer
+    return writer
+
+
+def write_value(value, buf):
+    """Appends the wire format of value to the bytearray buf.
+
+    Values which implement write_into(buf) write directly into buf, all
+    other values are appended from their __bytes__.
+    """
+    writer = _get_writer(type(value))
+    if writer is None:
+        buf += py23_bytes(value)
+    else:
+        writer(value, buf)
+
+
+def _to_bytes(value):
+    """Returns bytes of a value which implements write_into(buf)."""
+    buf = bytearray()
+    value.write_into(buf)
+    return py23_bytes(buf)
+
+
 @python_2_unicode_compatible
 class Uint8(object):
     """Uint8."""
@@ -69,6 +159,10 @@ class Uint8(object):
         """Returns bytes."""
         return struct.pack("<B", self.data)
 
+    def write_into(self, buf):
+        """Appends bytes to buf."""
+        buf += _uint8.pack(self.data)
+
     def __str__(self):
         """Returns str"""
         return '%d' % self.data
@@ -86,6 +180,10 @@ class Int16(object):
         """Returns bytes."""
         return struct.pack("<h", int(self.data))
 
+    def write_into(self, buf):
+        """Appends bytes to buf."""
+        buf += _int16.pack(int(self.data))
+
     def __str__(self):
         return '%d' % self.data
 
@@ -99,6 +197,10 @@ class Uint16(object):
         """Returns bytes."""
         return struct.pack("<H", self.data)
 
+    def write_into(self, buf):
+        """Appends bytes to buf."""
+        buf += _uint16.pack(self.data)
+
     def __str__(self):
         return '%d' % self.data
 
@@ -112,6 +214,10 @@ class Uint32(object):
         """Returns bytes."""
         return struct.pack("<I", self.data)
 
+    def write_into(self, buf):
+        """Appends bytes to buf."""
+        buf += _uint32.pack(self.data)
+
     def __str__(self):
         """Returns data as string."""
         return '%d' % self.data
@@ -126,6 +232,10 @@ class Uint64(object):
         """Returns bytes."""
         return struct.pack("<Q", self.data)
 
+    def write_into(self, buf):
+        """Appends bytes to buf."""
+        buf += _uint64.pack(self.data)
+
     def __str__(self):
         """Returns data as string."""
         return '%d' % self.data
@@ -140,6 +250,10 @@ class Varint32(object):
         """Returns bytes."""
         return varint(self.data)
 
+    def write_into(self, buf):
+        """Appends bytes to buf."""
+        varint_into(self.data, buf)
+
     def __str__(self):
         """Returns data as string."""
         return '%d' % self.data
@@ -154,6 +268,10 @@ class Int64(object):
         """Returns bytes."""
         return struct.pack("<q", self.data)
 
+    def write_into(self, buf):
+        """Appends bytes to buf."""
+        buf += _int64.pack(self.data)
+
     def __str__(self):
         """Returns data as string."""
         return '%d' % self.data
@@ -169,6 +287,12 @@ class HexString(object):
         d = bytes(unhexlify(bytes(self.data, 'ascii')))
         return varint(len(d)) + d
 
+    def write_into(self, buf):
+        """Appends bytes representation to buf."""
+        d = unhexlify(bytes(self.data, 'ascii'))
+        varint_into(len(d), buf)
+        buf += d
+
     def __str__(self):
         """Returns data as string."""
         return '%s' % str(self.data)
@@ -181,14 +305,28 @@ class String(object):
 
     def __bytes__(self):
         """Returns bytes representation."""
-        d = self.unicodify()
-        return varint(len(d)) + d
+        return _to_bytes(self)
+
+    def write_into(self, buf):
+        """Appends bytes representation to buf.
+
+        Strings without control characters, e.g. all printable ascii
+        strings, are encoded at once instead of character by character.
+        """
+        if _escaped_chars.search(self.data) is None:
+            d = self.data.encode("utf-8")
+        else:
+            d = self.unicodify()
+        varint_into(len(d), buf)
+        buf += d
 
     def __str__(self):
         """Returns data as string."""
         return '%s' % str(self.data)
 
     def unicodify(self):
+        if _escaped_chars.search(self.data) is None:
+            return bytes(self.data, "utf-8")
         r = []
         for s in self.data:
             o = ord(s)
@@ -219,6 +357,12 @@ class Bytes(object):
         d = unhexlify(bytes(self.data, 'utf-8'))
         return varint(len(d)) + d
 
+    def write_into(self, buf):
+        """Appends data to buf."""
+        d = unhexlify(bytes(self.data, 'utf-8'))
+        varint_into(len(d), buf)
+        buf += d
+
     def __str__(self):
         """Returns data as string."""
         return str(self.data)
@@ -233,6 +377,10 @@ class Void(object):
         """Returns bytes representation."""
         return b''
 
+    def write_into(self, buf):
+        """Appends nothing to buf."""
+        pass
+
     def __str__(self):
         """Returns data as string."""
         return ""
@@ -246,7 +394,13 @@ class Array(object):
 
     def __bytes__(self):
         """Returns bytes representation."""
-        return py23_bytes(self.length) + b"".join([py23_bytes(a) for a in self.data])
+        return _to_bytes(self)
+
+    def write_into(self, buf):
+        """Appends bytes representation to buf."""
+        self.length.write_into(buf)
+        for a in self.data:
+            write_value(a, buf)
 
     def __str__(self):
         """Returns data as string."""
@@ -276,8 +430,12 @@ class PointInTime(object):
         else:
             unixtime = timegm(time.strptime((self.data + "UTC"), timeformat.encode("utf-8")))
         if unixtime < 0:
-            return struct.pack("<i", unixtime)
-        return struct.pack("<I", unixtime)
+            return _int32.pack(unixtime)
+        return _uint32.pack(unixtime)
+
+    def write_into(self, buf):
+        """Appends bytes representation to buf."""
+        buf += self.__bytes__()
 
     def __str__(self):
         """Returns data as string."""
@@ -293,6 +451,10 @@ class Signature(object):
         """Returns bytes representation."""
         return self.data
 
+    def write_into(self, buf):
+        """Appends bytes representation to buf."""
+        buf += self.data
+
     def __str__(self):
         """Returns data as string."""
         return json.dumps(hexlify(self.data).decode('ascii'))
@@ -339,6 +501,17 @@ class Optional(object):
         else:
             return py23_bytes(Bool(1)) + py23_bytes(self.data) if py23_bytes(self.data) else py23_bytes(Bool(0))
 
+    def write_into(self, buf):
+        """Appends data to buf, empty data is written as false."""
+        if not self.data:
+            buf.append(0)
+            return
+        start = len(buf)
+        buf.append(1)
+        write_value(self.data, buf)
+        if len(buf) == start + 1:
+            buf[start] = 0
+
     def __str__(self):
         """Returns data as string."""
         return str(self.data)
@@ -357,7 +530,12 @@ class Static_variant(object):
 
     def __bytes__(self):
         """Returns bytes representation."""
-        return varint(self.type_id) + py23_bytes(self.data)
+        return _to_bytes(self)
+
+    def write_into(self, buf):
+        """Appends bytes representation to buf."""
+        varint_into(self.type_id, buf)
+        write_value(self.data, buf)
 
     def __str__(self):
         """Returns data as string."""
@@ -371,11 +549,14 @@ class Map(object):
 
     def __bytes__(self):
         """Returns bytes representation."""
-        b = b""
-        b += varint(len(self.data))
+        return _to_bytes(self)
+
+    def write_into(self, buf):
+        """Appends bytes representation to buf."""
+        varint_into(len(self.data), buf)
         for e in self.data:
-            b += py23_bytes(e[0]) + py23_bytes(e[1])
-        return b
+            write_value(e[0], buf)
+            write_value(e[1], buf)
 
     def __str__(self):
         """Returns data as string."""
@@ -394,6 +575,10 @@ class Id(object):
         """Returns bytes representation."""
         return py23_bytes(self.data)
 
+    def write_into(self, buf):
+        """Appends bytes representation to buf."""
+        self.data.write_into(buf)
+
     def __str__(self):
         """Returns data as string."""
         return str(self.data)
@@ -0,0 +1,201 @@
+# This Python file uses the following encoding: utf-8
+"""RPC and streaming throughput benchmarks against a local mock node.
+
+Besides the asv benchmarks, the module can be run directly to print a
+report with blocks/s, ops/s, p50/p99 latencies and the peak RSS::
+
+    python -m benchmarks.bench_rpc
+
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import time
+from beem import Steem
+from beem.account import Account, Accounts
+from beem.blockchain import Blockchain
+from beem.blockchainobject import BlockchainObject
+from .mocknode import MockNode
+try:
+    import resource
+except ImportError:
+    resource = None
+
+START_BLOCK = 1000
+N_BLOCKS = 200
+N_ACCOUNTS = 200
+HISTORY_LENGTH = 2000
+BLOCK_MODES = ["serial", "threaded", "batched", "threaded_batched"]
+
+
+class Benchmark(object):
+    goal_time = 1
+
+
+def measure(iterable):
+    """ Consumes iterable and returns the number of items, the elapsed time
+        and the time spent waiting for every item
+    """
+    latencies = []
+    start = time.time()
+    last = start
+    for item in iterable:
+        now = time.time()
+        latencies.append(now - last)
+        last = now
+    return len(latencies), last - start, latencies
+
+
+def percentile(latencies, p):
+    if not latencies:
+        return 0.
+    latencies = sorted(latencies)
+    return latencies[min(len(latencies) - 1, int(round(p / 100. * (len(latencies) - 1))))]
+
+
+def peak_rss():
+    """ Returns the peak resident set size of the process in MB"""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.
+
+
+class MockNodeBenchmark(Benchmark):
+    timeout = 120
+
+    def setup(self, *args):
+        self.node = MockNode(head_block=START_BLOCK + 10 * N_BLOCKS, history_length=HISTORY_LENGTH).start()
+        self.stm = Steem(node=self.node.url, num_retries=2, timeout=30)
+        BlockchainObject.clear_cache()
+
+    def teardown(self, *args):
+        self.node.stop()
+
+
+class Blocks(MockNodeBenchmark):
+    params = BLOCK_MODES
+    param_names = ["mode"]
+
+    def blocks(self, mode):
+        b = Blockchain(steem_instance=self.stm)
+        kwargs = {"start": START_BLOCK, "stop": START_BLOCK + N_BLOCKS - 1}
+        if mode in ["threaded", "threaded_batched"]:
+            kwargs.update({"threading": True, "thread_num": 4})
+        if mode in ["batched", "threaded_batched"]:
+            kwargs["max_batch_size"] = 50
+        return b.blocks(**kwargs)
+
+    def time_blocks(self, mode):
+        measure(self.blocks(mode))
+
+    def peakmem_blocks(self, mode):
+        measure(self.blocks(mode))
+
+    def track_blocks_per_second(self, mode):
+        n, elapsed, latencies = measure(self.blocks(mode))
+        return n / elapsed
+    track_blocks_per_second.unit = "blocks/s"
+
+    def track_p50_latency(self, mode):
+        return percentile(measure(self.blocks(mode))[2], 50) * 1000
+    track_p50_latency.unit = "ms"
+
+    def track_p99_latency(self, mode):
+        return percentile(measure(self.blocks(mode))[2], 99) * 1000
+    track_p99_latency.unit = "ms"
+
+
+class Stream(MockNodeBenchmark):
+    params = [["all", "vote", "producer_reward"]]
+    param_names = ["opNames"]
+
+    def stream(self, opNames):
+        b = Blockchain(steem_instance=self.stm)
+        return b.stream(opNames=[] if opNames == "all" else [opNames], filter_ops=True,
+                        start=START_BLOCK, stop=START_BLOCK + N_BLOCKS - 1, max_batch_size=50)
+
+    def time_stream(self, opNames):
+        measure(self.stream(opNames))
+
+    def track_ops_per_second(self, opNames):
+        n, elapsed, latencies = measure(self.stream(opNames))
+        return n / elapsed
+    track_ops_per_second.unit = "ops/s"
+
+
+class AccountHistory(MockNodeBenchmark):
+    params = [["history", "history_reverse"]]
+    param_names = ["direction"]
+
+    def history(self, direction):
+        account = Account("benchmark", steem_instance=self.stm)
+        return getattr(account, direction)(batch_size=1000)
+
+    def time_history(self, direction):
+        measure(self.history(direction))
+
+    def peakmem_history(self, direction):
+        measure(self.history(direction))
+
+    def track_ops_per_second(self, direction):
+        n, elapsed, latencies = measure(self.history(direction))
+        return n / elapsed
+    track_ops_per_second.unit = "ops/s"
+
+    def track_p99_latency(self, direction):
+        return percentile(measure(self.history(direction))[2], 99) * 1000
+    track_p99_latency.unit = "ms"
+
+
+class AccountsBatch(MockNodeBenchmark):
+    params = [[1, 10, 100]]
+    param_names = ["batch_limit"]
+
+    def accounts(self, batch_limit):
+        BlockchainObject.clear_cache()
+        return Accounts(["account%d" % i for i in range(N_ACCOUNTS)], batch_limit=batch_limit, steem_instance=self.stm)
+
+    def time_accounts(self, batch_limit):
+        self.accounts(batch_limit)
+
+    def track_accounts_per_second(self, batch_limit):
+        start = time.time()
+        accounts = self.accounts(batch_limit)
+        return len(accounts) / (time.time() - start)
+    track_accounts_per_second.unit = "accounts/s"
+
+
+def run_report():
+    """ Runs every workload once and prints its throughput, latencies and the peak RSS"""
+    from prettytable import PrettyTable
+    t = PrettyTable(["Benchmark", "Items", "Items/s", "p50 [ms]", "p99 [ms]", "Peak RSS [MB]"])
+    t.align = "r"
+    t.align["Benchmark"] = "l"
+    workloads = [("blocks %s" % mode, Blocks, Blocks.blocks, mode) for mode in BLOCK_MODES]
+    workloads += [("stream %s" % op, Stream, Stream.stream, op) for op in Stream.params[0]]
+    workloads += [(direction, AccountHistory, AccountHistory.history, direction) for direction in AccountHistory.params[0]]
+    for name, klass, workload, param in workloads:
+        bench = klass()
+        bench.setup(param)
+        try:
+            n, elapsed, latencies = measure(workload(bench, param))
+        finally:
+            bench.teardown(param)
+        t.add_row([name, n, "%.1f" % (n / elapsed), "%.2f" % (percentile(latencies, 50) * 1000),
+                   "%.2f" % (percentile(latencies, 99) * 1000), "%.1f" % peak_rss()])
+    for batch_limit in AccountsBatch.params[0]:
+        bench = AccountsBatch()
+        bench.setup(batch_limit)
+        try:
+            start = time.time()
+            n = len(bench.accounts(batch_limit))
+            elapsed = time.time() - start
+        finally:
+            bench.teardown(batch_limit)
+        t.add_row(["accounts batch_limit=%d" % batch_limit, n, "%.1f" % (n / elapsed), "", "", "%.1f" % peak_rss()])
+    print(t)
+
+
+if __name__ == "__main__":
+    run_report()
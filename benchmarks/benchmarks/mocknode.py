@@ -0,0 +1,276 @@
+# This Python file uses the following encoding: utf-8
+"""Local mock JSON-RPC node for the rpc and streaming benchmarks.
+
+The node answers the appbase calls used by Steem, Blockchain and Account
+from synthetic data: every block has ``trx_per_block`` transactions with
+votes, transfers and comments, every account has ``history_length``
+operations. Recorded blocks can be served instead by passing them as
+``blocks`` (a dict of block number and raw block).
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn, TCPServer
+except ImportError:
+    from http.server import BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn, TCPServer
+
+GENESIS_TIME = datetime(2019, 1, 1)
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def block_time(block_num):
+    return (GENESIS_TIME + timedelta(seconds=3 * block_num)).strftime(TIME_FORMAT)
+
+
+def block_id(block_num):
+    return "%08x" % block_num + hashlib.sha1(str(block_num).encode()).hexdigest()[:32]
+
+
+def generate_operation(block_num, trx_num):
+    kind = (block_num + trx_num) % 3
+    if kind == 0:
+        return ["vote", {"voter": "voter%d" % trx_num, "author": "author%d" % (block_num % 100),
+                         "permlink": "post-%d" % block_num, "weight": 10000}]
+    elif kind == 1:
+        return ["transfer", {"from": "sender%d" % trx_num, "to": "receiver%d" % (block_num % 50),
+                             "amount": "1.000 STEEM", "memo": "benchmark memo %d" % block_num}]
+    return ["comment", {"parent_author": "", "parent_permlink": "benchmark", "author": "author%d" % trx_num,
+                        "permlink": "post-%d-%d" % (block_num, trx_num), "title": "Title %d" % block_num,
+                        "body": "Lorem ipsum dolor sit amet " * 20, "json_metadata": "{\"tags\":[\"benchmark\"]}"}]
+
+
+def generate_block(block_num, trx_per_block=20):
+    """Returns a raw block as it is returned by block_api.get_block"""
+    transactions = []
+    transaction_ids = []
+    for trx_num in range(trx_per_block):
+        transactions.append({"ref_block_num": block_num % 65536, "ref_block_prefix": 1234567890,
+                             "expiration": block_time(block_num + 20),
+                             "operations": [generate_operation(block_num, trx_num)],
+                             "extensions": [], "signatures": ["1f" + "ab" * 64]})
+        transaction_ids.append(hashlib.sha1(("%d-%d" % (block_num, trx_num)).encode()).hexdigest())
+    return {"previous": block_id(block_num - 1), "timestamp": block_time(block_num),
+            "witness": "witness%d" % (block_num % 21), "transaction_merkle_root": "0" * 40,
+            "extensions": [], "witness_signature": "20" + "cd" * 64,
+            "transactions": transactions, "block_id": block_id(block_num),
+            "signing_key": "STM6LLegbAgLAy28EHrffBVuANFWcFgmqRMW13wBmTExqFE9SCkg4",
+            "transaction_ids": transaction_ids}
+
+
+def generate_virtual_ops(block_num):
+    return [{"trx_id": "0" * 40, "block": block_num, "trx_in_block": 4294967295, "op_in_trx": 0,
+             "virtual_op": 1, "timestamp": block_time(block_num),
+             "op": ["producer_reward", {"producer": "witness%d" % (block_num % 21),
+                                        "vesting_shares": "1.000000 VESTS"}]}]
+
+
+def generate_account(name, history_length):
+    return {"id": int(hashlib.sha1(name.encode()).hexdigest()[:6], 16), "name": name,
+            "owner": {"weight_threshold": 1, "account_auths": [],
+                      "key_auths": [["STM6LLegbAgLAy28EHrffBVuANFWcFgmqRMW13wBmTExqFE9SCkg4", 1]]},
+            "active": {"weight_threshold": 1, "account_auths": [],
+                       "key_auths": [["STM6LLegbAgLAy28EHrffBVuANFWcFgmqRMW13wBmTExqFE9SCkg4", 1]]},
+            "posting": {"weight_threshold": 1, "account_auths": [],
+                        "key_auths": [["STM6LLegbAgLAy28EHrffBVuANFWcFgmqRMW13wBmTExqFE9SCkg4", 1]]},
+            "memo_key": "STM6LLegbAgLAy28EHrffBVuANFWcFgmqRMW13wBmTExqFE9SCkg4",
+            "json_metadata": "", "proxy": "", "last_owner_update": "1970-01-01T00:00:00",
+            "last_account_update": "2019-01-01T00:00:00", "created": "2018-01-01T00:00:00",
+            "mined": False, "recovery_account": "steem", "reset_account": "null",
+            "last_account_recovery": "1970-01-01T00:00:00", "comment_count": 0, "lifetime_vote_count": 0,
+            "post_count": 10, "can_vote": True,
+            "voting_manabar": {"current_mana": "1000000000", "last_update_time": 1546300800},
+            "voting_power": 10000,
+            "balance": {"amount": "1000", "precision": 3, "nai": "@@000000021"},
+            "savings_balance": {"amount": "0", "precision": 3, "nai": "@@000000021"},
+            "sbd_balance": {"amount": "1000", "precision": 3, "nai": "@@000000013"},
+            "sbd_seconds": "0", "sbd_seconds_last_update": "1970-01-01T00:00:00",
+            "sbd_last_interest_payment": "1970-01-01T00:00:00",
+            "savings_sbd_balance": {"amount": "0", "precision": 3, "nai": "@@000000013"},
+            "savings_sbd_seconds": "0", "savings_sbd_seconds_last_update": "1970-01-01T00:00:00",
+            "savings_sbd_last_interest_payment": "1970-01-01T00:00:00", "savings_withdraw_requests": 0,
+            "reward_sbd_balance": {"amount": "0", "precision": 3, "nai": "@@000000013"},
+            "reward_steem_balance": {"amount": "0", "precision": 3, "nai": "@@000000021"},
+            "reward_vesting_balance": {"amount": "0", "precision": 6, "nai": "@@000000037"},
+            "reward_vesting_steem": {"amount": "0", "precision": 3, "nai": "@@000000021"},
+            "vesting_shares": {"amount": "1000000000", "precision": 6, "nai": "@@000000037"},
+            "delegated_vesting_shares": {"amount": "0", "precision": 6, "nai": "@@000000037"},
+            "received_vesting_shares": {"amount": "0", "precision": 6, "nai": "@@000000037"},
+            "vesting_withdraw_rate": {"amount": "0", "precision": 6, "nai": "@@000000037"},
+            "next_vesting_withdrawal": "1969-12-31T23:59:59", "withdrawn": 0, "to_withdraw": 0,
+            "withdraw_routes": 0, "curation_rewards": 0, "posting_rewards": 0,
+            "proxied_vsf_votes": [0, 0, 0, 0], "witnesses_voted_for": 0,
+            "last_post": "2019-01-01T00:00:00", "last_root_post": "2019-01-01T00:00:00",
+            "last_vote_time": "2019-01-01T00:00:00", "post_bandwidth": 0, "pending_claimed_accounts": 0,
+            "is_smt": False, "history_length": history_length}
+
+
+def generate_history_op(name, index):
+    block_num = 1000 + index * 10
+    if index % 2 == 0:
+        op = ["transfer", {"from": name, "to": "receiver%d" % (index % 50), "amount": "0.001 STEEM",
+                           "memo": "history %d" % index}]
+    else:
+        op = ["vote", {"voter": name, "author": "author%d" % (index % 100), "permlink": "post-%d" % index,
+                       "weight": 10000}]
+    return [index, {"trx_id": hashlib.sha1(("%s-%d" % (name, index)).encode()).hexdigest(), "block": block_num,
+                    "trx_in_block": 0, "op_in_trx": 0, "virtual_op": 0, "timestamp": block_time(block_num),
+                    "op": op}]
+
+
+class MockNodeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, avoid the delayed ack stall
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        data = self.rfile.read(int(self.headers["Content-Length"]))
+        query = json.loads(data.decode("utf-8"))
+        if isinstance(query, list):
+            reply = [self.server.mock_node.answer(q) for q in query]
+        else:
+            reply = self.server.mock_node.answer(query)
+        body = json.dumps(reply).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockNodeServer(ThreadingMixIn, TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class MockNode(object):
+    """ Local appbase JSON-RPC node which serves synthetic or recorded data
+
+        :param int head_block: head block number (default is 100000)
+        :param int trx_per_block: number of transactions in a generated block (default is 20)
+        :param int history_length: number of operations in the history of every account (default is 1000)
+        :param dict blocks: recorded raw blocks by block number, which are served instead
+            of generated blocks *(optional)*
+
+        .. code-block:: python
+
+            node = MockNode()
+            node.start()
+            stm = Steem(node=node.url)
+            ...
+            node.stop()
+
+    """
+    def __init__(self, head_block=100000, trx_per_block=20, history_length=1000, blocks=None):
+        self.head_block = head_block
+        self.trx_per_block = trx_per_block
+        self.history_length = history_length
+        self.blocks = blocks or {}
+        self.calls = 0
+        self.server = None
+        self.thread = None
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:%d/" % self.server.server_address[1]
+
+    def start(self):
+        self.server = MockNodeServer(("127.0.0.1", 0), MockNodeHandler)
+        self.server.mock_node = self
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def get_block(self, block_num):
+        if block_num in self.blocks:
+            return self.blocks[block_num]
+        if block_num < 1 or block_num > self.head_block:
+            return None
+        return generate_block(block_num, self.trx_per_block)
+
+    def answer(self, query):
+        self.calls += 1
+        method = query.get("method")
+        params = query.get("params")
+        if method == "call":
+            method = params[0] + "." + params[1]
+        try:
+            result = self.result(method, params)
+        except KeyError:
+            return {"jsonrpc": "2.0", "id": query.get("id"),
+                    "error": {"code": -32601, "message": "Could not find method %s" % method}}
+        return {"jsonrpc": "2.0", "id": query.get("id"), "result": result}
+
+    def result(self, method, params):
+        if method.endswith("get_config"):
+            return {"STEEM_BLOCKCHAIN_VERSION": "0.20.8", "STEEM_CHAIN_ID": "0" * 64,
+                    "STEEM_BLOCK_INTERVAL": 3, "STEEM_ADDRESS_PREFIX": "STM",
+                    "STEEM_100_PERCENT": 10000, "STEEM_1_PERCENT": 100}
+        elif method.endswith("get_dynamic_global_properties"):
+            return {"head_block_number": self.head_block, "head_block_id": block_id(self.head_block),
+                    "time": block_time(self.head_block), "current_witness": "witness0",
+                    "last_irreversible_block_num": self.head_block - 20,
+                    "total_vesting_fund_steem": {"amount": "190000000000", "precision": 3, "nai": "@@000000021"},
+                    "total_vesting_shares": {"amount": "380000000000000000", "precision": 6, "nai": "@@000000037"},
+                    "current_supply": {"amount": "270000000000", "precision": 3, "nai": "@@000000021"},
+                    "current_sbd_supply": {"amount": "15000000000", "precision": 3, "nai": "@@000000013"},
+                    "sbd_interest_rate": 0, "sbd_print_rate": 10000, "maximum_block_size": 65536,
+                    "current_aslot": self.head_block, "participation_count": 128,
+                    "vote_power_reserve_rate": 10, "average_block_size": 10000}
+        elif method.endswith("get_witness_schedule"):
+            return {"id": 0, "current_virtual_time": "0", "next_shuffle_block_num": self.head_block + 21,
+                    "current_shuffled_witnesses": ["witness%d" % i for i in range(21)], "num_scheduled_witnesses": 21,
+                    "median_props": {"account_creation_fee": {"amount": "3000", "precision": 3, "nai": "@@000000021"},
+                                     "maximum_block_size": 65536, "sbd_interest_rate": 0, "account_subsidy_budget": 797,
+                                     "account_subsidy_decay": 347321}}
+        elif method.endswith("get_feed_history"):
+            return {"id": 0, "current_median_history": {"base": {"amount": "1000", "precision": 3, "nai": "@@000000013"},
+                                                        "quote": {"amount": "1000", "precision": 3, "nai": "@@000000021"}},
+                    "price_history": []}
+        elif method.endswith("get_reward_funds"):
+            return {"funds": [{"id": 0, "name": "post",
+                               "reward_balance": {"amount": "800000000", "precision": 3, "nai": "@@000000021"},
+                               "recent_claims": "500000000000000000", "last_update": block_time(self.head_block),
+                               "content_constant": "2000000000000", "percent_curation_rewards": 2500,
+                               "percent_content_rewards": 10000, "author_reward_curve": "linear",
+                               "curation_reward_curve": "square_root"}]}
+        elif method == "block_api.get_block":
+            return {"block": self.get_block(params["block_num"])}
+        elif method == "account_history_api.get_ops_in_block":
+            if params.get("only_virtual", False):
+                return {"ops": generate_virtual_ops(params["block_num"])}
+            block = self.get_block(params["block_num"])
+            ops = []
+            for trx_num, trx in enumerate(block["transactions"]):
+                for op in trx["operations"]:
+                    ops.append({"trx_id": block["transaction_ids"][trx_num], "block": params["block_num"],
+                                "trx_in_block": trx_num, "op_in_trx": 0, "virtual_op": 0,
+                                "timestamp": block["timestamp"], "op": op})
+            return {"ops": ops + generate_virtual_ops(params["block_num"])}
+        elif method == "database_api.find_accounts":
+            return {"accounts": [generate_account(name, self.history_length) for name in params["accounts"]]}
+        elif method == "account_history_api.get_account_history":
+            start = params["start"]
+            last = self.history_length - 1
+            if start < 0 or start > last:
+                start = last
+            first = max(0, start - params["limit"])
+            return {"history": [generate_history_op(params["account"], i) for i in range(first, start + 1)]}
+        raise KeyError(method)
@@ -11,7 +11,7 @@ from datetime import datetime, timedelta
 from parameterized import parameterized
 from pprint import pprint
 from beem import Steem, exceptions
-from beem.account import Account
+from beem.account import Account, AccountsHistory
 from beem.block import Block
 from beem.amount import Amount
 from beem.asset import Asset
@@ -172,6 +172,23 @@ class Testcases(unittest.TestCase):
         self.assertEqual(h_list[0][1]['block'], h_all_raw[-10 + zero_element][1]['block'])
         self.assertEqual(h_list[-1][1]['block'], h_all_raw[-2 + zero_element][1]['block'])
 
+    def test_accounts_history(self):
+        stm = self.bts
+        names = ["beembot", "test"]
+        expected = {}
+        for name in names:
+            expected[name] = list(Account(name, steem_instance=stm).history(stop=20, use_block_num=False))
+        accounts_history = AccountsHistory(names, stop=20, use_block_num=False, thread_num=2, steem_instance=stm)
+        self.assertEqual(dict(accounts_history.history_by_account()), expected)
+        self.assertEqual(accounts_history.errors, {})
+        h_list = list(accounts_history.history())
+        self.assertEqual(len(h_list), sum([len(expected[name]) for name in names]))
+        for i in range(1, len(h_list)):
+            self.assertTrue(h_list[i - 1]["timestamp"] <= h_list[i]["timestamp"])
+        h_list = list(accounts_history.history(raw_output=True, reverse=True))
+        self.assertIn(h_list[0][0], names)
+        self.assertTrue(h_list[0][1][1]["timestamp"] >= h_list[-1][1][1]["timestamp"])
+
     def test_history2(self):
         stm = self.bts
         account = Account("beembot", steem_instance=stm)
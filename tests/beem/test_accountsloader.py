@@ -0,0 +1,112 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import sys
+import unittest
+from datetime import datetime
+from beem import Steem
+from beem.amount import Amount
+from beem.account import Account, Accounts, AccountsLoader, LazyParsedAccount
+from beem.utils import addTzInfo
+if sys.version_info < (3, 0):
+    from Queue import Queue
+else:
+    from queue import Queue
+
+
+def get_account(name):
+    return {"name": name, "balance": "1.000 STEEM", "sbd_balance": {"amount": "2000", "precision": 3, "nai": "@@000000013"},
+            "vesting_shares": "10.000000 VESTS", "reputation": "1000", "created": "2018-01-01T00:00:00",
+            "proxied_vsf_votes": ["1", 0], "post_count": 3}
+
+
+class FindAccountsRPC(object):
+    """Answers single and batched find_accounts calls like an appbase node"""
+    def __init__(self, batch_support=True):
+        self.calls = []
+        self.batch_support = batch_support
+
+    def set_next_node_on_empty_reply(self, next_node_on_empty_reply=True):
+        pass
+
+    def get_use_appbase(self):
+        return True
+
+    def find_accounts(self, query, api=None, **kwargs):
+        if isinstance(query, dict):
+            self.calls.append([query["accounts"]])
+            return {"accounts": [get_account(name) for name in query["accounts"] if name != "missing"]}
+        self.calls.append([q["accounts"] for q in query])
+        if not self.batch_support:
+            return {"accounts": []}
+        return [{"accounts": [get_account(name) for name in q["accounts"]]} for q in query]
+
+
+class Testcases(unittest.TestCase):
+
+    def setUp(self):
+        self.stm = Steem(offline=True)
+        self.rpc = FindAccountsRPC()
+        self.stm.rpc = self.rpc
+        self.names = ["a%03d" % i for i in range(25)]
+
+    def test_raw_accounts(self):
+        loader = AccountsLoader(self.names, batch_limit=10, steem_instance=self.stm)
+        self.assertEqual([a["name"] for a in loader.raw_accounts()], self.names)
+        self.assertEqual(self.rpc.calls, [[self.names[:10]], [self.names[10:20]], [self.names[20:]]])
+
+        self.rpc.calls = []
+        loader = AccountsLoader(self.names, batch_limit=10, rpc_batch_size=2, steem_instance=self.stm)
+        self.assertEqual([a["name"] for a in loader.raw_accounts()], self.names)
+        self.assertEqual(self.rpc.calls, [[self.names[:10], self.names[10:20]], [self.names[20:]]])
+
+        loader = AccountsLoader(["a", "missing", "b"], steem_instance=self.stm)
+        self.assertEqual([a["name"] for a in loader.raw_accounts()], ["a", "b"])
+
+        self.rpc.batch_support = False
+        self.rpc.calls = []
+        loader = AccountsLoader(self.names, batch_limit=10, rpc_batch_size=2, steem_instance=self.stm)
+        self.assertEqual([a["name"] for a in loader.raw_accounts()], self.names)
+        # after the first failed batch, the names are fetched with single calls
+        self.assertEqual(self.rpc.calls, [[self.names[:10], self.names[10:20]], [self.names[:10]],
+                                          [self.names[10:20]], [self.names[20:]]])
+
+    def test_threads(self):
+        loader = AccountsLoader(self.names, batch_limit=2, thread_num=3, steem_instance=self.stm)
+        loader._steem_instances = Queue()
+        for i in range(3):
+            loader._steem_instances.put(self.stm)
+        self.assertEqual([a["name"] for a in loader.accounts()], self.names)
+        self.assertEqual(len(self.rpc.calls), 13)
+
+        accounts = Accounts(self.names, batch_limit=5, steem_instance=self.stm)
+        self.assertEqual([a["name"] for a in accounts], self.names)
+        self.assertEqual(accounts[0]["balance"], Amount("1.000 STEEM", steem_instance=self.stm))
+
+    def test_lazy_parse(self):
+        loader = AccountsLoader(["foo"], lazy_parse=True, steem_instance=self.stm)
+        account = list(loader.accounts())[0]
+        self.assertTrue(isinstance(account, LazyParsedAccount))
+        self.assertEqual(dict.__getitem__(account, "balance"), "1.000 STEEM")
+        self.assertEqual(account["balance"], Amount("1.000 STEEM", steem_instance=self.stm))
+        self.assertEqual(account.get("created"), addTzInfo(datetime(2018, 1, 1)))
+        self.assertEqual(dict.__getitem__(account, "reputation"), "1000")
+        self.assertEqual(account.json(), Account(get_account("foo"), steem_instance=self.stm).json())
+        self.assertEqual(dict.__getitem__(account, "proxied_vsf_votes"), [1, 0])
+
+    def test_columns(self):
+        loader = AccountsLoader(self.names, batch_limit=10, steem_instance=self.stm)
+        columns = loader.columns(["name", "balance", "sbd_balance", "reputation", "created", "post_count", "proxy"])
+        self.assertEqual(columns["name"], self.names)
+        self.assertEqual(columns["balance"], [1.0] * 25)
+        self.assertEqual(columns["sbd_balance"], [2.0] * 25)
+        self.assertEqual(columns["reputation"], [1000] * 25)
+        self.assertEqual(columns["created"], [1514764800] * 25)
+        self.assertEqual(columns["post_count"], [3] * 25)
+        self.assertEqual(columns["proxy"], [None] * 25)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from beem import Steem
+from beem.block import Block
+from beem.blockchain import Blockchain
+
+
+class VirtualOpsRPC(object):
+    """Answers batched get_ops_in_block calls like an appbase node"""
+    def __init__(self):
+        self.calls = []
+
+    def set_next_node_on_empty_reply(self, next_node_on_empty_reply=True):
+        pass
+
+    def get_use_appbase(self):
+        return True
+
+    def get_ops_in_block(self, queries, api=None, **kwargs):
+        self.calls.append([q["block_num"] for q in queries])
+        ops = []
+        for q in queries:
+            ops.append({"ops": [{"trx_id": "0" * 40, "block": q["block_num"], "trx_in_block": 4294967295,
+                                 "op_in_trx": 0, "virtual_op": 1, "timestamp": "2019-01-01T00:00:00",
+                                 "op": ["producer_reward", {"producer": "w%d" % q["block_num"], "vesting_shares": "1.000000 VESTS"}]}]})
+        return ops
+
+
+class Testcases(unittest.TestCase):
+
+    def setUp(self):
+        self.stm = Steem(offline=True)
+        self.chain = Blockchain(steem_instance=self.stm)
+
+    def test_blocks_virtual_ops_batched(self):
+        rpc = VirtualOpsRPC()
+        self.stm.rpc = rpc
+        self.chain.get_current_block = lambda: Block({"block_id": "00000064" + "0" * 32}, steem_instance=self.stm)
+        blocks = list(self.chain.blocks(start=1, stop=60, max_batch_size=50, only_virtual_ops=True))
+        self.assertEqual([block.block_num for block in blocks], list(range(1, 61)))
+        self.assertEqual([block.identifier for block in blocks], list(range(1, 61)))
+        self.assertEqual(blocks[4].operations[0]["op"][1]["producer"], "w5")
+        # without threading, the blocks are fetched with one batched call per max_batch_size blocks
+        self.assertEqual([len(c) for c in rpc.calls], [50, 10])
+
+    def test_stream_op_filter(self):
+        raw = {"block_id": "0000000a" + "0" * 32, "timestamp": "2019-01-01T00:00:00", "transaction_ids": ["aa", "bb"],
+               "transactions": [{"operations": [["vote", {"voter": "a"}], ["transfer", {"from": "a", "to": "b"}]]},
+                                {"operations": [{"type": "vote_operation", "value": {"voter": "c"}}]}]}
+        block = Block(raw, steem_instance=self.stm)
+        block["id"] = 10
+        self.chain.blocks = lambda **kwargs: iter([block])
+
+        ops = list(self.chain.stream(opNames=["vote"]))
+        self.assertEqual([op["voter"] for op in ops], ["a", "c"])
+        self.assertEqual([op["trx_id"] for op in ops], ["aa", "bb"])
+        self.assertEqual(ops[1]["trx_num"], 1)
+        self.assertEqual(ops[0]["block_num"], 10)
+
+        ops = list(self.chain.stream(opNames=["transfer"], raw_ops=True))
+        self.assertEqual(len(ops), 1)
+        self.assertEqual(ops[0]["op"], ["transfer", {"from": "a", "to": "b"}])
+        self.assertEqual(len(list(self.chain.stream())), 3)
+
+    def test_stream_virtual_ops_batched(self):
+        rpc = VirtualOpsRPC()
+        self.stm.rpc = rpc
+        self.chain.get_current_block = lambda: Block({"block_id": "00000064" + "0" * 32}, steem_instance=self.stm)
+        ops = list(self.chain.stream(opNames=["producer_reward"], filter_ops=True, start=1, stop=60))
+        self.assertEqual([op["producer"] for op in ops], ["w%d" % i for i in range(1, 61)])
+        self.assertEqual(ops[0]["block_num"], 1)
+        # 50 blocks with one batched call, the last 10 blocks with a second call
+        self.assertEqual([len(c) for c in rpc.calls], [50, 10])
@@ -0,0 +1,105 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import os
+import shutil
+import tempfile
+import unittest
+from beem import Steem
+from beem.block import Block
+from beem.blockstore import BlockStore
+
+
+def get_block(block_num):
+    return {"block_id": "%08x" % block_num + "0" * 32,
+            "previous": "%08x" % (block_num - 1) + "0" * 32,
+            "timestamp": "2019-01-01T00:00:00",
+            "transactions": [{"expiration": "2019-01-01T00:01:00", "operations": []}],
+            "transaction_ids": ["abc"]}
+
+
+class Testcases(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.data_dir, "blocks.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_store_and_get(self):
+        store = BlockStore(path=self.path)
+        store.store(10, get_block(10))
+        # Only irreversible blocks are stored
+        self.assertEqual(len(store), 0)
+        self.assertIsNone(store.get(10))
+        store.set_last_irreversible_block_num(20)
+        store.set_last_irreversible_block_num(15)
+        self.assertEqual(store.last_irreversible_block_num, 20)
+        store.store_many([(i, get_block(i)) for i in range(1, 31)])
+        self.assertEqual(len(store), 20)
+        self.assertEqual(store.get(10), get_block(10))
+        self.assertIsNone(store.get(10, only_ops=True))
+        self.assertIsNone(store.get(21))
+
+        blocks = store.get_range(5, 25)
+        self.assertEqual(sorted(blocks.keys()), list(range(5, 21)))
+        self.assertEqual(blocks[7], get_block(7))
+
+        # The data is persisted
+        store2 = BlockStore(path=self.path)
+        self.assertEqual(len(store2), 20)
+        self.assertEqual(store2.size, store.size)
+        self.assertEqual(store2.get(20), get_block(20))
+
+    def test_store_same_block(self):
+        store = BlockStore(path=self.path)
+        store.set_last_irreversible_block_num(100)
+        store.store_many([(1, get_block(1)), (2, get_block(2))])
+        size = store.size
+        for i in range(5):
+            store.store(1, get_block(1))
+        store.store_many([(2, get_block(2)), (2, get_block(2))])
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.size, size)
+        store2 = BlockStore(path=self.path)
+        self.assertEqual((len(store2), store2.size), (len(store), store.size))
+
+        # Storing a block again does not evict valid blocks
+        store = BlockStore(path=self.path, max_blocks=3)
+        store.set_last_irreversible_block_num(100)
+        store.store(3, get_block(3))
+        store.store(1, get_block(1))
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.get(2), get_block(2))
+
+    def test_eviction_and_compact(self):
+        store = BlockStore(path=self.path, max_blocks=100)
+        store.set_last_irreversible_block_num(1000)
+        for i in range(1, 201, 10):
+            store.store_many([(j, get_block(j)) for j in range(i, i + 10)])
+        self.assertTrue(len(store) <= 100)
+        self.assertIsNone(store.get(1))
+        self.assertEqual(store.get(200), get_block(200))
+        size = store.size
+        store.compact()
+        self.assertEqual(store.size, size)
+
+        store.max_size = size // 2
+        store.evict()
+        self.assertTrue(store.size <= 0.9 * size // 2)
+        store.wipe(True)
+        self.assertEqual(len(store), 0)
+        self.assertEqual(store.size, 0)
+
+    def test_block(self):
+        store = BlockStore(path=self.path)
+        store.set_last_irreversible_block_num(100)
+        store.store(42, get_block(42))
+        stm = Steem(offline=True, block_store=store)
+        block = Block(42, steem_instance=stm)
+        self.assertEqual(block.block_num, 42)
+        self.assertEqual(len(block.transactions), 1)
+        self.assertEqual(block.json()["timestamp"], "2019-01-01T00:00:00")
@@ -0,0 +1,85 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from beem.account import construct_history_op
+from beem.historystore import HistoryStore
+
+
+def get_item(index):
+    block_num = 1000 + index * 10
+    if index % 2 == 0:
+        op = ["transfer", {"from": "foo", "to": "bar", "amount": "0.001 STEEM", "memo": "%d" % index}]
+    else:
+        op = {"type": "vote_operation", "value": {"voter": "foo", "author": "bar", "permlink": "p%d" % index, "weight": 100}}
+    return [index, {"trx_id": "%040x" % index, "block": block_num, "trx_in_block": 0, "op_in_trx": 0,
+                    "virtual_op": 0, "timestamp": "2019-01-01T%02d:%02d:00" % (index // 60, index % 60), "op": op}]
+
+
+class Testcases(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.data_dir, "history.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_store_many(self):
+        store = HistoryStore(path=self.path)
+        self.assertEqual(store.get_cursor("foo"), -1)
+        # Only irreversible operations are stored
+        self.assertEqual(store.store_many("foo", [get_item(i) for i in range(10)]), 0)
+        store.set_last_irreversible_block_num(1045)
+        self.assertEqual(store.store_many("foo", [get_item(i) for i in range(10)]), 5)
+        self.assertEqual(store.get_cursor("foo"), 4)
+        store.set_last_irreversible_block_num(2000)
+        # Operations after a gap are not stored
+        self.assertEqual(store.store_many("foo", [get_item(i) for i in range(6, 10)]), 0)
+        self.assertEqual(store.store_many("foo", [get_item(i) for i in range(3, 10)]), 5)
+        self.assertEqual(store.get_cursor("foo"), 9)
+        self.assertEqual(len(store), 10)
+        self.assertEqual(store.get_accounts()["foo"][:2], (9, 1090))
+
+        # The data is persisted
+        store2 = HistoryStore(path=self.path)
+        self.assertEqual(store2.get_cursor("foo"), 9)
+        self.assertEqual(list(store2.history("foo", raw_output=True, sync=False)), [get_item(i) for i in range(10)])
+        store2.remove("foo")
+        self.assertEqual(store2.get_cursor("foo"), -1)
+        self.assertEqual(len(store2), 0)
+
+    def test_history(self):
+        store = HistoryStore(path=self.path)
+        store.set_last_irreversible_block_num(10000)
+        store.store_many("foo", [get_item(i) for i in range(100)])
+        ops = list(store.history("foo", sync=False))
+        self.assertEqual(ops, [construct_history_op(get_item(i), "foo") for i in range(100)])
+        self.assertEqual(ops[1]["type"], "vote")
+
+        ops = list(store.history("foo", start=1100, stop=1200, only_ops=["vote"], raw_output=True, sync=False))
+        self.assertEqual([op[0] for op in ops], [11, 13, 15, 17, 19])
+        ops = list(store.history("foo", start=10, stop=15, use_block_num=False, exclude_ops=["vote"],
+                                 raw_output=True, sync=False))
+        self.assertEqual([op[0] for op in ops], [10, 12, 14])
+        ops = list(store.history("foo", start=datetime(2019, 1, 1, 1, 0, 0), raw_output=True, sync=False))
+        self.assertEqual([op[0] for op in ops], list(range(60, 100)))
+
+        ops = list(store.history("foo", start=-1, stop=-5, use_block_num=False, raw_output=True, order=-1, sync=False))
+        self.assertEqual([op[0] for op in ops], [98, 97, 96, 95, 94])
+        ops = list(store.history("foo", start=1100, stop=1050, raw_output=True, order=-1, sync=False))
+        self.assertEqual([op[0] for op in ops], [10, 9, 8, 7, 6, 5])
+
+        store.wipe(True)
+        self.assertEqual(len(store), 0)
+        self.assertEqual(store.get_accounts(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
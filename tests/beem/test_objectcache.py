@@ -75,3 +75,43 @@ class Testcases(unittest.TestCase):
         self.assertEqual(len(list(cache)), 1)
         # Get
         self.assertEqual(cache.get("foo", "New"), "New")
+
+    def test_cache_lru(self):
+        cache = ObjectCache(default_expiration=60, max_entries=3)
+        cache["a"] = 1
+        cache["b"] = 2
+        cache["c"] = 3
+        # "a" is now the most recently used object
+        self.assertEqual(cache["a"], 1)
+        cache["d"] = 4
+        self.assertNotIn("b", cache)
+        self.assertIn("a", cache)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.get("b", None), None)
+        stats = cache.get_stats()
+        self.assertEqual(stats["n"], 3)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_cache_max_bytes(self):
+        cache = ObjectCache(default_expiration=60, max_bytes=10000)
+        for i in range(100):
+            cache[i] = "x" * 500
+        self.assertTrue(cache.get_stats()["bytes"] <= 10000)
+        self.assertTrue(0 < len(cache) < 100)
+        self.assertIn(99, cache)
+        self.assertNotIn(0, cache)
+        cache.clear()
+        self.assertEqual(cache.get_stats()["bytes"], 0)
+
+    def test_cache_replace(self):
+        cache = ObjectCache(default_expiration=1, auto_clean=True)
+        for i in range(1000):
+            cache["foo"] = i
+        self.assertEqual(cache["foo"], 999)
+        self.assertTrue(len(cache._expiration_heap) < 200)
+        time.sleep(2)
+        cache["bar"] = 1
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get_stats()["expirations"], 1)
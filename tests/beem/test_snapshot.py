@@ -0,0 +1,155 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from datetime import datetime, timedelta
+from beem import Steem
+from beem.snapshot import AccountSnapshot, ColumnarAccountSnapshot, NUMPY_MODULE
+
+
+def get_history():
+    ops = [
+        {"type": "account_create_with_delegation", "creator": "bar", "new_account_name": "foo",
+         "fee": "0.500 STEEM", "delegation": "30000.000000 VESTS"},
+        {"type": "transfer", "from": "bar", "to": "foo", "amount": "100.000 STEEM", "memo": ""},
+        {"type": "transfer", "from": "foo", "to": "bar", "amount": "1.000 SBD", "memo": ""},
+        {"type": "transfer_to_vesting", "from": "foo", "to": "foo", "amount": "50.000 STEEM"},
+        {"type": "delegate_vesting_shares", "delegator": "foo", "delegatee": "baz",
+         "vesting_shares": "10000.000000 VESTS"},
+        {"type": "delegate_vesting_shares", "delegator": "bar", "delegatee": "foo",
+         "vesting_shares": "0.000000 VESTS"},
+        {"type": "fill_order", "current_owner": "foo", "current_pays": "10.000 STEEM",
+         "open_owner": "bar", "open_pays": "3.000 SBD"},
+        {"type": "claim_reward_balance", "account": "foo", "reward_steem": "0.000 STEEM",
+         "reward_sbd": "1.000 SBD", "reward_vests": "2000.000000 VESTS"},
+        {"type": "delegate_vesting_shares", "delegator": "foo", "delegatee": "baz",
+         "vesting_shares": "0.000000 VESTS"},
+        {"type": "return_vesting_delegation", "account": "foo", "vesting_shares": "10000.000000 VESTS"},
+        {"type": "fill_vesting_withdraw", "from_account": "foo", "to_account": "foo",
+         "withdrawn": "500.000000 VESTS", "deposited": "0.250 STEEM"},
+        {"type": "fill_convert_request", "owner": "foo", "amount_in": "1.000 SBD", "amount_out": "2.000 STEEM"},
+    ]
+    for i in range(20):
+        ops.append({"type": "curation_reward", "curator": "foo", "reward": "%d.000000 VESTS" % (100 + i)})
+        ops.append({"type": "vote", "voter": "foo", "author": "bar", "permlink": "p%d" % i,
+                    "weight": 10000 - i * 1000})
+    history = []
+    start = datetime(2018, 1, 1)
+    for i, op in enumerate(ops):
+        op["timestamp"] = (start + timedelta(hours=7 * i)).strftime("%Y-%m-%dT%H:%M:%S")
+        op["index"] = i
+        op["block"] = 1000 + i
+        history.append(op)
+    # The history is sorted during build
+    return history[::-1]
+
+
+class Testcases(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stm = Steem(offline=True)
+        cls.stm.data["dynamic_global_properties"] = {"vote_power_reserve_rate": 10}
+
+    def get_snapshots(self, **kwargs):
+        snapshot = AccountSnapshot({"name": "foo"}, get_history(), steem_instance=self.stm)
+        snapshot.build(**kwargs)
+        if NUMPY_MODULE is None:
+            return [snapshot]
+        columnar = ColumnarAccountSnapshot({"name": "foo"}, get_history(), steem_instance=self.stm)
+        columnar.build(**kwargs)
+        return snapshot, columnar
+
+    @unittest.skipIf(NUMPY_MODULE is None, "numpy is not installed")
+    def test_build(self):
+        snapshot, columnar = self.get_snapshots(enable_rewards=True, enable_out_votes=True)
+        self.assertEqual(columnar.timestamps, snapshot.timestamps)
+        self.assertEqual(columnar.ops_statistics, snapshot.ops_statistics)
+        for name in ["own_vests", "own_steem", "own_sbd"]:
+            for (value, expected) in zip(getattr(columnar, name), getattr(snapshot, name)):
+                self.assertAlmostEqual(value, float(expected), places=6)
+        for name in ["delegated_vests_in", "delegated_vests_out"]:
+            self.assertEqual(getattr(columnar, name), getattr(snapshot, name))
+        self.assertEqual(len(columnar.delegated_vests_out[-1]), 0)
+
+        snapshot.build_sp_arrays()
+        columnar.build_sp_arrays()
+        for name in ["own_sp", "eff_sp"]:
+            for (value, expected) in zip(getattr(columnar, name), getattr(snapshot, name)):
+                self.assertAlmostEqual(value, expected, places=6)
+
+        snapshot.build_vp_arrays()
+        columnar.build_vp_arrays()
+        self.assertEqual(columnar.vp_timestamp, snapshot.vp_timestamp)
+        self.assertEqual(list(columnar.vp), snapshot.vp)
+
+        snapshot.build_curation_arrays(sum_days=1)
+        columnar.build_curation_arrays(sum_days=1)
+        self.assertEqual(columnar.curation_per_1000_SP_timestamp, snapshot.curation_per_1000_SP_timestamp)
+        for (value, expected) in zip(columnar.curation_per_1000_SP, snapshot.curation_per_1000_SP):
+            self.assertAlmostEqual(value, expected, places=6)
+
+    @unittest.skipIf(NUMPY_MODULE is None, "numpy is not installed")
+    def test_get_data(self):
+        snapshot, columnar = self.get_snapshots()
+        self.assertEqual(columnar.get_data(datetime(1969, 1, 1)), snapshot.get_data(datetime(1969, 1, 1)))
+        self.assertEqual(columnar.get_data(datetime(1969, 1, 1)), {})
+        for ts in [datetime(2018, 1, 1, 7), datetime(2018, 1, 2, 12, 30), datetime(2018, 1, 4), None]:
+            data = columnar.get_data(ts)
+            expected = snapshot.get_data(ts)
+            self.assertEqual(data["index"], expected["index"])
+            self.assertEqual(data["timestamp"], expected["timestamp"])
+            self.assertEqual(data["delegated_vests_in"], expected["delegated_vests_in"])
+            self.assertEqual(data["delegated_vests_out"], expected["delegated_vests_out"])
+            for key in ["vests", "steem", "sbd", "sp_own", "sp_eff"]:
+                self.assertAlmostEqual(float(data[key]), float(expected[key]), places=6)
+
+    def test_get_sp(self):
+        timestamps = [datetime(2018, 1, 4), datetime(1969, 1, 1), datetime(2018, 1, 1, 7), datetime(2018, 1, 6)]
+        for s in self.get_snapshots():
+            self.assertEqual(s.get_index(datetime(1969, 1, 1)), -1)
+            self.assertEqual(s.get_index(datetime(2018, 1, 1, 7)), 3)
+            self.assertEqual(s.get_index(datetime(2018, 1, 1, 7, 0, 1), index=3), 4)
+            self.assertEqual(s.get_index(datetime(2018, 1, 1, 7), index=20), 3)
+            sp_own, sp_eff = s.get_sp(timestamps)
+            self.assertEqual(sp_own[1], 0)
+            for (ts, own, eff) in zip(timestamps, sp_own, sp_eff):
+                data = s.get_data(ts)
+                self.assertAlmostEqual(own, data.get("sp_own", 0), places=6)
+                self.assertAlmostEqual(eff, data.get("sp_eff", 0), places=6)
+
+    def test_aggregate(self):
+        start = datetime(2018, 1, 5)
+        stop = datetime(2018, 1, 10)
+        for s in self.get_snapshots(enable_rewards=True):
+            s.build_sp_arrays()
+            rewards = [float(vests) for (ts, vests) in zip(s.reward_timestamps, s.curation_rewards)
+                       if start <= ts.replace(tzinfo=None) <= stop]
+            self.assertTrue(len(rewards) > 0)
+            self.assertAlmostEqual(s.aggregate("curation_rewards", start, stop), sum(rewards), places=6)
+            self.assertAlmostEqual(s.aggregate("curation_rewards", start, stop, func="mean"),
+                                   sum(rewards) / len(rewards), places=6)
+            self.assertAlmostEqual(s.aggregate("curation_rewards", start, stop, func="max"), max(rewards), places=6)
+            self.assertAlmostEqual(s.aggregate("eff_sp", func="max"), max(s.eff_sp), places=6)
+            self.assertEqual(s.aggregate("curation_rewards", stop=datetime(2017, 1, 1)), 0)
+            self.assertIsNone(s.aggregate("eff_sp", stop=datetime(1969, 1, 1), func="min"))
+            self.assertRaises(ValueError, s.aggregate, "author_rewards")
+            self.assertRaises(ValueError, s.aggregate, "eff_sp", func="median")
+
+    @unittest.skipIf(NUMPY_MODULE is None, "numpy is not installed")
+    def test_rep_arrays(self):
+        snapshot, columnar = self.get_snapshots()
+        for s in [snapshot, columnar]:
+            s.in_vote_timestamp = [datetime(2018, 2, 1) + timedelta(days=i) for i in range(4)]
+            s.in_vote_rshares = [10 ** 15, -10 ** 14, -10 ** 15, 10 ** 13]
+            s.in_vote_rep = [10 ** 14, 10 ** 12, 10 ** 14, 10 ** 12]
+            s.build_rep_arrays()
+        self.assertEqual(columnar.rep_timestamp, snapshot.rep_timestamp)
+        for (value, expected) in zip(columnar.rep, snapshot.rep):
+            self.assertAlmostEqual(value, expected, places=6)
+
+
+if __name__ == '__main__':
+    unittest.main()
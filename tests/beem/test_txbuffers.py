@@ -7,12 +7,13 @@ import unittest
 from parameterized import parameterized
 from beem import Steem
 from beem.instance import set_shared_steem_instance
-from beem.transactionbuilder import TransactionBuilder
+from beem.transactionbuilder import TransactionBuilder, TransactionPipeline
 from beembase.signedtransactions import Signed_Transaction
 from beembase.operations import Transfer
 from beem.account import Account
 from beem.block import Block
 from beemgraphenebase.base58 import Base58
+from beemgraphenebase.account import PrivateKey
 from beem.amount import Amount
 from beem.exceptions import (
     InsufficientAuthorityError,
@@ -63,3 +64,50 @@ class Testcases(unittest.TestCase):
         key = signed_tx.verify(chain=stm.chain_params, recover_parameter=False)
         public_key = format(Base58(key[0]), stm.prefix)
         self.assertEqual(public_key, "STM4tzr1wjmuov9ftXR6QNv7qDWsbShMBPQpuwatZsfSc5pKjRDfq")
+
+    def test_transaction_pipeline(self):
+        stm = self.stm
+        pipeline = TransactionPipeline(steem_instance=stm, processes=2)
+        ops = [Transfer(**{"from": "test", "to": "test%d" % i, "amount": "1.000 STEEM", "memo": ""}) for i in range(5)]
+        ops.append({"invalid": "op"})
+        results = pipeline.run(ops, wifs=[wif])
+        self.assertEqual([r["status"] for r in results], ["signed"] * 5 + ["failed"])
+        for r in results[:5]:
+            key = Signed_Transaction(r["trx"]).verify(chain=stm.chain_params, recover_parameter=False)
+            self.assertEqual(format(Base58(key[0]), stm.prefix), format(PrivateKey(wif).pubkey, stm.prefix))
+        results[5]["ops"] = [ops[0]]
+        pipeline.retry(results)
+        self.assertEqual(results[5]["status"], "signed")
+
+    def test_sign_constructed_tx(self):
+        stm = self.stm
+        tx = TransactionBuilder(steem_instance=stm)
+        tx.appendOps(Transfer(**{"from": "test", "to": "test1", "amount": "1.000 STEEM", "memo": ""}))
+        tx.appendWif(wif)
+        tx.constructTx()
+        tx_id = tx.tx.id
+        signed_tx = tx.sign(reconstruct_tx=False)
+        self.assertEqual(signed_tx.id, tx_id)
+        self.assertEqual(Signed_Transaction(**tx.json(with_prefix=True)).id, tx_id)
+        self.assertEqual(len(tx["signatures"]), 1)
+        self.assertEqual(len(tx.tx.data["signatures"].data), 0)
+        tx.appendOps(Transfer(**{"from": "test", "to": "test2", "amount": "1.000 STEEM", "memo": ""}))
+        self.assertIsNone(tx.tx._body)
+
+    def test_authority_cache(self):
+        stm = self.stm
+        TransactionBuilder.clear_authority_cache()
+        tx = TransactionBuilder(steem_instance=stm)
+        tx.appendSigner("test", "active")
+        key = (stm.chain_params["chain_id"], "test", "active")
+        self.assertIn(key, TransactionBuilder._authority_cache)
+        authority = TransactionBuilder._authority_cache[key]
+        self.assertEqual(tx._get_authority("test", "active"), authority)
+        # authorities of other chains are not used
+        TransactionBuilder._authority_cache[("0" * 64, "test", "active")] = {}
+        self.assertEqual(tx._get_authority("test", "active"), authority)
+        TransactionBuilder.clear_authority_cache_for_ops([["transfer", {"from": "test", "to": "test1"}]])
+        self.assertIn(key, TransactionBuilder._authority_cache)
+        TransactionBuilder.clear_authority_cache_for_ops([{"type": "account_update_operation", "value": {"account": "test"}}])
+        self.assertNotIn(key, TransactionBuilder._authority_cache)
+        self.assertNotIn(("0" * 64, "test", "active"), TransactionBuilder._authority_cache)
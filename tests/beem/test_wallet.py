@@ -14,6 +14,7 @@ from beem.asset import Asset
 from beem.wallet import Wallet
 from beem.instance import set_shared_steem_instance, shared_steem_instance
 from beem.nodelist import NodeList
+from beemgraphenebase import ecdsasig
 
 wif = "5KQwrPbwdL6PhXujxW37FSSQZ1JiwsST4cqQzDeyXtP79zkvFD3"
 
@@ -81,6 +82,46 @@ class Testcases(unittest.TestCase):
         private = self.wallet.getPrivateKeyForPublicKey(pub)
         self.assertEqual(private, wif)
 
+    def test_decrypted_keys(self):
+        stm = self.stm
+        self.wallet.steem = stm
+        self.wallet.unlock(pwd="TestingOneTwoThree")
+        pub = self.wallet.getPublicKeys()[0]
+        self.assertEqual(self.wallet.getPrivateKeyForPublicKey(pub), wif)
+        self.assertEqual(self.wallet._get_decrypted_key(pub), wif)
+        with mock.patch.object(self.wallet, "decrypt_wif") as decrypt_wif:
+            self.assertEqual(self.wallet.getPrivateKeyForPublicKey(pub), wif)
+            decrypt_wif.assert_not_called()
+        key = self.wallet._decrypted_keys[pub][0]
+        self.wallet.lock()
+        self.assertEqual(self.wallet._decrypted_keys, {})
+        self.assertEqual(key, bytearray(len(key)))
+
+    def test_lock_clears_signer_cache(self):
+        stm = self.stm
+        self.wallet.steem = stm
+        self.wallet.unlock(pwd="TestingOneTwoThree")
+        pub = self.wallet.getPublicKeys()[0]
+        ecdsasig.get_signer(self.wallet.getPrivateKeyForPublicKey(pub))
+        self.assertTrue(len(ecdsasig._signer_cache) > 0)
+        self.wallet.lock()
+        self.assertEqual(len(ecdsasig._signer_cache), 0)
+
+    def test_unlock_all(self):
+        stm = self.stm
+        self.wallet.steem = stm
+        self.wallet.lock()
+        self.assertEqual(self.wallet.unlock_all(pwd="TestingOneTwoThree", processes=2), len(self.wallet.getPublicKeys()))
+        pub = self.wallet.getPublicKeys()[0]
+        with mock.patch.object(self.wallet, "decrypt_wif") as decrypt_wif:
+            self.assertEqual(self.wallet.getPrivateKeyForPublicKey(pub), wif)
+            decrypt_wif.assert_not_called()
+        self.wallet.key_cache_expiration = -1
+        self.wallet._set_decrypted_key(pub, wif)
+        self.assertIsNone(self.wallet._get_decrypted_key(pub))
+        self.wallet.key_cache_expiration = None
+        self.wallet.lock()
+
     def test_account_by_pub(self):
         stm = self.stm
         self.wallet.steem = stm
@@ -0,0 +1,104 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import asyncio
+import json
+import unittest
+from beemapi.asyncrpc import AsyncGrapheneRPC, AsyncSteemNodeRPC, AIOHTTP_MODULE
+if AIOHTTP_MODULE is not None:
+    from aiohttp import web
+
+
+def answer(query):
+    if query["method"] == "database_api.get_config" or query["method"] == "call":
+        result = {"STEEM_BLOCKCHAIN_VERSION": "0.20.8"}
+    elif query["method"] == "block_api.get_block":
+        block_num = query["params"]["block_num"]
+        result = {"block": {"block_id": "%08x" % block_num + "0" * 32}}
+    else:
+        return {"jsonrpc": "2.0", "id": query["id"], "error": {"message": "Could not find method %s" % query["method"]}}
+    return {"jsonrpc": "2.0", "id": query["id"], "result": result}
+
+
+def reply(data):
+    if isinstance(data, list):
+        return [answer(q) for q in data]
+    return answer(data)
+
+
+async def http_handler(request):
+    await asyncio.sleep(0.01)
+    return web.json_response(reply(await request.json()))
+
+
+async def broken_handler(request):
+    return web.Response(status=503, text="Service Temporarily Unavailable")
+
+
+async def ws_handler(request):
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+
+    async def send_later(data):
+        # answer in reversed order to check the request id dispatching
+        await asyncio.sleep(0.05 / (1 + (data["id"] if isinstance(data, dict) else 0) % 5))
+        await ws.send_str(json.dumps(reply(data)))
+    async for msg in ws:
+        asyncio.ensure_future(send_later(json.loads(msg.data)))
+    return ws
+
+
+@unittest.skipIf(AIOHTTP_MODULE is None, "aiohttp is not installed")
+class Testcases(unittest.TestCase):
+
+    def run_with_server(self, test):
+        async def run():
+            app = web.Application()
+            app.router.add_post("/", http_handler)
+            app.router.add_post("/broken", broken_handler)
+            app.router.add_get("/ws", ws_handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = runner.addresses[0][1]
+            try:
+                return await test(port)
+            finally:
+                await runner.cleanup()
+        return asyncio.new_event_loop().run_until_complete(run())
+
+    def test_http_gather(self):
+        async def test(port):
+            async with AsyncSteemNodeRPC("http://127.0.0.1:%d/" % port, num_retries=1) as rpc:
+                self.assertTrue(rpc.get_use_appbase())
+                blocks = await asyncio.gather(*[rpc.get_block({"block_num": i}, api="block") for i in range(1, 51)])
+                batch = await rpc.get_block([{"block_num": i} for i in range(1, 4)], api="block")
+            return blocks, batch
+        blocks, batch = self.run_with_server(test)
+        self.assertEqual(len(blocks), 50)
+        for i in range(50):
+            self.assertEqual(int(blocks[i]["block"]["block_id"][:8], 16), i + 1)
+        self.assertEqual([int(b["block"]["block_id"][:8], 16) for b in batch], [1, 2, 3])
+
+    def test_websocket_dispatch(self):
+        async def test(port):
+            async with AsyncGrapheneRPC("ws://127.0.0.1:%d/ws" % port, num_retries=1) as rpc:
+                self.assertTrue(rpc.is_appbase_ready())
+                return await asyncio.gather(*[rpc.get_block({"block_num": i}, api="block") for i in range(1, 21)])
+        blocks = self.run_with_server(test)
+        for i in range(20):
+            self.assertEqual(int(blocks[i]["block"]["block_id"][:8], 16), i + 1)
+
+    def test_failover(self):
+        async def test(port):
+            urls = ["http://127.0.0.1:%d/broken" % port, "http://127.0.0.1:%d/" % port]
+            async with AsyncSteemNodeRPC(urls, num_retries=5, num_retries_call=1) as rpc:
+                url = rpc.url
+                block = await rpc.get_block({"block_num": 10}, api="block")
+            return url, block
+        url, block = self.run_with_server(test)
+        self.assertFalse(url.endswith("broken"))
+        self.assertEqual(int(block["block"]["block_id"][:8], 16), 10)
@@ -54,3 +54,58 @@ class Testcases(unittest.TestCase):
         nodes = Nodes(["a", "b", "c"], 5, 5)
         nodes2 = Nodes(nodes, 5, 5)
         self.assertEqual(nodes.url, nodes2.url)
+
+    def test_latency_routing(self):
+        nodes = Nodes(["a", "b", "c"], -1, -1)
+        next(nodes)
+        nodes.record_latency(1.0)
+        next(nodes)
+        self.assertEqual(nodes.url, "b")
+        nodes.record_latency(0.1)
+        next(nodes)
+        self.assertEqual(nodes.url, "c")
+        nodes.record_latency(0.5)
+        # b is the fastest other node
+        next(nodes)
+        self.assertEqual(nodes.url, "b")
+        self.assertFalse(nodes.should_switch_node())
+        next(nodes)
+        self.assertEqual(nodes.url, "c")
+        self.assertTrue(nodes.should_switch_node())
+
+        # a lagging node gets a worse score
+        nodes[1].record_head_block(100)
+        nodes[2].record_head_block(110)
+        self.assertTrue(nodes.head_block_lag(nodes[1]) > 9.9)
+        self.assertEqual(nodes.head_block_lag(nodes[2]), 0)
+        # the lag is weighted with 3 seconds per block
+        self.assertAlmostEqual(nodes.score(nodes[1]) - nodes[1].latency, 3 * nodes.head_block_lag(nodes[1]), places=2)
+        self.assertAlmostEqual(nodes.score(nodes[2]), nodes[2].latency)
+        self.assertFalse(nodes.should_switch_node())
+
+    def test_circuit_breaker(self):
+        nodes = Nodes(["a", "b"], -1, -1)
+        next(nodes)
+        nodes.record_latency(0.1)
+        for i in range(nodes.node.breaker_threshold):
+            nodes.increase_error_cnt()
+        self.assertTrue(nodes[0].breaker_open)
+        next(nodes)
+        self.assertEqual(nodes.url, "b")
+        nodes.record_latency(1.0)
+        # a stays skipped as long as the breaker is open
+        self.assertEqual(nodes.best_node_index(), 1)
+        nodes[0].breaker_open_until = 0
+        self.assertFalse(nodes[0].breaker_open)
+        self.assertEqual(nodes.best_node_index(), 0)
+        nodes[0].record_latency(0.1)
+        self.assertEqual(nodes[0].consecutive_errors, 0)
+
+    def test_hedge_delay(self):
+        nodes = Nodes(["http://a", "http://b"], -1, -1)
+        next(nodes)
+        self.assertIsNone(nodes.hedge_delay())
+        for i in range(100):
+            nodes.record_latency(0.01 * (i + 1))
+        self.assertAlmostEqual(nodes.hedge_delay(), 0.95, places=5)
+        self.assertEqual(nodes.hedge_node().url, "http://b")
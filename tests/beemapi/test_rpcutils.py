@@ -8,7 +8,8 @@ import unittest
 from beemapi.rpcutils import (
     is_network_appbase_ready,
     get_api_name, get_query, UnauthorizedError,
-    RPCConnection, RPCError, NumRetriesReached
+    RPCConnection, RPCError, NumRetriesReached,
+    json_loads, is_json_array, is_streamable_json_array, iter_json_array
 )
 
 
@@ -83,3 +84,22 @@ class Testcases(unittest.TestCase):
         self.assertEqual(query["id"], 1)
         self.assertTrue(isinstance(query["params"], list))
         self.assertEqual(query["params"], ["test_api", "test", ["b"]])
+
+    def test_json_loads(self):
+        self.assertEqual(json_loads('{"a": [1, 2, "b"]}'), {"a": [1, 2, "b"]})
+        # control characters are accepted like with json.loads(strict=False)
+        self.assertEqual(json_loads('{"a": "b\tc"}'), {"a": "b\tc"})
+
+    def test_iter_json_array(self):
+        self.assertTrue(is_json_array(' \n[{"id": 1}]'))
+        self.assertFalse(is_json_array('{"id": 1}'))
+        data = ' [ {"id": 1, "result": {"a": [1, 2]}} ,{"id": 2, "result": "x,]"},\n3 ] '
+        self.assertEqual(list(iter_json_array(data)), [{"id": 1, "result": {"a": [1, 2]}}, {"id": 2, "result": "x,]"}, 3])
+        self.assertEqual(list(iter_json_array("[]")), [])
+        with self.assertRaises(ValueError):
+            list(iter_json_array("[1 2]"))
+        with self.assertRaises(ValueError):
+            list(iter_json_array("{}"))
+        self.assertTrue(is_streamable_json_array(data))
+        self.assertFalse(is_streamable_json_array('[{"id": 1, "result": 1}, {"id": 2, "error": {"message": "x"}}]'))
+        self.assertFalse(is_streamable_json_array('[{"id": 1, "result": 1}'))
@@ -0,0 +1,127 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import threading
+import time
+import unittest
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn, TCPServer
+except ImportError:
+    from http.server import BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn, TCPServer
+from beemapi.graphenerpc import GrapheneRPC, pooled_session_instance, shared_session_instance
+from beemapi.steemnoderpc import SteemNodeRPC
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        query = json.loads(self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8"))
+        self.server.client_ports.add(self.client_address[1])
+        self.server.accept_encoding = self.headers.get("Accept-Encoding")
+        time.sleep(self.server.delays.get(self.path, 0))
+        self.server.paths.append(self.path)
+        if isinstance(query, list):
+            reply = [{"jsonrpc": "2.0", "id": q["id"], "result": q["params"]} for q in query]
+            if self.server.errors.get(self.path):
+                reply[-1] = {"jsonrpc": "2.0", "id": query[-1]["id"],
+                             "error": {"message": self.server.errors[self.path].pop(0)}}
+            body = json.dumps(reply).encode("utf-8")
+        else:
+            body = json.dumps({"jsonrpc": "2.0", "id": query["id"],
+                               "result": {"STEEM_BLOCKCHAIN_VERSION": "0.20.8"}}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Server(ThreadingMixIn, TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class Testcases(unittest.TestCase):
+
+    def setUp(self):
+        self.server = Server(("127.0.0.1", 0), Handler)
+        self.server.client_ports = set()
+        self.server.delays = {}
+        self.server.errors = {}
+        self.server.paths = []
+        self.url = "http://127.0.0.1:%d/" % self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_pooled_session(self):
+        rpc = GrapheneRPC(self.url, num_retries=1, pool_maxsize=4, pool_per_node=True)
+        self.assertTrue(rpc.session is pooled_session_instance(self.url, pool_maxsize=4))
+        self.assertFalse(rpc.session is shared_session_instance())
+        for i in range(20):
+            rpc.get_config(api="database")
+        # all calls were sent over the same kept alive connection
+        self.assertEqual(len(self.server.client_ports), 1)
+        self.assertIn("gzip", self.server.accept_encoding)
+
+        rpc2 = GrapheneRPC(self.url, num_retries=1, pool_maxsize=4, pool_per_node=True)
+        self.assertTrue(rpc.session is rpc2.session)
+        rpc3 = GrapheneRPC(self.url, num_retries=1)
+        self.assertTrue(rpc3.session is shared_session_instance())
+
+    def test_hedged_request(self):
+        urls = [self.url + "a", self.url + "b"]
+        rpc = GrapheneRPC(urls, num_retries=1, hedge_requests=True, route_interval=0)
+        self.assertEqual(rpc.url, urls[0])
+        # the p95 latency of the local server is about 1 ms, so that calls
+        # are not hedged during the warm-up only with a lower bound
+        rpc.nodes.min_hedge_delay = 5
+        for i in range(30):
+            rpc.get_config(api="database")
+        self.assertNotIn("/b", self.server.paths)
+        self.assertEqual(rpc.nodes.hedge_delay(), 5)
+        rpc.nodes.min_hedge_delay = 0.2
+        self.server.delays["/a"] = 2
+        start = time.time()
+        rpc.get_config(api="database")
+        self.assertTrue(time.time() - start < 1.5)
+        self.assertIn("/b", self.server.paths)
+        # broadcasts are never hedged
+        self.assertFalse(rpc._is_hedgeable({"method": "network_broadcast_api.broadcast_transaction"}))
+
+    def test_stream_reply(self):
+        rpc = GrapheneRPC(self.url, num_retries=1)
+        params = [{"block_num": i} for i in range(1, 11)]
+        reply = rpc.get_block(params, api="block", stream_reply=True)
+        self.assertFalse(isinstance(reply, list))
+        self.assertEqual(list(reply), params)
+        self.assertEqual(rpc.get_block(params, api="block"), params)
+
+    def test_stream_reply_error(self):
+        params = [{"block_num": i} for i in range(1, 11)]
+        # the error of the last element is raised before the reply is returned,
+        # so that the call is retried
+        rpc = SteemNodeRPC(self.url + "a", num_retries=1, num_retries_call=3)
+        self.server.errors["/a"] = ["Internal Error"]
+        reply = rpc.get_block(params, api="block", stream_reply=True)
+        self.assertEqual(self.server.paths.count("/a"), 3)
+        self.assertEqual(list(reply), params)
+
+        rpc = SteemNodeRPC([self.url + "b", self.url + "c"], num_retries=1, num_retries_call=3)
+        self.server.errors["/b"] = ["!check_max_block_age"]
+        reply = rpc.get_block(params, api="block", stream_reply=True)
+        self.assertEqual(rpc.url, self.url + "c")
+        self.assertEqual(list(reply), params)
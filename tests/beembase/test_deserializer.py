@@ -0,0 +1,102 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import super
+import unittest
+from binascii import hexlify
+
+from beembase import operations
+from beembase.objects import Operation
+from beembase.signedtransactions import Signed_Transaction
+from beembase.deserializer import decode_operation, decode_transaction, decode_transactions, _public_key, _hex_string
+from beemgraphenebase.py23 import py23_bytes
+
+
+prefix = u"STEEM"
+default_prefix = u"STM"
+wif = "5KQwrPbwdL6PhXujxW37FSSQZ1JiwsST4cqQzDeyXtP79zkvFD3"
+ref_block_num = 34294
+ref_block_prefix = 3707022213
+expiration = "2016-04-06T08:29:27"
+key = "STM6zLNtyFVToBsBZDsgMhgjpwysYVbsQD6YhP3kRkQhANUB4w7Qp"
+authority = {"weight_threshold": 1, "account_auths": [["bar", 1]], "key_auths": [[key, 1]]}
+
+
+class Testcases(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ops = [
+            operations.Transfer(**{"from": "foo", "to": "baar", "amount": "111.110 STEEM",
+                                   "memo": "Foooä", "prefix": default_prefix}),
+            operations.Vote(**{"voter": "foobara", "author": "foobarc", "permlink": "foobard", "weight": -1000}),
+            operations.Comment_options(**{"author": "xeroc", "permlink": "piston", "max_accepted_payout": "1000000.000 SBD",
+                                          "percent_steem_dollars": 10000, "allow_votes": True,
+                                          "allow_curation_rewards": True,
+                                          "beneficiaries": [{"account": "good-karma", "weight": 2000}],
+                                          "prefix": default_prefix}),
+            operations.Account_update(**{"account": "streemian", "posting": authority, "memo_key": key,
+                                         "json_metadata": "", "prefix": default_prefix}),
+            operations.Limit_order_create(**{"owner": "xeroc", "orderid": 1, "amount_to_sell": "0.010 SBD",
+                                             "min_to_receive": "0.001 STEEM", "fill_or_kill": False,
+                                             "expiration": "2016-12-31T23:59:59", "prefix": default_prefix}),
+            operations.Claim_reward_balance(**{"account": "foo", "reward_steem": "0.000 STEEM",
+                                               "reward_sbd": "0.001 SBD", "reward_vests": "1.000000 VESTS",
+                                               "prefix": default_prefix}),
+            operations.Witness_set_properties(**{"owner": "init-1", "props": [["account_creation_fee", "2.000 STEEM"],
+                                                                              ["key", key]],
+                                                 "prefix": default_prefix}),
+        ]
+
+    def sign(self, ops):
+        tx = Signed_Transaction(ref_block_num=ref_block_num, ref_block_prefix=ref_block_prefix,
+                                expiration=expiration, operations=[Operation(op) for op in ops])
+        return tx.sign([wif], chain=prefix)
+
+    def test_decode_operation(self):
+        for op in self.ops:
+            wire = py23_bytes(Operation(op))
+            record, offset = decode_operation(wire)
+            self.assertEqual(offset, len(wire))
+            self.assertEqual(py23_bytes(Operation(record.json())), wire)
+        record, offset = decode_operation(hexlify(py23_bytes(Operation(self.ops[0]))).decode("ascii"))
+        self.assertEqual(record.type, "transfer")
+        self.assertEqual(record.id, 2)
+        self.assertEqual(record.value, {"from": "foo", "to": "baar", "amount": "111.110 STEEM", "memo": "Foooä"})
+
+    def test_decode_transaction(self):
+        tx = self.sign(self.ops)
+        record = decode_transaction(py23_bytes(tx))
+        self.assertEqual(record.id, tx.id)
+        self.assertEqual(record.digest(tx.getChainParams(prefix)["chain_id"]), tx.digest)
+        self.assertEqual(record.expiration, expiration)
+        self.assertEqual([op.type for op in record.operations],
+                         ["transfer", "vote", "comment_options", "account_update", "limit_order_create",
+                          "claim_reward_balance", "witness_set_properties"])
+        self.assertEqual(py23_bytes(Signed_Transaction(**record.json())), py23_bytes(tx))
+
+    def test_decode_transactions(self):
+        txs = [self.sign([op]) for op in self.ops]
+        data = b"".join(py23_bytes(tx) for tx in txs)
+        records = list(decode_transactions(data))
+        self.assertEqual([r.id for r in records], [tx.id for tx in txs])
+        self.assertEqual(len(list(decode_transactions(data, count=2))), 2)
+        self.assertRaises(NotImplementedError, decode_operation, b"\x7f")
+
+    def test_truncated_data(self):
+        # truncated data raises ValueError, wherever it is cut
+        for op in self.ops:
+            wire = py23_bytes(Operation(op))
+            for end in range(len(wire)):
+                self.assertRaises(ValueError, decode_operation, wire[:end])
+        wire = py23_bytes(self.sign(self.ops[:1]))
+        for end in [1, 5, len(wire) - 70, len(wire) - 3]:
+            self.assertRaises(ValueError, decode_transaction, wire[:end])
+            self.assertRaises(ValueError, list, decode_transactions(wire + wire[:end]))
+        self.assertRaises(ValueError, _public_key, b"\x02" * 32, 0, prefix)
+        self.assertRaises(ValueError, _hex_string, b"\x05abcd", 0, prefix)
+        self.assertEqual(_hex_string(b"\x02ab", 0, prefix), ("6162", 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
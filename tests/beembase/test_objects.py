@@ -9,6 +9,7 @@ import json
 from pprint import pprint
 from beembase.objects import Amount
 from beembase.objects import Operation
+from beembase.operationids import getOperationNameForId
 from beemgraphenebase.types import (
     Uint8, Int16, Uint16, Uint32, Uint64,
     Varint32, Int64, String, Bytes, Void,
@@ -35,3 +36,15 @@ class Testcases(unittest.TestCase):
         j = ["transfer", {'from': 'a', 'to': 'b', 'amount': a, 'memo': 'c'}]
         o = Operation(j)
         self.assertEqual(o.json()[1], j[1])
+
+    def test_Operation_id(self):
+        j = ["vote", {'voter': 'a', 'author': 'b', 'permlink': 'c', 'weight': 10000}]
+        o = Operation(j)
+        self.assertEqual(o.getOperationNameForId(0), "vote")
+        self.assertEqual(o.getOperationNameForId(22), "claim_account")
+        self.assertEqual(o.getOperationNameForId(1000), "Unknown Operation ID 1000")
+        self.assertEqual(getOperationNameForId(2), "transfer")
+        o2 = Operation([0, j[1]])
+        self.assertEqual(o2.name, "Vote")
+        self.assertEqual(bytes(o2), bytes(o))
+        self.assertTrue(type(o2.op) is type(o.op))
@@ -20,6 +20,7 @@ from beembase import (
 )
 from beembase.objects import Operation
 from beembase.signedtransactions import Signed_Transaction
+from beemgraphenebase.signedtransactions import verify_transactions
 from beemgraphenebase.account import PrivateKey
 from beemgraphenebase import account
 from beembase.operationids import getOperationNameForId
@@ -93,6 +94,57 @@ class Testcases(unittest.TestCase):
                    "3e")
         self.doit()
 
+    def test_verify_transactions(self):
+        txs = []
+        for memo_text in ["Fooo", "Baar", ""]:
+            op = operations.Transfer(**{"from": "foo", "to": "baar", "amount": "111.110 STEEM",
+                                        "memo": memo_text, "prefix": default_prefix})
+            tx = Signed_Transaction(ref_block_num=ref_block_num, ref_block_prefix=ref_block_prefix,
+                                    expiration=expiration, operations=[Operation(op)])
+            txs.append(tx.sign([wif], chain=prefix))
+        pub_key = repr(PrivateKey(wif).pubkey)
+        self.assertEqual(verify_transactions(txs, prefix, processes=2), [[pub_key]] * 3)
+        self.assertEqual(txs[0].verify([PrivateKey(wif).pubkey], prefix), [pub_key])
+
+    def test_cached_id_and_digest(self):
+        ops = []
+        for memo_text in ["Fooo", "Baar"]:
+            ops.append(Operation(operations.Transfer(**{"from": "foo", "to": "baar", "amount": "111.110 STEEM",
+                                                        "memo": memo_text, "prefix": default_prefix})))
+        tx = Signed_Transaction(ref_block_num=ref_block_num, ref_block_prefix=ref_block_prefix,
+                                expiration=expiration, operations=ops[:1])
+        tx_id = tx.id
+        tx.deriveDigest(prefix)
+        digest = tx.digest
+        body = tx.get_body()
+        tx.sign([wif], chain=prefix)
+        self.assertIs(tx.get_body(), body)
+        self.assertEqual(tx.id, tx_id)
+        self.assertEqual(tx.digest, digest)
+        self.assertEqual(py23_bytes(tx)[:len(body)], body)
+        copy = tx.copy()
+        self.assertIs(copy.get_body(), body)
+        self.assertEqual(copy.id, tx_id)
+
+        # replacing a field computes everything again
+        tx.data["operations"] = objects.Array(ops)
+        self.assertNotEqual(tx.id, tx_id)
+        other = Signed_Transaction(ref_block_num=ref_block_num, ref_block_prefix=ref_block_prefix,
+                                   expiration=expiration, operations=ops)
+        self.assertEqual(tx.id, other.id)
+        tx.deriveDigest(prefix)
+        other.deriveDigest(prefix)
+        self.assertEqual(tx.digest, other.digest)
+        self.assertEqual(copy.id, tx_id)
+        self.assertEqual(len(copy.verify([PrivateKey(wif).pubkey], prefix)), 1)
+
+        # in place changes need clear_cache()
+        tx.data["operations"].data.pop()
+        tx.data["operations"].length = objects.Varint32(1)
+        self.assertEqual(tx.id, other.id)
+        tx.clear_cache()
+        self.assertEqual(tx.id, tx_id)
+
     def test_create_account(self):
         self.op = operations.Account_create(
             **{
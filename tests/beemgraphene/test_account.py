@@ -6,7 +6,7 @@ from __future__ import unicode_literals
 from builtins import str
 import unittest
 from beemgraphenebase.base58 import Base58
-from beemgraphenebase.account import BrainKey, Address, PublicKey, PrivateKey, PasswordKey
+from beemgraphenebase.account import BrainKey, Address, PublicKey, PrivateKey, PasswordKey, get_public_key, clear_public_key_cache
 
 
 class Testcases(unittest.TestCase):
@@ -111,6 +111,26 @@ class Testcases(unittest.TestCase):
                           "BTS7u8m6zUNuzPNK1tPPLtnipxgqV9mVmTzrFNJ9GvovvSTCkVUra"
                           ])
 
+    def test_PublicKey_not_on_curve(self):
+        # x = 5 has no y with y^2 = x^3 + 7 mod p
+        public_key = PublicKey(format(Base58("02" + "%064x" % 5), "STM"), prefix="STM")
+        self.assertRaises(ValueError, public_key.unCompressed)
+        public_key = PublicKey(format(Base58("02" + "%064x" % 6), "STM"), prefix="STM")
+        self.assertEqual(PublicKey(public_key.unCompressed()).compressed(), repr(public_key))
+
+    def test_get_public_key(self):
+        clear_public_key_cache()
+        pub = "STM7u8m6zUNuzPNK1tPPLtnipxgqV9mVmTzrFNJ9GvovvSTCkVUra"
+        public_key = get_public_key(pub)
+        self.assertTrue(get_public_key(pub) is public_key)
+        self.assertFalse(get_public_key(repr(public_key), prefix="BTS") is public_key)
+        self.assertEqual(str(public_key), pub)
+        self.assertEqual(format(public_key.address, "STM"), format(PublicKey(pub).address, "STM"))
+        self.assertEqual(public_key.unCompressed(), PublicKey(pub).unCompressed())
+        self.assertEqual(PublicKey(public_key.unCompressed()).compressed(), repr(public_key))
+        clear_public_key_cache()
+        self.assertFalse(get_public_key(pub) is public_key)
+
     def test_Privatekey(self):
         self.assertEqual([str(PrivateKey("5HvVz6XMx84aC5KaaBbwYrRLvWE46cH6zVnv4827SBPLorg76oq")),
                           str(PrivateKey("5Jete5oFNjjk3aUMkKuxgAXsp7ZyhgJbYNiNjHLvq5xzXkiqw7R")),
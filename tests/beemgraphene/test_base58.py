@@ -4,11 +4,14 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 import unittest
+from binascii import hexlify, unhexlify
 from beemgraphenebase.base58 import (
     Base58,
     base58decode,
     base58encode,
     ripemd160,
+    base58decode_bytes,
+    base58encode_bytes,
     base58CheckEncode,
     base58CheckDecode,
     gphBase58CheckEncode,
@@ -108,6 +111,13 @@ class Testcases(unittest.TestCase):
                           "5Jete5oFNjjk3aUMkKuxgAXsp7ZyhgJbYNiNjHLvq5xzXkiqw7R",
                           "5KDT58ksNsVKjYShG4Ls5ZtredybSxzmKec8juj7CojZj6LPRF7"])
 
+    def test_base58_bytes(self):
+        data = unhexlify("0000800c28fca386c7a227600b2fe50b7cae11ec86d3bf1fbe471be89827e19d72aa1d507a5b8d")
+        self.assertEqual(base58encode_bytes(data), "11" + base58encode(hexlify(data[2:]).decode("ascii")))
+        self.assertEqual(base58decode_bytes(base58encode_bytes(data)), data)
+        self.assertEqual(base58encode_bytes(b""), "1")
+        self.assertRaises(ValueError, base58decode_bytes, "5Hue0")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -89,6 +89,79 @@ class Testcases(unittest.TestCase):
         pub_key_sig2 = ecda.verify_message("Foobar2", signature)
         self.assertTrue(hexlify(pub_key_sig2) != pub_key)
 
+    @parameterized.expand([
+        ("cryptography"),
+        ("secp256k1"),
+        ("ecdsa"),
+    ])
+    def test_signer(self, module):
+        if module == "cryptography":
+            if not ecda.CRYPTOGRAPHY_AVAILABLE:
+                return
+        elif module == "secp256k1":
+            if not ecda.SECP256K1_AVAILABLE:
+                return
+        ecda.SECP256K1_MODULE = module
+        pub_key = py23_bytes(repr(PrivateKey(wif).pubkey), "latin")
+        signer = ecda.Signer(wif)
+        signature = signer.sign("Foobar")
+        self.assertEqual(hexlify(ecda.verify_message("Foobar", signature)), pub_key)
+        messages = [py23_bytes("Foobar%d" % i, "ascii") for i in range(3)]
+        signatures = signer.sign_many([hashlib.sha256(m).digest() for m in messages])
+        for message, signature in zip(messages, signatures):
+            self.assertEqual(hexlify(ecda.verify_message(message, signature)), pub_key)
+
+    def test_get_signer(self):
+        ecda.clear_signer_cache()
+        signer = ecda.get_signer(wif)
+        self.assertTrue(ecda.get_signer(wif) is signer)
+        self.assertTrue(ecda.get_signer(signer) is signer)
+        ecda.clear_signer_cache()
+        self.assertFalse(ecda.get_signer(wif) is signer)
+
+    def test_verify_signatures(self):
+        pub_key = py23_bytes(repr(PrivateKey(wif).pubkey), "latin")
+        digests = [hashlib.sha256(py23_bytes("Foobar%d" % i, "ascii")).digest() for i in range(20)]
+        signatures = ecda.Signer(wif).sign_many(digests)
+        invalid = b"\x00" + signatures[0][1:]
+        items = list(zip(digests, signatures)) + [(digests[0], invalid)]
+        for processes in [1, 2]:
+            ecda.clear_verify_cache()
+            pubkeys = ecda.verify_signatures(items, processes=processes)
+            self.assertEqual([hexlify(p) for p in pubkeys[:20]], [pub_key] * 20)
+            self.assertTrue(pubkeys[20] is None)
+        # memoized results are returned without verifying again
+        self.assertEqual(hexlify(ecda.verify_digest(digests[1], signatures[1])), pub_key)
+        self.assertIn((digests[1], signatures[1], bytearray(signatures[1])[0] - 31), ecda._verify_cache)
+
+    def test_verify_signatures_in_process(self):
+        pub_key = py23_bytes(repr(PrivateKey(wif).pubkey), "latin")
+        digests = [hashlib.sha256(py23_bytes("Foobar%d" % i, "ascii")).digest() for i in range(2)]
+        signatures = ecda.Signer(wif).sign_many(digests)
+        ecda.clear_verify_cache()
+        pool = ecda.ProcessPoolExecutor
+
+        def no_pool(*args, **kwargs):
+            raise AssertionError("small batches are verified without a process pool")
+        ecda.ProcessPoolExecutor = no_pool
+        try:
+            pubkeys = ecda.verify_signatures(list(zip(digests, signatures)), processes=4)
+        finally:
+            ecda.ProcessPoolExecutor = pool
+        self.assertEqual([hexlify(p) for p in pubkeys], [pub_key] * 2)
+
+    def test_sign_digests(self):
+        pub_key = py23_bytes(repr(PrivateKey(wif).pubkey), "latin")
+        wif2 = "5KQwrPbwdL6PhXujxW37FSSQZ1JiwsST4cqQzDeyXtP79zkvFD3"
+        pub_key2 = py23_bytes(repr(PrivateKey(wif2).pubkey), "latin")
+        digests = [hashlib.sha256(py23_bytes("Foobar%d" % i, "ascii")).digest() for i in range(6)]
+        items = [(digest, wif if i % 2 else PrivateKey(wif2)) for i, digest in enumerate(digests)]
+        for processes in [1, 2]:
+            signatures = ecda.sign_digests(items, processes=processes)
+            self.assertEqual(len(signatures), len(items))
+            for i, (digest, signature) in enumerate(zip(digests, signatures)):
+                self.assertEqual(hexlify(ecda.verify_digest(digest, signature)), pub_key if i % 2 else pub_key2)
+
 
 if __name__ == '__main__':
     unittest.main()
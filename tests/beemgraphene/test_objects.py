@@ -5,6 +5,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 import unittest
 import json
+from collections import OrderedDict
 from beemgraphenebase import objects
 from beemgraphenebase import types
 from beem.amount import Amount
@@ -29,3 +30,17 @@ class Testcases(unittest.TestCase):
         j2 = objects.GrapheneObject(j)
         self.assertEqual(j, j2.data)
         self.assertEqual(json.loads(j2.__str__()), j2.json())
+
+    def test_serialize_plan(self):
+        data = OrderedDict([
+            ("a", types.Uint16(1)), ("b", types.Uint32(2)), ("c", types.PointInTime("2016-04-06T08:29:27")),
+            ("d", types.String("foo\x01bar")), ("e", types.Bool(True)), ("f", types.Int64(-5)),
+            ("g", types.Array([types.String("x"), types.Uint8(3)])), ("h", "plain")])
+        obj = objects.GrapheneObject(data)
+        expected = b"".join([bytes(v) if not isinstance(v, str) else v.encode("utf-8") for v in data.values()])
+        self.assertEqual(bytes(obj), expected)
+        # the runs of fixed size fields are packed with one struct
+        plan = objects._serialize_plans[tuple(type(v) for v in data.values())]
+        self.assertEqual([p[0].format if p[0] is not None else None for p in plan],
+                         ["<HII", None, "<Bq", None, None])
+        self.assertEqual(bytes(objects.GrapheneObject(data)), expected)
@@ -179,3 +179,29 @@ class Testcases(unittest.TestCase):
         u = types.Map([[types.Uint16(10), types.Uint16(11)]])
         self.assertEqual(py23_bytes(u), b"\x01\n\x00\x0b\x00")
         self.assertEqual(str(u), '[["10", "11"]]')
+
+    def test_write_into(self):
+        values = [types.Uint8(10), types.Int16(-10), types.Uint16(10), types.Uint32(10),
+                  types.Uint64(10), types.Int64(-10), types.Varint32(2**32 - 1), types.Id(300),
+                  types.String("HelloFoobar"), types.String("Foooä"), types.String("\x07\x08\x09\x0a\x0b"),
+                  types.HexString("00ff"), types.Bytes("00" * 5), types.Void(), types.Bool(True),
+                  types.PointInTime("2018-07-06T22:10:00"), types.Signature(b"\x00" * 65),
+                  types.Array([types.String("a"), types.Uint8(1)]), types.Set([types.Uint16(10)]),
+                  types.Optional(None), types.Optional(types.Uint16(10)), types.Optional(types.Void()),
+                  types.Static_variant(types.Uint16(10), 10),
+                  types.Map([[types.String("a"), types.Optional(types.String("b"))]])]
+        buf = bytearray(b"\x01")
+        expected = b"\x01"
+        for u in values:
+            u.write_into(buf)
+            expected += py23_bytes(u)
+        self.assertEqual(bytes(buf), expected)
+        self.assertEqual(py23_bytes(types.String("Foooä")), b"\x06Fooo\xc3\xa4")
+
+        class Tmp(types.Uint16):
+            def __bytes__(self):
+                return b"tmp"
+
+        buf = bytearray()
+        types.write_value(types.Array([Tmp(10), types.Uint16(10)]), buf)
+        self.assertEqual(bytes(buf), b"\x02tmp\n\x00")